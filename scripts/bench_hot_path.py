@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from src.core.contracts import Features, FeatureVector
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.ensemble.aggregator import EnsembleAggregator
+from src.core.features.feature_engine import FEATURE_SCHEMA, FeatureEngine
+from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.risk.manager import RiskManager
+from src.core.strategies.strategies import build_strategies
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-bar cost of the strategy -> ensemble -> risk hot path.")
+    parser.add_argument("--bars", type=int, default=2000, help="Bars to replay.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    bars = MockAlpacaClient().get_daily_bars("BENCH", limit=args.bars)
+    rows = FeatureEngine().compute_frame(bars).fillna(0).to_numpy(dtype=float).tolist()
+    strategies = build_strategies()
+    ensemble = EnsembleAggregator(min_score=0.0)
+    risk_manager = RiskManager(risk_per_trade=0.01, max_position_weight=0.2, cash_buffer=0.05)
+    portfolio = PortfolioSnapshot(cash=100_000.0, equity=100_000.0, open_positions=0)
+
+    def records_bar(row: list[float]) -> None:
+        features = FeatureVector("BENCH", row, FEATURE_SCHEMA)
+        intents = [signal for strategy in strategies if (signal := strategy.generate(features))]
+        final = ensemble.aggregate(intents)
+        if final is not None:
+            risk_manager.evaluate(final, portfolio)
+
+    def pydantic_bar(row: list[float]) -> None:
+        # The pre-records path: validated models with datetime.now() defaults at every stage.
+        features = Features(symbol="BENCH", values=dict(zip(FEATURE_SCHEMA.names, row)))
+        intents = [signal.to_model() for strategy in strategies if (signal := strategy.generate(features))]
+        final = ensemble.aggregate(intents)
+        if final is not None:
+            decision, _ = risk_manager.evaluate(final.to_model(), portfolio)
+            decision.to_model()
+
+    print(f"{'path':<10}{'us/bar':>10}{'peak KiB/bar':>14}")
+    for name, step in (("pydantic", pydantic_bar), ("records", records_bar)):
+        per_bar_us = _best_time(step, rows, args.repeat) * 1e6 / len(rows)
+        print(f"{name:<10}{per_bar_us:>10.1f}{_allocations(step, rows):>14.2f}")
+
+
+def _best_time(step: Callable[[list[float]], None], rows: list[list[float]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            step(row)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _allocations(step: Callable[[list[float]], None], rows: list[list[float]]) -> float:
+    """Mean per-bar allocation high-water mark in KiB (objects freed within the bar included)."""
+    tracemalloc.start()
+    total = 0
+    for row in rows:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        step(row)
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - base
+    tracemalloc.stop()
+    return total / 1024 / len(rows)
+
+
+if __name__ == "__main__":
+    main()
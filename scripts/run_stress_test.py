@@ -15,7 +15,15 @@ from src.core.settings import load_settings
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run portfolio stress test scenarios.")
     parser.add_argument("--symbols", required=True, help="Comma-separated list of symbols.")
-    parser.add_argument("--shock", type=float, required=True, help="Shock return (e.g. -0.1 for -10%).")
+    parser.add_argument("--shock", type=float, action="append", default=[], help="Uniform shock (e.g. -0.1); repeatable.")
+    parser.add_argument(
+        "--market-shock", type=float, action="append", default=[], help="Beta-scaled market shock; repeatable."
+    )
+    parser.add_argument("--benchmark", default=None, help="Symbol used for betas (default: equal-weighted book).")
+    parser.add_argument("--windows", default="1,5,20", help="Historical worst-window lengths in days ('' to skip).")
+    parser.add_argument("--top", type=int, default=5, help="Worst windows replayed per length.")
+    parser.add_argument("--limit", type=int, default=504, help="Daily bars of history to search.")
+    parser.add_argument("--show", type=int, default=10, help="Worst scenarios printed.")
     return parser.parse_args()
 
 
@@ -28,13 +36,21 @@ def main() -> None:
     client = MockAlpacaClient()
     cache = DataCache(settings.storage.cache_dir)
     provider = MarketDataProvider(client=client, cache=cache)
-    price_history: dict[str, pd.DataFrame] = {}
-    for symbol in symbols:
-        price_history[symbol] = provider.get_daily_bars(symbol, limit=120)
+    fetch = symbols + ([args.benchmark] if args.benchmark and args.benchmark not in symbols else [])
+    price_history: dict[str, pd.DataFrame] = provider.get_daily_bars_batch(fetch, limit=args.limit)
     weights = {symbol: 1.0 / len(symbols) for symbol in symbols}
     tester = StressTester()
-    results = tester.run(price_history, weights, {"custom": args.shock})
-    for result in results:
+    scenarios = tester.uniform_scenarios({f"uniform_{shock:+.0%}": shock for shock in args.shock}, symbols)
+    if args.market_shock:
+        market = {f"market_{shock:+.0%}": shock for shock in args.market_shock}
+        scenarios = scenarios.concat(tester.beta_scenarios(price_history, market, benchmark=args.benchmark))
+    windows = [int(k) for k in args.windows.split(",") if k.strip()]
+    if windows:
+        scenarios = scenarios.concat(tester.historical_scenarios(price_history, weights, windows=windows, top=args.top))
+    if not len(scenarios):
+        raise ValueError("No scenarios: pass --shock, --market-shock or --windows.")
+    print(f"{len(scenarios)} scenarios x {len(scenarios.symbols)} symbols")
+    for result in tester.results(scenarios, weights, top=args.show):
         print(f"Scenario: {result.scenario} -> Portfolio return {result.portfolio_return:.2%}")
         for symbol, impact in result.details.items():
             print(f"  {symbol}: {impact:.2%}")
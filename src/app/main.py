@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime, timezone
 import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 import pickle
 import re
 
@@ -20,32 +22,45 @@ from src.core.contracts import TestCenterCheck
 from src.core.data.alpaca_client import AlpacaClient, AlpacaCredentials, MockAlpacaClient
 from src.core.data.cache import DataCache
 from src.core.data.market_data import MarketDataProvider
+from src.core.data.paper_broker import PaperBroker
+from src.core.data.synthetic import PriceModel, SyntheticMarketGenerator
 from src.core.data.validator import MarketDataValidator
 from src.core.ensemble.aggregator import EnsembleAggregator
+from src.core.ensemble.learner import OnlineWeightLearner
 from src.core.execution.execution_service import ExecutionService
 from src.core.execution.order_manager import OrderManager
 from src.core.execution.slippage import SlippageModel
 from src.core.features.feature_engine import FeatureEngine
+from src.core.features.store import FeatureStore
 from src.core.monitoring.alerts import AlertManager
 from src.core.monitoring.circuit_breaker import CircuitBreaker
 from src.core.monitoring.error_handler import ErrorHandler
 from src.core.monitoring.health import HealthMonitor
 from src.core.monitoring.center_service import TestCenterService
 from src.core.monitoring.performance import PerformanceMonitor
-from src.core.ml.drift import detect_drift
-from src.core.ml.registry import ModelRegistry
+from src.core.ml.dataset import DatasetBuilder, load_dataset
+from src.core.ml.drift import DriftMonitor, detect_drift
+from src.core.ml.inference import ModelInference
+from src.core.ml.registry import ModelRegistry, close_connections
 from src.core.ml.retrain import RetrainPipeline
-from src.core.ml.shadow import ShadowTester
+from src.core.ml.shadow import ShadowScorer, ShadowTester
 from src.core.orchestrator.service import Orchestrator
 from src.core.orchestrator.setup_gate import SetupGate
 from src.core.sentiment.provider import SentimentProvider
 from src.core.portfolio.position_manager import PositionManager
+from src.core.portfolio.rebalance import RebalancePlanner
 from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.portfolio.stop_monitor import ClientQuoteSource, StopMonitor
 from src.core.portfolio.trade_queue import TradeQueue
 from src.core.risk.correlation import CorrelationManager
+from src.core.risk.covariance import CorrelationService
+from src.core.risk.funding import FundingSolver
 from src.core.risk.manager import RiskManager
+from src.core.risk.optimizer import PortfolioOptimizer
+from src.core.risk.portfolio_risk import PortfolioRiskEngine
 from src.core.settings import Settings, load_settings
 from src.core.storage.db import SQLiteStore
+from src.core.strategies.strategies import build_strategies
 from src.integrations.openai_services import DailyOpsReporterService, NewsRiskGateService, TradeExplainerService
 
 
@@ -80,9 +95,34 @@ def load_sector_map(path: str) -> dict:
     return {str(symbol).upper(): str(sector) for symbol, sector in data.items()}
 
 
-def build_clients(settings: Settings, use_mock: bool = False) -> tuple[AlpacaClient | MockAlpacaClient, bool]:
+def build_mock_client(settings: Settings) -> MockAlpacaClient | PaperBroker:
+    config = settings.paper_broker
+    if not config.enabled:
+        return MockAlpacaClient()
+    if config.price_model == "factor":
+        price_model = SyntheticMarketGenerator(seed=config.seed)
+    else:
+        price_model = PriceModel(kind=config.price_model, seed=config.seed)
+    return PaperBroker(
+        price_model=price_model,
+        slippage_model=SlippageModel(
+            spread_bps=settings.slippage.spread_bps,
+            fee_bps=settings.slippage.fee_bps,
+            per_share_fee=settings.slippage.per_share_fee,
+        ),
+        starting_cash=config.starting_cash,
+        history_days=config.history_days,
+        horizon_days=config.horizon_days,
+        latency_seconds=config.latency_ms / 1000,
+        latency_jitter=config.latency_jitter_ms / 1000,
+        failure_rate=config.failure_rate,
+        seed=config.seed,
+    )
+
+
+def build_clients(settings: Settings, use_mock: bool = False) -> tuple[AlpacaClient | MockAlpacaClient | PaperBroker, bool]:
     if use_mock:
-        return MockAlpacaClient(), True
+        return build_mock_client(settings), True
 
     mode = settings.app.mode
     if mode == "live":
@@ -100,7 +140,7 @@ def build_clients(settings: Settings, use_mock: bool = False) -> tuple[AlpacaCli
 
     if mode == "paper":
         if not settings.alpaca_paper_api_key or not settings.alpaca_paper_secret_key:
-            return MockAlpacaClient(), True
+            return build_mock_client(settings), True
         credentials = AlpacaCredentials(
             api_key=settings.alpaca_paper_api_key,
             secret_key=settings.alpaca_paper_secret_key,
@@ -109,7 +149,52 @@ def build_clients(settings: Settings, use_mock: bool = False) -> tuple[AlpacaCli
         )
         return AlpacaClient(credentials, paper=True), False
 
-    return MockAlpacaClient(), True
+    return build_mock_client(settings), True
+
+
+def build_feature_engine(settings: Settings) -> FeatureEngine:
+    store = None
+    if settings.storage.feature_store_enabled:
+        store = FeatureStore(
+            resolve_path(settings.storage.cache_dir) / "features.db",
+            lru_size=settings.storage.feature_store_lru_size,
+        )
+    return FeatureEngine(atr_period=settings.risk.stop_takeprofit.atr_period, store=store)
+
+
+def build_ensemble(settings: Settings) -> EnsembleAggregator:
+    return EnsembleAggregator(
+        min_score=settings.ensemble.min_final_score_to_trade,
+        method=settings.ensemble.method,
+        weights=dict(settings.ensemble.weights),
+        strategies=tuple(strategy.name for strategy in build_strategies(settings.strategies)),
+        vote_threshold=settings.ensemble.vote_threshold,
+        stacking_coefficients=dict(settings.ensemble.stacking_coefficients),
+        stacking_intercept=settings.ensemble.stacking_intercept,
+    )
+
+
+def build_risk_manager(settings: Settings) -> RiskManager:
+    funding = settings.funding_alert
+    solver = None
+    if funding.enabled:
+        solver = FundingSolver(
+            slippage_model=SlippageModel(
+                spread_bps=settings.slippage.spread_bps,
+                fee_bps=settings.slippage.fee_bps,
+                per_share_fee=settings.slippage.per_share_fee,
+            ),
+            swap_score_gap_threshold=funding.swap_score_gap_threshold,
+            partial_entry_enabled=funding.partial_entry_enabled,
+            partial_entry_fraction=funding.partial_entry_fraction,
+            trade_queue_enabled=funding.trade_queue_enabled,
+        )
+    return RiskManager(
+        risk_per_trade=settings.risk.risk_per_trade,
+        max_position_weight=settings.risk.max_position_weight,
+        cash_buffer=settings.risk.cash_buffer,
+        funding_solver=solver,
+    )
 
 
 def build_test_center(settings: Settings, use_mock: bool = False) -> TestCenterService:
@@ -120,13 +205,9 @@ def build_test_center(settings: Settings, use_mock: bool = False) -> TestCenterS
         data_format=settings.storage.data_cache_format,
     )
     data_provider = MarketDataProvider(client=client, cache=cache)
-    feature_engine = FeatureEngine(atr_period=settings.risk.stop_takeprofit.atr_period)
-    ensemble = EnsembleAggregator(min_score=settings.ensemble.min_final_score_to_trade)
-    risk_manager = RiskManager(
-        risk_per_trade=settings.risk.risk_per_trade,
-        max_position_weight=settings.risk.max_position_weight,
-        cash_buffer=settings.risk.cash_buffer,
-    )
+    feature_engine = build_feature_engine(settings)
+    ensemble = build_ensemble(settings)
+    risk_manager = build_risk_manager(settings)
     order_manager = OrderManager(client=client, ttl_minutes=settings.order_manager.stale_order_ttl_minutes)
     execution = ExecutionService(settings=settings, client=client, order_manager=order_manager)
     backtester = WalkForwardBacktester(
@@ -147,6 +228,19 @@ def build_test_center(settings: Settings, use_mock: bool = False) -> TestCenterS
     )
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Finish queued shadow scoring before the process exits.
+    shadow_scorer = getattr(app.state, "shadow_scorer", None)
+    if shadow_scorer is not None:
+        shadow_scorer.close()
+    feature_store = getattr(app.state, "feature_store", None)
+    if feature_store is not None:
+        feature_store.close()
+    close_connections()
+
+
 def create_app(
     settings: Optional[Settings] = None,
     test_center: Optional[TestCenterService] = None,
@@ -154,7 +248,7 @@ def create_app(
 ) -> FastAPI:
     settings = settings or load_settings()
     i18n = load_i18n()
-    app = FastAPI(title="Ultimate Trading Bot v2", version="0.1.0")
+    app = FastAPI(title="Ultimate Trading Bot v2", version="0.1.0", lifespan=_lifespan)
     app.state.settings = settings
     templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
@@ -167,19 +261,17 @@ def create_app(
         data_format=settings.storage.data_cache_format,
     )
     data_provider = MarketDataProvider(client=client, cache=cache)
-    feature_engine = FeatureEngine(atr_period=settings.risk.stop_takeprofit.atr_period)
+    feature_engine = build_feature_engine(settings)
+    app.state.feature_store = feature_engine.store
     data_validator = MarketDataValidator()
-    ensemble = EnsembleAggregator(min_score=settings.ensemble.min_final_score_to_trade)
-    risk_manager = RiskManager(
-        risk_per_trade=settings.risk.risk_per_trade,
-        max_position_weight=settings.risk.max_position_weight,
-        cash_buffer=settings.risk.cash_buffer,
-    )
+    ensemble = build_ensemble(settings)
+    risk_manager = build_risk_manager(settings)
     order_manager = OrderManager(client=client, ttl_minutes=settings.order_manager.stale_order_ttl_minutes)
     execution = ExecutionService(settings=settings, client=client, order_manager=order_manager)
     slippage_model = SlippageModel(
         spread_bps=settings.slippage.spread_bps,
         fee_bps=settings.slippage.fee_bps,
+        per_share_fee=settings.slippage.per_share_fee,
     )
     circuit_breaker = CircuitBreaker(
         max_failures=settings.circuit_breaker.max_failures,
@@ -196,9 +288,32 @@ def create_app(
         telegram_token=settings.alerts.telegram_token,
         telegram_chat_id=settings.alerts.telegram_chat_id,
     )
+    var_settings = settings.risk.portfolio_var
+    portfolio_risk = None
+    if var_settings.enabled:
+        portfolio_risk = PortfolioRiskEngine(
+            confidence=var_settings.confidence,
+            method=var_settings.method,
+            ewma_lambda=var_settings.ewma_lambda,
+            max_var=var_settings.max_var,
+            max_cvar=var_settings.max_cvar,
+        )
+    sizing = settings.risk.sizing
+    portfolio_optimizer = None
+    if sizing.mode != "fixed":
+        portfolio_optimizer = PortfolioOptimizer(
+            mode=sizing.mode,
+            max_weight=settings.risk.max_position_weight,
+            max_sector_weight=settings.risk.max_sector_weight,
+            budget=1 - settings.risk.cash_buffer,
+            target_vol=sizing.target_vol,
+            risk_aversion=sizing.risk_aversion,
+        )
     correlation_manager = CorrelationManager(
         max_symbol_correlation=settings.risk.max_symbol_correlation,
         max_sector_weight=settings.risk.max_sector_weight,
+        window=settings.risk.correlation_window,
+        service=CorrelationService(window=settings.risk.correlation_window),
     )
     sentiment_provider = SentimentProvider(
         provider=settings.sentiment.provider,
@@ -209,6 +324,16 @@ def create_app(
     sector_map = load_sector_map(settings.sector_map_path)
     store = SQLiteStore(settings.storage.database_url)
     store.seed_watchlist(settings.universe.watchlist_default)
+    weight_learner = None
+    if settings.ensemble.online_learning:
+        weight_learner = OnlineWeightLearner(
+            store=store,
+            learning_rate=settings.ensemble.learning_rate,
+            reward_scale=settings.ensemble.reward_scale,
+            min_weight=settings.ensemble.min_weight,
+            max_weight=settings.ensemble.max_weight,
+        )
+        ensemble.learner = weight_learner
     trade_queue = TradeQueue(store=store, ttl_hours=settings.funding_alert.trade_queue_ttl_hours)
     setup_gate = SetupGate(
         min_trend=settings.setup_gate.min_trend,
@@ -226,7 +351,17 @@ def create_app(
         max_hold_days=settings.trading.target_hold_days_max,
         trailing_stop_enabled=settings.risk.stop_takeprofit.trailing_stop_enabled,
         trailing_atr_multiplier=settings.risk.stop_takeprofit.trailing_atr_multiplier,
+        weight_learner=weight_learner,
     )
+    stop_settings = settings.risk.stop_takeprofit
+    stop_monitor = None
+    if stop_settings.intraday_monitor:
+        stop_monitor = StopMonitor(
+            store=store,
+            position_manager=position_manager,
+            source=ClientQuoteSource(client),
+            poll_seconds=stop_settings.monitor_poll_seconds,
+        )
     backtester = WalkForwardBacktester(
         data_provider=data_provider,
         feature_engine=feature_engine,
@@ -236,7 +371,49 @@ def create_app(
         train_days=settings.ml.validation.train_window_days,
         test_days=settings.ml.validation.test_window_days,
         step_days=settings.ml.validation.step_window_days,
+        model_mode=settings.ml.validation.model_mode,
+        retrain_pipeline=RetrainPipeline(schedule="manual"),
+        label=settings.ml.dataset.label,
+        label_horizon=settings.ml.dataset.horizon_days,
+        atr_multiplier_stop=settings.risk.stop_takeprofit.atr_multiplier_stop,
+        atr_multiplier_tp=settings.risk.stop_takeprofit.atr_multiplier_tp,
+        max_workers=settings.ml.validation.max_workers,
     )
+    model_registry = ModelRegistry(base_dir=Path(settings.ml.registry.directory))
+    drift_monitor = None
+    if settings.ml.enabled and settings.ml.drift_monitor.enabled:
+        drift_monitor = DriftMonitor(
+            data_threshold=settings.ml.drift_thresholds.data_drift_threshold,
+            performance_threshold=settings.ml.drift_thresholds.performance_drift_threshold,
+            window_size=settings.ml.drift_monitor.window_size,
+            max_windows=settings.ml.drift_monitor.max_windows,
+            ks_threshold=settings.ml.drift_monitor.ks_threshold,
+            compression=settings.ml.drift_monitor.compression,
+            registry=model_registry,
+            retrain_pipeline=(
+                RetrainPipeline(schedule=settings.ml.retrain_schedule, hpo=settings.ml.hpo)
+                if settings.ml.retrain_on_drift
+                else None
+            ),
+        )
+    shadow_scorer = None
+    if settings.ml.enabled and settings.ml.shadow_test.live:
+        shadow_settings = settings.ml.shadow_test
+        shadow_scorer = ShadowScorer(
+            registry=model_registry,
+            log_dir=resolve_path(shadow_settings.directory),
+            days=shadow_settings.days,
+            horizon=settings.ml.dataset.horizon_days,
+            label=settings.ml.dataset.label,
+            return_threshold=settings.ml.dataset.return_threshold,
+            atr_multiplier_stop=settings.risk.stop_takeprofit.atr_multiplier_stop,
+            atr_multiplier_tp=settings.risk.stop_takeprofit.atr_multiplier_tp,
+            threshold=shadow_settings.threshold,
+            metric_name=shadow_settings.metric,
+            delta=shadow_settings.delta,
+            min_outcomes=shadow_settings.min_outcomes,
+        )
+    app.state.shadow_scorer = shadow_scorer
     orchestrator = Orchestrator(
         settings=settings,
         data_provider=data_provider,
@@ -260,6 +437,19 @@ def create_app(
         sentiment_provider=sentiment_provider,
         position_manager=position_manager,
         news_gate_service=news_gate_service,
+        drift_monitor=drift_monitor,
+        model_inference=ModelInference(registry=model_registry) if settings.ml.enabled else None,
+        shadow_scorer=shadow_scorer,
+        portfolio_risk=portfolio_risk,
+        portfolio_optimizer=portfolio_optimizer,
+        rebalance_planner=RebalancePlanner(
+            slippage_model=slippage_model,
+            threshold=settings.risk.rebalance.threshold,
+            frequency=settings.risk.rebalance.frequency,
+            max_position_weight=settings.risk.max_position_weight,
+            cash_buffer=settings.risk.cash_buffer,
+        ),
+        stop_monitor=stop_monitor,
     )
     test_center = test_center or build_test_center(settings, use_mock=mock_mode)
 
@@ -305,6 +495,18 @@ def create_app(
             store.add_log("error", f"Portföy alınamadı: {exc}")
             return {"error": "Portföy bilgisi alınamadı."}
 
+    @app.get("/api/rebalance/plan", response_class=JSONResponse)
+    def rebalance_plan() -> dict:
+        return orchestrator.rebalance(dry_run=True).to_dict()
+
+    @app.post("/api/rebalance", response_class=JSONResponse)
+    def rebalance(payload: dict) -> dict:
+        try:
+            return orchestrator.rebalance(dry_run=bool(payload.get("dry_run", True))).to_dict()
+        except Exception as exc:  # noqa: BLE001
+            store.add_log("error", f"Rebalance failed: {exc}")
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     @app.get("/api/test-center/checks", response_class=JSONResponse)
     def test_center_checks() -> list[TestCenterCheck]:
         checks = test_center.run_checks()
@@ -438,7 +640,8 @@ def create_app(
         backtester.train_days = train_days
         backtester.test_days = test_days
         backtester.step_days = step_days
-        report = backtester.run(symbols, years=years)
+        backtester.model_mode = bool(payload.get("model_mode", settings.ml.validation.model_mode))
+        report = await run_in_threadpool(backtester.run, symbols, years)
         equity_curve = []
         for fold in report.get("folds", []):
             equity_curve.extend(fold.get("equity_curve", []))
@@ -451,13 +654,11 @@ def create_app(
 
     @app.get("/api/models/list", response_class=JSONResponse)
     def list_models() -> list[dict]:
-        registry = ModelRegistry(base_dir=Path(settings.ml.registry.directory))
-        return registry.list_models()
+        return model_registry.list_models()
 
     @app.get("/api/models/active", response_class=JSONResponse)
     def active_model() -> dict:
-        registry = ModelRegistry(base_dir=Path(settings.ml.registry.directory))
-        active = registry.get_active_model()
+        active = model_registry.get_active_model()
         return active or {}
 
     @app.post("/api/models/set-active", response_class=JSONResponse)
@@ -466,9 +667,8 @@ def create_app(
         model_id = payload.get("model_id")
         if not model_id:
             raise HTTPException(status_code=400, detail="model_id is required.")
-        registry = ModelRegistry(base_dir=Path(settings.ml.registry.directory))
         try:
-            registry.set_active_model(model_id)
+            model_registry.set_active_model(model_id)
         except Exception as exc:  # noqa: BLE001
             raise HTTPException(status_code=400, detail=str(exc)) from exc
         return {"status": "ok", "active_model": model_id}
@@ -483,7 +683,7 @@ def create_app(
         baseline_df = pd.DataFrame(baseline)
         current_df = pd.DataFrame(current)
         report = detect_drift(baseline_df, current_df, alpha=float(payload.get("alpha", 0.05)))
-        return report.model_dump()
+        return asdict(report)
 
     def _resolve_registry_artifact(registry: ModelRegistry, artifact_path: str) -> Path:
         base_dir = registry.base_dir.resolve()
@@ -505,14 +705,12 @@ def create_app(
         target = payload.get("target")
         if not candidate_id or not isinstance(features, list) or not isinstance(target, list):
             raise HTTPException(status_code=400, detail="candidate_model_id, features, and target are required.")
-        registry = ModelRegistry(base_dir=Path(settings.ml.registry.directory))
-        models = {model["model_id"]: model for model in registry.list_models()}
-        candidate_entry = models.get(candidate_id)
-        active_entry = models.get(active_id) if active_id else registry.get_active_model()
+        candidate_entry = model_registry.get_model(candidate_id)
+        active_entry = model_registry.get_model(active_id) if active_id else model_registry.get_active_model()
         if not candidate_entry or not active_entry:
             raise HTTPException(status_code=400, detail="Candidate or active model not found.")
-        candidate_path = _resolve_registry_artifact(registry, candidate_entry["artifact_path"])
-        active_path = _resolve_registry_artifact(registry, active_entry["artifact_path"])
+        candidate_path = _resolve_registry_artifact(model_registry, candidate_entry["artifact_path"])
+        active_path = _resolve_registry_artifact(model_registry, active_entry["artifact_path"])
         candidate_model = pickle.load(candidate_path.open("rb"))
         active_model = pickle.load(active_path.open("rb"))
         tester = ShadowTester(days=settings.ml.shadow_test.days)
@@ -521,23 +719,106 @@ def create_app(
         result = tester.run(candidate_model, active_model, features_arr, target_arr)
         return result.__dict__
 
+    dataset_root = resolve_path(settings.ml.dataset.directory)
+
+    def _resolve_dataset_dir(name: object) -> Path:
+        if not isinstance(name, str) or not re.match(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$", name):
+            raise HTTPException(status_code=400, detail="dataset must be a simple directory name.")
+        return dataset_root / name
+
+    @app.post("/api/models/dataset/build", response_class=JSONResponse)
+    async def build_dataset(request: Request) -> dict:
+        payload = await request.json()
+        name = payload.get("name") or f"dataset-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+        output_dir = _resolve_dataset_dir(name)
+        symbols = payload.get("symbols") or store.get_watchlist()
+        if not isinstance(symbols, list) or not symbols:
+            raise HTTPException(status_code=400, detail="symbols must be a non-empty list.")
+        dataset_settings = settings.ml.dataset
+        data_format = payload.get("format", dataset_settings.format)
+        if data_format not in {"parquet", "npz"}:
+            raise HTTPException(status_code=400, detail="format must be parquet or npz.")
+        builder = DatasetBuilder(
+            cache=cache,
+            feature_engine=feature_engine,
+            horizon=int(payload.get("horizon_days", dataset_settings.horizon_days)),
+            label=payload.get("label", dataset_settings.label),
+            return_threshold=dataset_settings.return_threshold,
+            atr_multiplier_stop=settings.risk.stop_takeprofit.atr_multiplier_stop,
+            atr_multiplier_tp=settings.risk.stop_takeprofit.atr_multiplier_tp,
+        )
+        try:
+            dataset = await run_in_threadpool(
+                builder.build,
+                [str(symbol).upper() for symbol in symbols],
+                payload.get("start"),
+                payload.get("end"),
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if not len(dataset):
+            raise HTTPException(status_code=400, detail="No labeled rows; cache bars for the universe first.")
+        await run_in_threadpool(builder.write, dataset, output_dir, data_format)
+        return {"name": name, **dataset.manifest}
+
+    @app.post("/api/models/shadow/start", response_class=JSONResponse)
+    async def start_shadow(request: Request) -> dict:
+        payload = await request.json()
+        model_id = payload.get("candidate_model_id")
+        if shadow_scorer is None:
+            raise HTTPException(status_code=400, detail="Live shadow scoring is disabled.")
+        if not model_id:
+            raise HTTPException(status_code=400, detail="candidate_model_id is required.")
+        try:
+            shadow_scorer.add_candidate(model_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"status": "ok", "candidates": shadow_scorer.candidates()}
+
+    @app.post("/api/models/shadow/stop", response_class=JSONResponse)
+    async def stop_shadow(request: Request) -> dict:
+        payload = await request.json()
+        if shadow_scorer is None:
+            raise HTTPException(status_code=400, detail="Live shadow scoring is disabled.")
+        shadow_scorer.remove_candidate(str(payload.get("candidate_model_id", "")))
+        return {"status": "ok", "candidates": shadow_scorer.candidates()}
+
+    @app.get("/api/models/shadow/status", response_class=JSONResponse)
+    def shadow_status() -> dict:
+        return shadow_scorer.status() if shadow_scorer is not None else {}
+
     @app.post("/api/models/retrain", response_class=JSONResponse)
     async def retrain_model(request: Request) -> dict:
         payload = await request.json()
-        features = payload.get("features")
-        target = payload.get("target")
-        if not isinstance(features, list) or not isinstance(target, list):
-            raise HTTPException(status_code=400, detail="features and target are required lists.")
         algorithm = payload.get("algorithm", "logistic_regression")
-        features_df = pd.DataFrame(features)
-        target_series = pd.Series(target)
-        pipeline = RetrainPipeline(schedule=settings.ml.retrain_schedule)
-        result = pipeline.run(
+        if payload.get("dataset"):
+            dataset_dir = _resolve_dataset_dir(payload["dataset"])
+            if not dataset_dir.exists():
+                raise HTTPException(status_code=404, detail="Dataset not found.")
+            dataset = await run_in_threadpool(load_dataset, dataset_dir)
+            features_df = dataset.features
+            target_series = dataset.target
+            # Rows interleave symbols by date: purge by timestamp, at least the label horizon.
+            timestamps = dataset.timestamps.to_numpy()
+            horizon = int(dataset.manifest.get("label", {}).get("horizon", 0))
+        else:
+            timestamps, horizon = None, 0
+            features = payload.get("features")
+            target = payload.get("target")
+            if not isinstance(features, list) or not isinstance(target, list):
+                raise HTTPException(status_code=400, detail="dataset or features and target lists are required.")
+            features_df = pd.DataFrame(features)
+            target_series = pd.Series(target)
+        pipeline = RetrainPipeline(schedule=settings.ml.retrain_schedule, hpo=settings.ml.hpo)
+        result = await run_in_threadpool(
+            pipeline.run,
             features=features_df,
             target=target_series,
             registry_dir=settings.ml.registry.directory,
             feature_list=list(features_df.columns),
             algorithm=algorithm,
+            timestamps=timestamps,
+            horizon=horizon,
         )
         return result.__dict__
 
@@ -551,6 +832,7 @@ def create_app(
                 "missing_cash": row["missing_cash"],
                 "proposed_actions": row["proposed_actions"],
                 "details": row["details"],
+                "orders": row["orders"],
                 "created_at": row["created_at"],
             }
             for row in rows
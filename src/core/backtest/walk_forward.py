@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+import os
+from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
 
+from src.core.contracts import FeatureSchema, FeatureVector
 from src.core.ensemble.aggregator import EnsembleAggregator
-from src.core.features.feature_engine import FeatureEngine
+from src.core.features.feature_engine import FEATURE_SCHEMA, FeatureEngine
+from src.core.ml.dataset import forward_return_labels, tp_before_sl_labels
+from src.core.ml.inference import positive_probability
+from src.core.ml.retrain import RetrainPipeline
 from src.core.portfolio.snapshot import PortfolioSnapshot
 from src.core.risk.manager import RiskManager
-from src.core.strategies.strategies import build_strategies
+from src.core.strategies.strategies import build_model_intent, build_strategies, required_features
 from src.core.data.market_data import MarketDataProvider
 from src.core.settings import StrategyToggles
 
@@ -27,6 +33,13 @@ class WalkForwardBacktester:
     train_days: int = 504
     test_days: int = 126
     step_days: int = 63
+    model_mode: bool = False
+    retrain_pipeline: Optional[RetrainPipeline] = None
+    label: str = "tp_before_sl"
+    label_horizon: int = 10
+    atr_multiplier_stop: float = 2.0
+    atr_multiplier_tp: float = 4.0
+    max_workers: int = 0  # 0 = all cores
 
     def run(self, symbols: list[str], years: int = 5) -> dict:
         if not symbols:
@@ -37,28 +50,40 @@ class WalkForwardBacktester:
         ensemble = self.ensemble or EnsembleAggregator()
         risk_manager = self.risk_manager or RiskManager(risk_per_trade=0.005, max_position_weight=0.12, cash_buffer=0.08)
         max_bars = int(years * 252)
-        folds: list[dict] = []
-        equity_curves: list[float] = []
+        # Features are computed once per symbol over the full history; every fold
+        # slices the same frame instead of recomputing its overlapping window.
+        plans: list[tuple[str, pd.DataFrame, pd.DataFrame, int]] = []
+        # Rule-only runs compute just what the enabled strategies read; model
+        # folds train on the full schema.
+        needed = required_features(build_strategies(self.strategy_toggles))
         for symbol in symbols:
-            bars = self.data_provider.get_daily_bars(symbol, limit=max_bars)
+            bars = self.data_provider.get_daily_bars(symbol, limit=max_bars).reset_index(drop=True)
             if len(bars) < self.train_days + self.test_days:
                 continue
+            frame = feature_engine.compute_frame(bars, None if self.model_mode else needed)
             fold_start = 0
             while fold_start + self.train_days + self.test_days <= len(bars):
-                train_slice = bars.iloc[fold_start : fold_start + self.train_days]
-                test_slice = bars.iloc[fold_start + self.train_days : fold_start + self.train_days + self.test_days]
-                fold_result = self._run_fold(
-                    symbol=symbol,
-                    train_slice=train_slice,
-                    test_slice=test_slice,
-                    feature_engine=feature_engine,
-                    ensemble=ensemble,
-                    risk_manager=risk_manager,
-                )
-                folds.append(fold_result)
-                equity_curves.extend(fold_result["equity_curve"])
+                plans.append((symbol, bars, frame, fold_start))
                 fold_start += self.step_days
 
+        models = self._fit_fold_models(plans) if self.model_mode else [None] * len(plans)
+        folds: list[dict] = []
+        equity_curves: list[float] = []
+        for (symbol, bars, frame, fold_start), model in zip(plans, models):
+            test_start = fold_start + self.train_days
+            test_end = test_start + self.test_days
+            fold_result = self._run_fold(
+                symbol=symbol,
+                test_slice=bars.iloc[test_start:test_end],
+                test_features=frame.iloc[test_start:test_end],
+                ensemble=ensemble,
+                risk_manager=risk_manager,
+                model=model,
+                model_id=f"fold-{len(folds)}",
+            )
+            folds.append(fold_result)
+            equity_curves.extend(fold_result["equity_curve"])
+
         aggregate = self._aggregate_metrics(folds, equity_curves)
         summary = f"{len(folds)} folds, avg return {aggregate.get('total_return', 0.0):.2%}"
         return {
@@ -70,18 +95,60 @@ class WalkForwardBacktester:
                 "train_days": self.train_days,
                 "test_days": self.test_days,
                 "step_days": self.step_days,
+                "model_mode": self.model_mode,
             },
             "summary": summary,
         }
 
+    def _fit_fold_models(self, plans: list[tuple[str, pd.DataFrame, pd.DataFrame, int]]) -> list[Any]:
+        pipeline = self.retrain_pipeline or RetrainPipeline(schedule="manual")
+        labels: dict[str, np.ndarray] = {}
+        tasks: list[tuple[pd.DataFrame, pd.Series]] = []
+        for symbol, _, frame, fold_start in plans:
+            if symbol not in labels:
+                labels[symbol] = self._labels(frame)
+            # Rows whose label horizon reaches into the test slice are purged.
+            train_end = fold_start + self.train_days - self.label_horizon
+            train = frame.iloc[fold_start:train_end]
+            target = pd.Series(labels[symbol][fold_start:train_end], index=train.index)
+            usable = train.notna().all(axis=1) & target.notna()
+            tasks.append((train[usable], target[usable].astype(int)))
+        workers = min(self.max_workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            return [_fit_fold(pipeline, features, target) for features, target in tasks]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(
+                pool.map(
+                    _fit_fold,
+                    [pipeline] * len(tasks),
+                    [features for features, _ in tasks],
+                    [target for _, target in tasks],
+                )
+            )
+
+    def _labels(self, frame: pd.DataFrame) -> np.ndarray:
+        close = frame["close"].to_numpy(dtype=float)
+        if self.label == "forward_return":
+            return forward_return_labels(close, self.label_horizon)
+        return tp_before_sl_labels(
+            close,
+            frame["high"].to_numpy(dtype=float),
+            frame["low"].to_numpy(dtype=float),
+            frame["atr"].to_numpy(dtype=float),
+            self.label_horizon,
+            stop_multiplier=self.atr_multiplier_stop,
+            tp_multiplier=self.atr_multiplier_tp,
+        )
+
     def _run_fold(
         self,
         symbol: str,
-        train_slice: pd.DataFrame,
         test_slice: pd.DataFrame,
-        feature_engine: FeatureEngine,
+        test_features: pd.DataFrame,
         ensemble: EnsembleAggregator,
         risk_manager: RiskManager,
+        model: Any = None,
+        model_id: str = "fold",
     ) -> dict:
         cash = self.initial_cash
         shares = 0
@@ -90,15 +157,28 @@ class WalkForwardBacktester:
         take_profit = 0.0
         equity_curve: list[float] = []
         trades: list[float] = []
+        filled = test_features.fillna(0)
+        schema = FEATURE_SCHEMA if tuple(filled.columns) == FEATURE_SCHEMA.names else FeatureSchema(filled.columns)
+        rows = filled.to_numpy(dtype=float).tolist()
+        probabilities = None
+        if model is not None and rows:
+            probabilities = positive_probability(model, filled)
+        strategies = build_strategies(self.strategy_toggles)
+        columns = [strategy.name for strategy in strategies] + (["ml_model"] if probabilities is not None else [])
+        position = {name: pos for pos, name in enumerate(columns)}
+        confidences = np.full((len(rows), len(columns)), np.nan)
+        bar_intents: list[list] = []
+        for idx, row in enumerate(rows):
+            features = FeatureVector(symbol, row, schema)
+            intents = [signal for strategy in strategies if (signal := strategy.generate(features))]
+            if probabilities is not None:
+                intents.append(build_model_intent(features, float(probabilities[idx]), model_id))
+            for intent in intents:
+                confidences[idx, position[intent.strategy]] = intent.confidence
+            bar_intents.append(intents)
+        # One vectorised pass scores every bar; signals are only built for bars that can trade.
+        scores = ensemble.aggregate_batch(confidences, columns)
         for idx in range(len(test_slice)):
-            history = pd.concat([train_slice, test_slice.iloc[: idx + 1]])
-            features = feature_engine.compute(symbol, history)
-            intents = [
-                signal
-                for strategy in build_strategies(self.strategy_toggles)
-                if (signal := strategy.generate(features))
-            ]
-            final = ensemble.aggregate(intents)
             bar = test_slice.iloc[idx]
             if shares > 0:
                 exit_price = None
@@ -113,7 +193,8 @@ class WalkForwardBacktester:
                     entry_price = 0.0
                     stop = 0.0
                     take_profit = 0.0
-            if shares == 0 and final is not None:
+            if shares == 0 and scores[idx] >= ensemble.min_score:
+                final = ensemble.finalize(bar_intents[idx], float(scores[idx]))
                 portfolio = PortfolioSnapshot(cash=cash, equity=cash, open_positions=0)
                 decision, _ = risk_manager.evaluate(final, portfolio)
                 if decision.approved:
@@ -185,3 +266,8 @@ class WalkForwardBacktester:
             aggregate[key] = float(np.mean([metric[key] for metric in metrics_list]))
         aggregate["equity_samples"] = len(equity_curve)
         return aggregate
+
+
+def _fit_fold(pipeline: RetrainPipeline, features: pd.DataFrame, target: pd.Series) -> Any:
+    model, _ = pipeline.fit(features, target)
+    return model
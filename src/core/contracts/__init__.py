@@ -15,15 +15,21 @@ from .models import (
     SignalIntent,
     TestCenterCheck,
 )
+from .records import DecisionRecord, FeatureSchema, FeatureValues, FeatureVector, IntentRecord, SignalRecord
 
 __all__ = [
     "Bar",
     "BarSeries",
+    "DecisionRecord",
     "ExecutionReport",
+    "FeatureSchema",
+    "FeatureValues",
+    "FeatureVector",
     "Features",
     "FinalSignal",
     "FillEvent",
     "FundingAlert",
+    "IntentRecord",
     "MarketDataFrame",
     "ModelMeta",
     "ModelVersionMeta",
@@ -31,5 +37,6 @@ __all__ = [
     "OrderResult",
     "RiskDecision",
     "SignalIntent",
+    "SignalRecord",
     "TestCenterCheck",
 ]
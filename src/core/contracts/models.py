@@ -122,6 +122,7 @@ class FundingAlert(BaseModel):
     proposed_actions: List[str]
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     details: Dict[str, float] = Field(default_factory=dict)
+    orders: List[OrderRequest] = Field(default_factory=list)
 
 
 class ModelVersionMeta(BaseModel):
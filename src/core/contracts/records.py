@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.core.contracts.models import Features, FinalSignal, RiskDecision, SignalIntent
+
+
+class FeatureSchema:
+    """Ordered feature names with a name -> position index shared by every vector."""
+
+    __slots__ = ("names", "index")
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: pos for pos, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class FeatureValues(Mapping):
+    """Read-only ``values`` view over a ``FeatureVector`` so strategies keep ``values["close"]``."""
+
+    __slots__ = ("_schema", "_data")
+
+    def __init__(self, schema: FeatureSchema, data: Sequence[float]) -> None:
+        self._schema = schema
+        self._data = data
+
+    def __getitem__(self, name: str) -> float:
+        return self._data[self._schema.index[name]]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        pos = self._schema.index.get(name)
+        return default if pos is None else self._data[pos]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._schema.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema.names)
+
+    def __len__(self) -> int:
+        return len(self._schema.names)
+
+
+class FeatureVector:
+    """Fixed-schema feature row indexed by position; converts to ``Features`` at boundaries."""
+
+    __slots__ = ("symbol", "schema", "data", "schema_version")
+
+    def __init__(self, symbol: str, data: Sequence[float], schema: FeatureSchema, schema_version: str = "v1") -> None:
+        self.symbol = symbol
+        self.data = data
+        self.schema = schema
+        self.schema_version = schema_version
+
+    @classmethod
+    def from_mapping(cls, symbol: str, values: Mapping, schema: Optional[FeatureSchema] = None) -> "FeatureVector":
+        schema = schema or FeatureSchema(list(values))
+        return cls(symbol, [float(values.get(name, 0.0)) for name in schema.names], schema)
+
+    @property
+    def values(self) -> FeatureValues:
+        return FeatureValues(self.schema, self.data)
+
+    def to_model(self) -> Features:
+        return Features(schema_version=self.schema_version, symbol=self.symbol, values=dict(self.values))
+
+
+class IntentRecord(NamedTuple):
+    symbol: str
+    confidence: float
+    entry: float
+    stop: float
+    take_profit: float
+    reasons: Tuple[str, ...]
+    strategy: str
+    strength: str = "medium"
+    side: str = "LONG"
+
+    def to_model(self) -> SignalIntent:
+        return SignalIntent(
+            symbol=self.symbol,
+            side=self.side,
+            confidence=self.confidence,
+            entry=self.entry,
+            stop=self.stop,
+            take_profit=self.take_profit,
+            reasons=list(self.reasons),
+            strategy=self.strategy,
+            strength=self.strength,
+        )
+
+
+class SignalRecord:
+    __slots__ = ("symbol", "score", "entry", "stop", "take_profit", "reasons", "intents", "side")
+
+    def __init__(
+        self,
+        symbol: str,
+        score: float,
+        entry: float,
+        stop: float,
+        take_profit: float,
+        reasons: List[str],
+        intents: Sequence[Any],
+        side: str = "LONG",
+    ) -> None:
+        self.symbol = symbol
+        self.score = score
+        self.entry = entry
+        self.stop = stop
+        self.take_profit = take_profit
+        self.reasons = reasons
+        self.intents = intents
+        self.side = side
+
+    def to_model(self) -> FinalSignal:
+        return FinalSignal(
+            symbol=self.symbol,
+            side=self.side,
+            score=self.score,
+            entry=self.entry,
+            stop=self.stop,
+            take_profit=self.take_profit,
+            reasons=list(self.reasons),
+            intents=[intent.to_model() if hasattr(intent, "to_model") else intent for intent in self.intents],
+        )
+
+    def model_dump(self) -> Dict[str, Any]:
+        return self.to_model().model_dump()
+
+
+class DecisionRecord:
+    __slots__ = ("symbol", "outcome", "approved", "shares", "cash_required", "reasons", "constraints")
+
+    def __init__(
+        self,
+        symbol: str,
+        outcome: str,
+        approved: bool,
+        shares: int,
+        cash_required: float,
+        reasons: List[str],
+        constraints: Dict[str, float],
+    ) -> None:
+        self.symbol = symbol
+        self.outcome = outcome
+        self.approved = approved
+        self.shares = shares
+        self.cash_required = cash_required
+        self.reasons = reasons
+        self.constraints = constraints
+
+    def to_model(self) -> RiskDecision:
+        return RiskDecision(**self.model_dump())
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "outcome": self.outcome,
+            "approved": self.approved,
+            "shares": self.shares,
+            "cash_required": self.cash_required,
+            "reasons": list(self.reasons),
+            "constraints": dict(self.constraints),
+        }
@@ -1,6 +1,7 @@
 from src.core.data.alpaca_client import AlpacaClient, AlpacaCredentials, MockAlpacaClient
 from src.core.data.cache import DataCache
 from src.core.data.market_data import MarketDataProvider
+from src.core.data.paper_broker import PaperBroker
 
 __all__ = [
     "AlpacaClient",
@@ -8,4 +9,5 @@ __all__ = [
     "MockAlpacaClient",
     "DataCache",
     "MarketDataProvider",
+    "PaperBroker",
 ]
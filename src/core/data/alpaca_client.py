@@ -81,6 +81,14 @@ class AlpacaClient:
             data[symbol] = df[["ts", "open", "high", "low", "close", "volume"]]
         return data
 
+    def get_latest_prices(self, symbols: list[str]) -> dict[str, float]:
+        from alpaca.data.requests import StockLatestTradeRequest
+
+        if not symbols:
+            return {}
+        trades = self._data.get_stock_latest_trade(StockLatestTradeRequest(symbol_or_symbols=symbols))
+        return {symbol: float(trade.price) for symbol, trade in trades.items()}
+
     def submit_order(self, request: OrderRequest) -> OrderResult:
         from alpaca.trading.enums import OrderClass, TimeInForce
         from alpaca.trading.requests import LimitOrderRequest, MarketOrderRequest, StopLossRequest, TakeProfitRequest
@@ -182,6 +190,9 @@ class MockAlpacaClient:
     def get_daily_bars_batch(self, symbols: list[str], limit: int = 200) -> dict[str, pd.DataFrame]:
         return {symbol: self.get_daily_bars(symbol, limit=limit) for symbol in symbols}
 
+    def get_latest_prices(self, symbols: list[str]) -> dict[str, float]:
+        return {symbol: float(self.get_daily_bars(symbol, limit=2)["close"].iloc[-1]) for symbol in symbols}
+
     def submit_order(self, request: OrderRequest) -> OrderResult:
         return OrderResult(
             order_id=f"mock-{uuid4()}",
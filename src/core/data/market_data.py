@@ -14,7 +14,7 @@ class MarketDataProvider:
 
     def get_daily_bars(self, symbol: str, limit: int = 200) -> pd.DataFrame:
         cached = self.cache.load_daily_bars(symbol, limit)
-        if cached is not None and not cached.empty:
+        if self._fresh(cached):
             return cached
         bars = self.client.get_daily_bars(symbol, limit=limit)
         self.cache.save_daily_bars(symbol, bars)
@@ -25,7 +25,7 @@ class MarketDataProvider:
         missing: list[str] = []
         for symbol in symbols:
             cached = self.cache.load_daily_bars(symbol, limit)
-            if cached is not None and not cached.empty:
+            if self._fresh(cached):
                 results[symbol] = cached
             else:
                 missing.append(symbol)
@@ -42,3 +42,10 @@ class MarketDataProvider:
             self.cache.save_daily_bars(symbol, bars)
             results[symbol] = bars
         return results
+
+    def _fresh(self, cached: pd.DataFrame | None) -> bool:
+        if cached is None or cached.empty:
+            return False
+        # A simulated clock (PaperBroker) moves between cycles; bars cached before it moved are stale.
+        now = getattr(self.client, "now", None)
+        return now is None or pd.to_datetime(cached["ts"].iloc[-1], utc=True) >= now
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+import itertools
+import threading
+import time
+from typing import ClassVar, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.contracts import OrderRequest, OrderResult
+from src.core.data.synthetic import PriceModel, SyntheticMarketGenerator
+from src.core.execution.slippage import SlippageModel
+
+OPEN_STATUSES = {"new", "accepted", "held"}
+
+
+@dataclass
+class PaperOrder:
+    order_id: str
+    symbol: str
+    side: str
+    quantity: int
+    order_type: str = "market"
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    parent_id: Optional[str] = None
+    client_order_id: Optional[str] = None
+    bracket: tuple[Optional[float], Optional[float]] = (None, None)  # (stop_loss, take_profit) legs once filled
+    status: str = "new"
+    filled_qty: int = 0
+    average_fill_price: Optional[float] = None
+
+    def result(self) -> OrderResult:
+        return OrderResult(
+            order_id=self.order_id,
+            symbol=self.symbol,
+            status=self.status,
+            filled_qty=self.filled_qty,
+            average_fill_price=self.average_fill_price,
+            raw={"paper": "true"},
+        )
+
+
+@dataclass
+class PaperBroker:
+    """In-process broker simulator with the ``AlpacaClient`` interface.
+
+    Keeps a cash and position ledger over synthetic bars from ``PriceModel``
+    (or ``SyntheticMarketGenerator`` for correlated symbols).
+    The simulated clock sits on bar ``history_days - 1`` of a ``history_days +
+    horizon_days`` path; ``advance`` steps it forward, and resting orders are
+    matched against each new bar. Market orders fill at the current close;
+    limit, stop and bracket legs fill at their level, or at the open when the
+    bar gaps through it. When a bar touches both legs of a bracket, the stop is
+    assumed to fill first. Every fill pays ``SlippageModel`` costs. Each call
+    can be delayed (``latency_seconds`` +- ``latency_jitter``) or fail with a
+    ``ConnectionError`` at ``failure_rate``, both drawn from ``seed``.
+    """
+
+    is_mock: ClassVar[bool] = True
+
+    price_model: PriceModel | SyntheticMarketGenerator = field(default_factory=PriceModel)
+    slippage_model: SlippageModel = field(default_factory=lambda: SlippageModel(spread_bps=2.0, fee_bps=1.0))
+    starting_cash: float = 100_000.0
+    history_days: int = 756
+    horizon_days: int = 252
+    end: str = "2024-12-31"  # date of the last bar of the path, so runs are reproducible
+    latency_seconds: float = 0.0
+    latency_jitter: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+    cash: float = field(init=False)
+    cursor: int = field(init=False)
+    _positions: Dict[str, list[float]] = field(default_factory=dict, init=False, repr=False)  # [qty, cost basis]
+    _orders: Dict[str, PaperOrder] = field(default_factory=dict, init=False, repr=False)
+    _client_ids: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _bars: Dict[str, dict[str, np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+    _ts: pd.DatetimeIndex = field(init=False, repr=False)
+    _ids: itertools.count = field(default_factory=itertools.count, init=False, repr=False)
+    _faults: np.random.Generator = field(init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.cash = float(self.starting_cash)
+        self.cursor = self.history_days - 1
+        self._ts = pd.bdate_range(end=self.end, periods=self.history_days + self.horizon_days, tz="UTC")
+        self._faults = np.random.default_rng(self.seed)
+
+    @property
+    def now(self) -> pd.Timestamp:
+        return self._ts[self.cursor]
+
+    def get_account(self) -> dict:
+        self._call()
+        with self._lock:
+            equity = self.cash + sum(qty * self._price(symbol) for symbol, (qty, _) in self._positions.items())
+            return {
+                "id": "paper-account",
+                "cash": f"{self.cash:.2f}",
+                "equity": f"{equity:.2f}",
+                "portfolio_value": f"{equity:.2f}",
+                "buying_power": f"{self.cash:.2f}",
+                "status": "ACTIVE",
+            }
+
+    def get_daily_bars(self, symbol: str, limit: int = 200) -> pd.DataFrame:
+        self._call()
+        return self._frame(symbol, limit)
+
+    def get_daily_bars_batch(self, symbols: list[str], limit: int = 200) -> dict[str, pd.DataFrame]:
+        self._call()
+        return {symbol: self._frame(symbol, limit) for symbol in symbols}
+
+    def get_latest_prices(self, symbols: list[str]) -> dict[str, float]:
+        self._call()
+        with self._lock:
+            return {symbol: self._price(symbol) for symbol in symbols}
+
+    def submit_order(self, request: OrderRequest) -> OrderResult:
+        self._call()
+        with self._lock:
+            if request.client_order_id and request.client_order_id in self._client_ids:
+                return self._orders[self._client_ids[request.client_order_id]].result()
+            order = self._new_order(
+                request.symbol,
+                request.side,
+                request.quantity,
+                order_type=request.order_type,
+                limit_price=request.limit_price,
+                client_order_id=request.client_order_id,
+                bracket=(request.stop_loss, request.take_profit),
+            )
+            if request.order_type == "limit" and request.limit_price is None:
+                order.status = "rejected"
+            elif request.order_type == "market" or self._marketable(order, self._price(request.symbol)):
+                self._fill(order, self._price(request.symbol))
+            else:
+                order.status = "accepted"
+            if order.filled_qty and order.side == "buy":
+                self._attach_bracket(order)
+            return order.result()
+
+    def list_positions(self) -> list[dict]:
+        self._call()
+        with self._lock:
+            rows = []
+            for symbol, (qty, basis) in self._positions.items():
+                price = self._price(symbol)
+                value = qty * price
+                rows.append(
+                    {
+                        "symbol": symbol,
+                        "qty": str(int(qty)),
+                        "side": "long",
+                        "avg_entry_price": f"{basis / qty:.4f}",
+                        "current_price": f"{price:.4f}",
+                        "market_value": f"{value:.2f}",
+                        "cost_basis": f"{basis:.2f}",
+                        "unrealized_pl": f"{value - basis:.2f}",
+                    }
+                )
+            return rows
+
+    def list_orders(self, status: str = "open") -> list[dict]:
+        with self._lock:
+            orders = self._orders.values()
+            if status == "open":
+                orders = [order for order in orders if order.status in OPEN_STATUSES]
+            return [asdict(order) for order in orders]
+
+    def cancel_order(self, order_id: str) -> None:
+        self._call()
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None:
+                raise ValueError(f"Unknown order: {order_id}")
+            for other in self._orders.values():
+                if other.status in OPEN_STATUSES and (other is order or other.parent_id == order_id):
+                    other.status = "canceled"
+
+    def advance(self, days: int = 1) -> list[OrderResult]:
+        """Step the clock ``days`` bars, matching resting orders on each; returns the fills."""
+        fills: list[OrderResult] = []
+        with self._lock:
+            for _ in range(days):
+                if self.cursor + 1 >= len(self._ts):
+                    raise ValueError("Paper broker reached the end of its simulated horizon.")
+                self.cursor += 1
+                fills += self._match_bar()
+        return fills
+
+    def _match_bar(self) -> list[OrderResult]:
+        resting = [order for order in self._orders.values() if order.status in OPEN_STATUSES]
+        if not resting:
+            return []
+        bars = [self._series(order.symbol) for order in resting]
+        open_, high, low = (np.array([bar[name][self.cursor] for bar in bars]) for name in ("open", "high", "low"))
+        is_buy = np.array([order.side == "buy" for order in resting])
+        stop = np.array([order.stop_price if order.stop_price is not None else np.nan for order in resting])
+        limit = np.array([order.limit_price if order.limit_price is not None else np.nan for order in resting])
+        stop_hit = low <= stop  # sell stops (bracket stop-loss legs)
+        limit_hit = np.where(is_buy, low <= limit, high >= limit)
+        price = np.where(
+            stop_hit,
+            np.minimum(open_, stop),
+            np.where(is_buy, np.minimum(open_, limit), np.maximum(open_, limit)),
+        )
+        fills = []
+        # Stops first, so a bar touching both bracket legs cancels the take-profit.
+        for pos in np.concatenate([np.flatnonzero(stop_hit), np.flatnonzero(limit_hit)]):
+            order = resting[pos]
+            if order.status not in OPEN_STATUSES:
+                continue  # its bracket sibling filled earlier in this bar
+            self._fill(order, float(price[pos]))
+            if order.filled_qty:
+                fills.append(order.result())
+                if order.parent_id is not None:
+                    self._cancel_siblings(order)
+                elif order.side == "buy":
+                    self._attach_bracket(order)
+        return fills
+
+    def _cancel_siblings(self, order: PaperOrder) -> None:
+        for other in self._orders.values():
+            if other.parent_id == order.parent_id and other is not order and other.status in OPEN_STATUSES:
+                other.status = "canceled"
+
+    def _attach_bracket(self, parent: PaperOrder) -> None:
+        stop_loss, take_profit = parent.bracket
+        if stop_loss is not None:
+            leg = self._new_order(parent.symbol, "sell", parent.filled_qty, order_type="stop", parent_id=parent.order_id)
+            leg.stop_price, leg.status = float(stop_loss), "held"
+        if take_profit is not None:
+            leg = self._new_order(parent.symbol, "sell", parent.filled_qty, order_type="limit", parent_id=parent.order_id)
+            leg.limit_price, leg.status = float(take_profit), "held"
+
+    def _new_order(self, symbol: str, side: str, quantity: int, **kwargs) -> PaperOrder:
+        order = PaperOrder(order_id=f"paper-{next(self._ids)}", symbol=symbol, side=side, quantity=quantity, **kwargs)
+        self._orders[order.order_id] = order
+        if order.client_order_id:
+            self._client_ids[order.client_order_id] = order.order_id
+        return order
+
+    def _fill(self, order: PaperOrder, price: float) -> None:
+        quantity = order.quantity
+        held, basis = self._positions.get(order.symbol, [0.0, 0.0])
+        if order.side == "sell":
+            # Long-only ledger: a sell (including a stale bracket leg) never goes below flat.
+            quantity = min(quantity, int(held))
+            if quantity <= 0:
+                order.status = "rejected" if order.parent_id is None else "canceled"
+                return
+        cost = self.slippage_model.estimate_cost(price, quantity)
+        if order.side == "buy":
+            if price * quantity + cost > self.cash:
+                order.status = "rejected"
+                return
+            self.cash -= price * quantity + cost
+            self._positions[order.symbol] = [held + quantity, basis + price * quantity + cost]
+            fill_price = price + cost / quantity
+        else:
+            self.cash += price * quantity - cost
+            if quantity >= held:
+                self._positions.pop(order.symbol, None)
+            else:
+                self._positions[order.symbol] = [held - quantity, basis * (held - quantity) / held]
+            fill_price = price - cost / quantity
+        order.filled_qty = quantity
+        order.average_fill_price = round(fill_price, 6)
+        order.status = "filled" if quantity == order.quantity else "partially_filled"
+
+    @staticmethod
+    def _marketable(order: PaperOrder, price: float) -> bool:
+        return price <= order.limit_price if order.side == "buy" else price >= order.limit_price
+
+    def _series(self, symbol: str) -> dict[str, np.ndarray]:
+        bars = self._bars.get(symbol)
+        if bars is None:
+            bars = self._bars[symbol] = self.price_model.generate(symbol, len(self._ts), calendar=self._ts)
+        return bars
+
+    def _price(self, symbol: str) -> float:
+        return float(self._series(symbol)["close"][self.cursor])
+
+    def _frame(self, symbol: str, limit: int) -> pd.DataFrame:
+        with self._lock:
+            stop = self.cursor + 1
+            start = max(stop - limit, 0)
+            bars = self._series(symbol)
+            return pd.DataFrame({"ts": self._ts[start:stop], **{name: bars[name][start:stop] for name in bars}})
+
+    def _call(self) -> None:
+        with self._lock:
+            delay = self.latency_seconds + self.latency_jitter * self._faults.standard_normal() if self.latency_seconds else 0.0
+            failed = self.failure_rate > 0 and self._faults.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise ConnectionError("Simulated paper broker failure.")
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Sequence
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from src.core.data.cache import DataCache
+
+TRADING_DAYS = 252
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def symbol_seed(symbol: str, seed: int = 0) -> int:
+    """Stable per-symbol seed (``hash()`` is salted per process, crc32 is not)."""
+    return zlib.crc32(f"{seed}:{symbol}".encode("utf-8"))
+
+
+@dataclass
+class PriceModel:
+    """Deterministic daily OHLCV paths, one independent generator per symbol.
+
+    ``gbm`` is geometric Brownian motion; ``regime`` switches between a calm
+    and a stressed (drift, volatility) state with geometric durations of mean
+    ``calm_days`` / ``stressed_days``. Each symbol draws its own starting
+    price, volatility scale and volume level from its seed, so symbols differ
+    but the same (symbol, seed) always yields the same path.
+    """
+
+    kind: str = "gbm"
+    seed: int = 0
+    drift: float = 0.07  # annualised
+    volatility: float = 0.25  # annualised; the calm state under "regime"
+    stressed_drift: float = -0.25
+    stressed_volatility: float = 0.55
+    calm_days: float = 120.0
+    stressed_days: float = 20.0
+    gap_volatility: float = 0.3  # overnight move as a fraction of the daily volatility
+    volume: float = 1_000_000.0
+
+    def generate(self, symbol: str, length: int, calendar: pd.DatetimeIndex | None = None) -> dict[str, np.ndarray]:
+        """``length`` bars as arrays keyed by ``BAR_COLUMNS`` (``calendar`` is unused: no weekday effects)."""
+        rng = np.random.default_rng(symbol_seed(symbol, self.seed))
+        start_price = float(np.exp(rng.uniform(np.log(10.0), np.log(500.0))))
+        scale = rng.uniform(0.6, 1.6)
+        level = self.volume * np.exp(rng.normal(0.0, 0.75))
+        drift = np.full(length, self.drift)
+        sigma = np.full(length, self.volatility * scale)
+        if self.kind == "regime":
+            stressed = _spells(rng, length, self.calm_days, self.stressed_days)
+            drift[stressed] = self.stressed_drift
+            sigma[stressed] = self.stressed_volatility * scale
+        elif self.kind != "gbm":
+            raise ValueError(f"Unsupported price model: {self.kind}")
+        daily = sigma / np.sqrt(TRADING_DAYS)
+        shocks = rng.standard_normal((4, length))
+        returns = (drift - sigma**2 / 2) / TRADING_DAYS + daily * shocks[0]
+        close = start_price * np.exp(np.cumsum(returns))
+        previous = np.concatenate([[start_price], close[:-1]])
+        open_ = previous * np.exp(self.gap_volatility * daily * shocks[1])
+        high = np.maximum(open_, close) * np.exp(np.abs(shocks[2]) * daily * 0.5)
+        low = np.minimum(open_, close) * np.exp(-np.abs(shocks[3]) * daily * 0.5)
+        # Volume rises with the size of the day's move.
+        volume = np.round(level * (1 + np.abs(returns) / daily) * rng.lognormal(0.0, 0.25, length))
+        return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+    def bars(self, symbol: str, length: int, end: pd.Timestamp | str | None = None) -> pd.DataFrame:
+        """``generate`` as a bar frame on business days ending at ``end`` (default today)."""
+        ts = _calendar(length, end)
+        return pd.DataFrame({"ts": ts, **self.generate(symbol, length)})
+
+
+@dataclass
+class MarketPanel:
+    """Columnar bars: one (days x symbols) array per field."""
+
+    ts: pd.DatetimeIndex
+    symbols: list[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def field(self, name: str) -> pd.DataFrame:
+        return pd.DataFrame(getattr(self, name), index=self.ts, columns=self.symbols)
+
+    def returns(self) -> pd.DataFrame:
+        """Daily close-to-close simple returns, the layout ``daily_returns`` produces."""
+        return self.field("close").pct_change().iloc[1:]
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """One symbol's bars in the client/``DataCache`` layout."""
+        pos = self.symbols.index(symbol)
+        return pd.DataFrame({"ts": self.ts, **{name: getattr(self, name)[:, pos] for name in BAR_COLUMNS}})
+
+    def save(self, path: str | Path) -> None:
+        np.savez(
+            path,
+            ts=self.ts.asi8,
+            symbols=np.array(self.symbols),
+            **{name: getattr(self, name) for name in BAR_COLUMNS},
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "MarketPanel":
+        with np.load(path) as data:
+            return cls(
+                ts=pd.DatetimeIndex(data["ts"], tz="UTC"),
+                symbols=data["symbols"].tolist(),
+                **{name: data[name] for name in BAR_COLUMNS},
+            )
+
+
+@dataclass
+class SyntheticMarketGenerator:
+    """Correlated multi-symbol daily bars from a factor model.
+
+    Log returns are ``drift + loadings @ factors + idiosyncratic + jumps``: a
+    market factor, ``style_factors`` random styles and one factor per sector
+    in ``sectors``. A market-wide calm/stressed regime scales factor
+    volatility by ``stressed_multiplier`` (idiosyncratic by its square root),
+    so correlations rise in stress. Overnight gaps arrive with
+    ``gap_probability`` per symbol-day; volume follows a per-symbol level, a
+    weekday profile and the size of the move.
+
+    Every factor and every symbol draws from its own seed, so a symbol's
+    bars do not depend on the rest of the universe or on ``chunk_size``. The
+    per-symbol draws are single vector calls; everything else is array math
+    over (days x chunk) blocks.
+    """
+
+    seed: int = 0
+    drift: float = 0.06  # annualised
+    market_volatility: float = 0.16
+    style_factors: int = 2
+    style_volatility: float = 0.08
+    sector_volatility: float = 0.10
+    idio_volatility: float = 0.25
+    calm_days: float = 250.0
+    stressed_days: float = 40.0
+    stressed_multiplier: float = 2.5
+    gap_probability: float = 0.01
+    gap_size: float = 0.06
+    gap_volatility: float = 0.3  # ordinary overnight move as a fraction of daily volatility
+    volume: float = 1_000_000.0
+    weekday_profile: tuple[float, ...] = (1.08, 0.98, 0.96, 0.97, 1.01)
+    sectors: Optional[Mapping[str, str]] = None
+    dtype: str = "float64"
+    _states: Dict[int, dict[str, np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+
+    def panel(self, symbols: Sequence[str], days: int, end: pd.Timestamp | str | None = None) -> MarketPanel:
+        """All of ``symbols`` in one panel (5,000 x 2,520 float64 is ~0.5 GB; see ``iter_panels``)."""
+        return next(self.iter_panels(symbols, days, chunk_size=max(len(symbols), 1), end=end))
+
+    def iter_panels(
+        self,
+        symbols: Sequence[str],
+        days: int,
+        chunk_size: int = 500,
+        end: pd.Timestamp | str | None = None,
+    ) -> Iterator[MarketPanel]:
+        """Panels of up to ``chunk_size`` symbols sharing one calendar, factor path and regime."""
+        ts = _calendar(days, end)
+        state = self._state(days)
+        weekday = self._weekday(ts)
+        for start in range(0, len(symbols), chunk_size):
+            names = list(symbols[start : start + chunk_size])
+            yield MarketPanel(ts, names, **self._bars(names, days, state, weekday))
+
+    def write_cache(
+        self,
+        cache: DataCache,
+        symbols: Sequence[str],
+        days: int,
+        chunk_size: int = 500,
+        end: pd.Timestamp | str | None = None,
+    ) -> int:
+        """Save every symbol's bars through ``cache``; returns the symbols written."""
+        written = 0
+        for chunk in self.iter_panels(symbols, days, chunk_size=chunk_size, end=end):
+            for symbol in chunk.symbols:
+                cache.save_daily_bars(symbol, chunk.frame(symbol))
+            written += len(chunk.symbols)
+        return written
+
+    def generate(self, symbol: str, length: int, calendar: pd.DatetimeIndex | None = None) -> dict[str, np.ndarray]:
+        """One symbol's bars as arrays, the ``PriceModel`` interface ``PaperBroker`` uses.
+
+        ``calendar`` holds the bar dates (default: ``length`` business days to
+        today), so the volume weekday profile lines up with ``iter_panels``.
+        """
+        if length not in self._states:
+            self._states.clear()
+            self._states[length] = self._state(length)
+        weekday = self._weekday(calendar if calendar is not None else _calendar(length, None))
+        bars = self._bars([symbol], length, self._states[length], weekday)
+        return {name: values[:, 0] for name, values in bars.items()}
+
+    def _weekday(self, ts: pd.DatetimeIndex) -> np.ndarray:
+        return np.asarray(self.weekday_profile, dtype=float)[np.minimum(ts.weekday, 4)]
+
+    def _state(self, days: int) -> dict[str, np.ndarray]:
+        """Market-wide draws: the stress multiplier and every factor's daily returns."""
+        stressed = _spells(
+            np.random.default_rng(symbol_seed("__regime__", self.seed)), days, self.calm_days, self.stressed_days
+        )
+        multiplier = np.where(stressed, self.stressed_multiplier, 1.0)
+        names = ["__market__", *(f"__style{i}__" for i in range(self.style_factors)), *self._sector_names()]
+        vols = [self.market_volatility, *[self.style_volatility] * self.style_factors]
+        daily = np.array(vols + [self.sector_volatility] * (len(names) - len(vols))) / np.sqrt(TRADING_DAYS)
+        draws = np.column_stack([np.random.default_rng(symbol_seed(name, self.seed)).standard_normal(days) for name in names])
+        return {"multiplier": multiplier, "factors": draws * daily * multiplier[:, None], "variance": daily**2}
+
+    def _sector_names(self) -> list[str]:
+        return [f"__sector_{name}__" for name in sorted(set((self.sectors or {}).values()))]
+
+    def _bars(
+        self, names: list[str], days: int, state: dict[str, np.ndarray], weekday: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        size, factors = len(names), state["factors"]
+        sector_row = {name: row for row, name in enumerate(self._sector_names(), start=1 + self.style_factors)}
+        loadings = np.zeros((factors.shape[1], size))
+        params = np.empty((4, size))  # start price, idiosyncratic vol, volume level, drift
+        shocks = np.empty((6, days, size))  # idiosyncratic, overnight, high, low, volume, jump size
+        gaps = np.empty((days, size))
+        for col, symbol in enumerate(names):
+            rng = np.random.default_rng(symbol_seed(symbol, self.seed))
+            loadings[0, col] = rng.normal(1.0, 0.3)
+            loadings[1 : 1 + self.style_factors, col] = rng.normal(0.0, 0.5, self.style_factors)
+            sector = (self.sectors or {}).get(symbol)
+            if sector is not None:
+                loadings[sector_row[f"__sector_{sector}__"], col] = rng.uniform(0.6, 1.2)
+            params[:, col] = (
+                np.exp(rng.uniform(np.log(10.0), np.log(500.0))),
+                self.idio_volatility * rng.uniform(0.5, 1.5),
+                self.volume * np.exp(rng.normal(0.0, 0.75)),
+                self.drift + rng.normal(0.0, 0.03),
+            )
+            shocks[:, :, col] = rng.standard_normal((6, days))
+            gaps[:, col] = rng.random(days)
+        start_price, idio, level, drift = params
+        multiplier = state["multiplier"][:, None]
+        idio_daily = idio / np.sqrt(TRADING_DAYS)
+        # Calm-regime daily volatility per symbol: the Ito correction and the volume scale.
+        daily = np.sqrt(state["variance"] @ loadings**2 + idio_daily**2)
+
+        jumps = np.where(gaps < self.gap_probability, self.gap_size * shocks[5], 0.0)
+        returns = factors @ loadings + idio_daily * np.sqrt(multiplier) * shocks[0] + jumps
+        returns += drift / TRADING_DAYS - daily**2 / 2
+        close = start_price * np.exp(np.cumsum(returns, axis=0))
+        previous = np.vstack([start_price, close[:-1]])
+        open_ = previous * np.exp(jumps + self.gap_volatility * daily * shocks[1])
+        high = np.maximum(open_, close) * np.exp(np.abs(shocks[2]) * daily * 0.5)
+        low = np.minimum(open_, close) * np.exp(-np.abs(shocks[3]) * daily * 0.5)
+        volume = level * weekday[:, None] * (1 + np.abs(returns) / daily) * np.sqrt(multiplier)
+        volume = np.round(volume * np.exp(0.25 * shocks[4]))
+        dtype = np.dtype(self.dtype)
+        return {
+            name: values.astype(dtype, copy=False)
+            for name, values in zip(BAR_COLUMNS, (open_, high, low, close, volume))
+        }
+
+
+def _calendar(days: int, end: pd.Timestamp | str | None) -> pd.DatetimeIndex:
+    """``days`` business days ending at ``end`` (default today), in UTC."""
+    end = pd.Timestamp(end or pd.Timestamp.now(tz="UTC").normalize())
+    return pd.bdate_range(end=end, periods=days, tz=end.tz or "UTC")
+
+
+def _spells(rng: np.random.Generator, length: int, calm_days: float, stressed_days: float) -> np.ndarray:
+    """Alternating calm/stressed spells with geometric durations; True on stressed days."""
+    # ``length`` spells always cover the path, since every spell lasts at least a day.
+    means = np.tile([calm_days, stressed_days], length // 2 + 1)
+    durations = rng.geometric(1.0 / np.maximum(means, 1.0))
+    return (np.repeat(np.arange(len(durations)) % 2, durations)[:length]).astype(bool)
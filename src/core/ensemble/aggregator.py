@@ -1,25 +1,68 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
 
-from src.core.contracts import FinalSignal, SignalIntent
+import numpy as np
+
+from src.core.contracts import IntentRecord, SignalIntent, SignalRecord
+from src.core.ensemble.learner import OnlineWeightLearner
 
 
 @dataclass
 class EnsembleAggregator:
+    """Combines strategy intents into one score per symbol.
+
+    ``weighted`` is the weight-averaged confidence of the strategies that fired;
+    ``majority`` is the weighted share of the panel (``strategies`` plus whatever
+    fired) voting with confidence >= ``vote_threshold``; ``stacking`` is a
+    logistic model over per-strategy confidences (0 when a strategy is silent)
+    and falls back to ``weighted`` until it has coefficients. With a ``learner``
+    attached, configured weights are scaled by its learned per-strategy weight.
+    A strategy fires when its confidence is positive; zero-confidence intents
+    are ignored, and a panel whose weights sum to zero scores 0.
+    """
+
     min_score: float = 0.7
+    method: str = "weighted"
+    weights: Dict[str, float] = field(default_factory=dict)  # missing strategies weigh 1.0
+    strategies: Tuple[str, ...] = ()
+    vote_threshold: float = 0.5
+    stacking_coefficients: Dict[str, float] = field(default_factory=dict)
+    stacking_intercept: float = 0.0
+    learner: Optional[OnlineWeightLearner] = None
 
-    def aggregate(self, intents: list[SignalIntent]) -> FinalSignal | None:
+    def aggregate(self, intents: list[IntentRecord | SignalIntent]) -> SignalRecord | None:
+        intents = [intent for intent in intents if intent.confidence > 0]
         if not intents:
             return None
-        score = sum(intent.confidence for intent in intents) / len(intents)
+        score = self.score(intents)
         if score < self.min_score:
             return None
+        return self.finalize(intents, score)
+
+    def score(self, intents: Sequence[IntentRecord | SignalIntent]) -> float:
+        intents = [intent for intent in intents if intent.confidence > 0]
+        if self.method == "majority":
+            voters = {intent.strategy for intent in intents}.union(self.strategies)
+            votes = sum(self._weight(i.strategy) for i in intents if i.confidence >= self.vote_threshold)
+            panel = sum(self._weight(name) for name in voters)
+            return votes / panel if panel > 0 else 0.0
+        if self.method == "stacking" and self.stacking_coefficients:
+            logit = self.stacking_intercept + sum(
+                self.stacking_coefficients.get(intent.strategy, 0.0) * intent.confidence for intent in intents
+            )
+            return float(1.0 / (1.0 + np.exp(-logit)))
+        weights = [self._weight(intent.strategy) for intent in intents]
+        total = sum(weights)
+        return sum(w * intent.confidence for w, intent in zip(weights, intents)) / total if total > 0 else 0.0
+
+    def finalize(self, intents: Sequence[IntentRecord | SignalIntent], score: float) -> SignalRecord:
         top = max(intents, key=lambda x: x.confidence)
         reasons = []
         for intent in intents:
             reasons.extend(intent.reasons)
-        return FinalSignal(
+        return SignalRecord(
             symbol=top.symbol,
             score=score,
             entry=top.entry,
@@ -28,3 +71,61 @@ class EnsembleAggregator:
             reasons=reasons,
             intents=intents,
         )
+
+    def aggregate_batch(self, confidences: np.ndarray, strategies: Sequence[str]) -> np.ndarray:
+        """Scores for a (rows x strategies) confidence matrix in one pass.
+
+        NaN or non-positive entries mean the strategy did not fire; rows where
+        nothing fired score NaN. Row ``i`` equals ``score`` on that row's intents.
+        """
+        matrix = np.asarray(confidences, dtype=float).reshape(-1, len(strategies))
+        fired = np.isfinite(matrix) & (matrix > 0)
+        values = np.where(fired, matrix, 0.0)
+        any_fired = fired.any(axis=1)
+        if self.method == "majority":
+            weights = np.array([self._weight(name) for name in strategies])
+            silent_panel = sum(self._weight(name) for name in set(self.strategies).difference(strategies))
+            votes = (fired & (values >= self.vote_threshold)) @ weights
+            panel = weights.sum() + silent_panel
+            scores = votes / panel if panel > 0 else np.zeros(len(matrix))
+        elif self.method == "stacking" and self.stacking_coefficients:
+            coefficients = np.array([self.stacking_coefficients.get(name, 0.0) for name in strategies])
+            scores = 1.0 / (1.0 + np.exp(-(self.stacking_intercept + values @ coefficients)))
+        else:
+            weights = np.array([self._weight(name) for name in strategies])
+            total = fired @ weights
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores = np.where(total > 0, (values @ weights) / total, 0.0)
+        return np.where(any_fired, scores, np.nan)
+
+    def fit_stacking(
+        self,
+        confidences: np.ndarray,
+        outcomes: np.ndarray,
+        strategies: Sequence[str],
+        l2: float = 1.0,
+        iterations: int = 25,
+    ) -> Dict[str, float]:
+        """Fit the stacking layer by L2-regularised logistic regression (Newton steps)."""
+        matrix = np.asarray(confidences, dtype=float).reshape(-1, len(strategies))
+        x = np.where(np.isfinite(matrix) & (matrix > 0), matrix, 0.0)
+        x = np.column_stack([np.ones(len(x)), x])
+        y = np.asarray(outcomes, dtype=float)
+        penalty = np.eye(x.shape[1]) * l2
+        penalty[0, 0] = 0.0  # the intercept is not shrunk
+        beta = np.zeros(x.shape[1])
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-(x @ beta)))
+            gradient = x.T @ (p - y) + penalty @ beta
+            hessian = (x * (p * (1 - p))[:, None]).T @ x + penalty
+            step = np.linalg.solve(hessian, gradient)
+            beta -= step
+            if np.abs(step).max() < 1e-8:
+                break
+        self.stacking_intercept = float(beta[0])
+        self.stacking_coefficients = {name: float(b) for name, b in zip(strategies, beta[1:])}
+        return dict(self.stacking_coefficients)
+
+    def _weight(self, strategy: str) -> float:
+        weight = self.weights.get(strategy, 1.0)
+        return weight * self.learner.weight(strategy) if self.learner is not None else weight
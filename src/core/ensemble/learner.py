@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+import threading
+from typing import Dict, Mapping
+
+from src.core.storage.db import SQLiteStore
+
+
+@dataclass
+class OnlineWeightLearner:
+    """Exponentiated-gradient strategy weights updated one closed trade at a time.
+
+    A trade's reward (its return in units of ``reward_scale``, clipped to
+    [-1, 1]) is attributed to the strategies that opened it in proportion to
+    their intent confidence. Each update touches the trade's strategies, then
+    renormalises the known weights to mean 1, so the cost is O(strategies) and
+    history is never replayed. Weights persist in the ``ensemble_weights`` table.
+    """
+
+    store: SQLiteStore
+    learning_rate: float = 0.5
+    reward_scale: float = 0.05
+    min_weight: float = 0.2
+    max_weight: float = 5.0
+    weights: Dict[str, float] = field(default_factory=dict)
+    updates: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        for strategy, (weight, updates) in self.store.get_ensemble_weights().items():
+            self.weights[strategy] = weight
+            self.updates[strategy] = updates
+
+    def weight(self, strategy: str) -> float:
+        return self.weights.get(strategy, 1.0)
+
+    def update(self, strategies: Mapping[str, float], entry: float, exit_price: float) -> Dict[str, float]:
+        """Fold one closed long trade into the weights; returns the new weights."""
+        total = sum(confidence for confidence in strategies.values() if confidence > 0)
+        if total <= 0 or entry <= 0:
+            return dict(self.weights)
+        reward = max(-1.0, min(1.0, (exit_price - entry) / entry / self.reward_scale))
+        with self._lock:
+            for strategy, confidence in strategies.items():
+                if confidence <= 0:
+                    continue
+                share = confidence / total
+                self.weights[strategy] = self.weight(strategy) * math.exp(self.learning_rate * reward * share)
+                self.updates[strategy] = self.updates.get(strategy, 0) + 1
+            mean = sum(self.weights.values()) / len(self.weights)
+            for strategy, weight in self.weights.items():
+                self.weights[strategy] = min(self.max_weight, max(self.min_weight, weight / mean))
+            snapshot = dict(self.weights)
+            self.store.save_ensemble_weights({s: (w, self.updates.get(s, 0)) for s, w in snapshot.items()})
+        return snapshot
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import os
-from typing import Optional
+from typing import Optional, Sequence
 
 from src.core.contracts import ExecutionReport, OrderRequest, OrderResult
 from src.core.data.alpaca_client import AlpacaClient
@@ -88,3 +88,11 @@ class ExecutionService:
             average_fill_price=result.average_fill_price,
             raw=result.raw,
         )
+
+    def submit_orders(
+        self,
+        requests: Sequence[OrderRequest],
+        allow_exit_without_unlock: bool = False,
+    ) -> list[ExecutionReport]:
+        """Submit a batch of orders in order; each goes through the same checks as ``submit_order``."""
+        return [self.submit_order(request, allow_exit_without_unlock=allow_exit_without_unlock) for request in requests]
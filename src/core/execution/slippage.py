@@ -7,9 +7,10 @@ from dataclasses import dataclass
 class SlippageModel:
     spread_bps: float
     fee_bps: float
+    per_share_fee: float = 0.0  # flat commission per share, on top of the bps costs
 
     def estimate_cost(self, price: float, shares: int) -> float:
         notional = price * shares
         spread_cost = notional * (self.spread_bps / 10_000)
         fee_cost = notional * (self.fee_bps / 10_000)
-        return spread_cost + fee_cost
+        return spread_cost + fee_cost + shares * self.per_share_fee
@@ -1,11 +1,146 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import hashlib
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
-from src.core.contracts import Features
+from src.core.contracts import FeatureSchema, FeatureVector
+from src.core.features.store import FeatureStore
+
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+SWING_LOOKBACK = 50
+VOLUME_AVG_WINDOW = 20
+FEATURE_NAMES = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "atr",
+    "rsi",
+    "ema_fast",
+    "ema_slow",
+    "trend",
+    "vol_avg",
+    "volume",
+    "prev_open",
+    "prev_high",
+    "prev_low",
+    "prev_close",
+    "prev_volume",
+    "prev2_open",
+    "prev2_high",
+    "prev2_low",
+    "prev2_close",
+    "prev2_volume",
+    "swing_high_50",
+    "swing_low_50",
+)
+FEATURE_SCHEMA = FeatureSchema(FEATURE_NAMES)
+# Bump when a registry formula changes so persisted feature rows stop matching.
+FEATURE_GRAPH_VERSION = "1"
+
+Columns = Dict[str, pd.Series]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """One node of the feature graph.
+
+    ``window`` is how many rows of its inputs the last output row depends on
+    (``None`` for recursive indicators such as EMAs that depend on the whole
+    history); the engine adds input windows up to a total bar lookback.
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    window: Callable[["FeatureEngine"], Optional[int]]
+    fn: Callable[[Columns, "FeatureEngine"], pd.Series]
+
+
+def _bar(name: str) -> FeatureSpec:
+    return FeatureSpec(name, (), lambda engine: 1, lambda cols, engine: cols[name])
+
+
+def _lagged(name: str, source: str, lag: int) -> FeatureSpec:
+    # The first rows have no prior bar and repeat the earliest one instead.
+    return FeatureSpec(
+        name,
+        (source,),
+        lambda engine: lag + 1,
+        lambda cols, engine: cols[source].shift(lag).fillna(cols[source].iloc[0]),
+    )
+
+
+def _true_range(cols: Columns, engine: "FeatureEngine") -> pd.Series:
+    return pd.concat(
+        [
+            (cols["high"] - cols["low"]).abs(),
+            (cols["high"] - cols["close_lag1"]).abs(),
+            (cols["low"] - cols["close_lag1"]).abs(),
+        ],
+        axis=1,
+    ).max(axis=1)
+
+
+def _rsi(cols: Columns, engine: "FeatureEngine") -> pd.Series:
+    delta = cols["close_diff"]
+    gain = delta.clip(lower=0).rolling(engine.rsi_period).mean()
+    loss = -delta.clip(upper=0).rolling(engine.rsi_period).mean()
+    rs = gain / loss.replace(0, np.nan)
+    return 100 - (100 / (1 + rs))
+
+
+FEATURE_REGISTRY: Dict[str, FeatureSpec] = {
+    spec.name: spec
+    for spec in [
+        *(_bar(name) for name in BAR_COLUMNS),
+        # Intermediates shared by several public features.
+        FeatureSpec("close_lag1", ("close",), lambda e: 2, lambda cols, e: cols["close"].shift(1)),
+        FeatureSpec("close_diff", ("close",), lambda e: 2, lambda cols, e: cols["close"].diff()),
+        FeatureSpec("true_range", ("high", "low", "close_lag1"), lambda e: 1, _true_range),
+        FeatureSpec(
+            "atr", ("true_range",), lambda e: e.atr_period, lambda cols, e: cols["true_range"].rolling(e.atr_period).mean()
+        ),
+        FeatureSpec("rsi", ("close_diff",), lambda e: e.rsi_period, _rsi),
+        FeatureSpec(
+            "ema_fast", ("close",), lambda e: None, lambda cols, e: cols["close"].ewm(span=e.ema_fast, adjust=False).mean()
+        ),
+        FeatureSpec(
+            "ema_slow", ("close",), lambda e: None, lambda cols, e: cols["close"].ewm(span=e.ema_slow, adjust=False).mean()
+        ),
+        FeatureSpec("trend", ("ema_fast", "ema_slow"), lambda e: 1, lambda cols, e: cols["ema_fast"] - cols["ema_slow"]),
+        FeatureSpec(
+            "vol_avg",
+            ("volume",),
+            lambda e: VOLUME_AVG_WINDOW,
+            lambda cols, e: cols["volume"].rolling(VOLUME_AVG_WINDOW).mean(),
+        ),
+        FeatureSpec(
+            "prev_close",
+            ("close_lag1", "close"),
+            lambda e: 1,
+            lambda cols, e: cols["close_lag1"].fillna(cols["close"].iloc[0]),
+        ),
+        *(_lagged(f"prev_{name}", name, 1) for name in BAR_COLUMNS if name != "close"),
+        *(_lagged(f"prev2_{name}", name, 2) for name in BAR_COLUMNS),
+        FeatureSpec(
+            "swing_high_50",
+            ("high",),
+            lambda e: SWING_LOOKBACK,
+            lambda cols, e: cols["high"].rolling(SWING_LOOKBACK, min_periods=1).max(),
+        ),
+        FeatureSpec(
+            "swing_low_50",
+            ("low",),
+            lambda e: SWING_LOOKBACK,
+            lambda cols, e: cols["low"].rolling(SWING_LOOKBACK, min_periods=1).min(),
+        ),
+    ]
+}
 
 
 @dataclass
@@ -14,57 +149,92 @@ class FeatureEngine:
     rsi_period: int = 14
     ema_fast: int = 12
     ema_slow: int = 26
+    store: Optional[FeatureStore] = field(default=None, repr=False)
+    _plans: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Optional[int], FeatureSchema]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def compute(self, symbol: str, bars: pd.DataFrame, features: Optional[Iterable[str]] = None) -> FeatureVector:
+        """Latest-bar features; ``features`` limits work to those names and their inputs."""
+        order, lookback, schema = self.plan(features)
+        window = bars if lookback is None else bars.tail(lookback)
+        key = None
+        if self.store is not None and not window.empty:
+            key = self.store.key(symbol, window, schema.names, self.params_hash)
+            cached = self.store.get(key)
+            if cached is not None:
+                return FeatureVector(symbol, cached, schema)
+        cols = self._evaluate(window, order)
+        latest = [float(cols[name].iloc[-1]) for name in schema.names]
+        latest = [0.0 if value != value else value for value in latest]
+        if key is not None:
+            self.store.put(key, latest)
+        return FeatureVector(symbol, latest, schema)
+
+    def compute_frame(self, bars: pd.DataFrame, features: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Full-history feature columns; row ``i`` equals ``compute`` on ``bars[: i + 1]``.
+
+        Warm-up rows keep NaN so dataset builders can drop them instead of
+        training on zero-filled indicators.
+        """
+        order, _, schema = self.plan(features)
+        cols = self._evaluate(bars, order)
+        return pd.DataFrame({name: cols[name] for name in schema.names})
+
+    def latest_atr(self, frames: Sequence[pd.DataFrame]) -> np.ndarray:
+        """Last-bar ATR for many bar frames at once; equals ``compute(...)["atr"]`` per frame (0 in warm-up)."""
+        _, lookback, _ = self.plan(("atr",))
+        window = np.full((len(frames), 3, lookback), np.nan)
+        for row, frame in enumerate(frames):
+            tail = frame[["high", "low", "close"]].tail(lookback).to_numpy(dtype=float).T
+            if tail.size:
+                window[row, :, lookback - tail.shape[1] :] = tail
+        high, low, close = window[:, 0, 1:], window[:, 1, 1:], window[:, 2, :-1]
+        # fmax skips a missing previous close like the pandas row-max in ``_true_range``.
+        true_range = np.fmax(np.abs(high - low), np.fmax(np.abs(high - close), np.abs(low - close)))
+        atr = true_range.mean(axis=1)
+        return np.where(np.isnan(atr), 0.0, atr)
+
+    @property
+    def params_hash(self) -> str:
+        params = f"{FEATURE_GRAPH_VERSION}:{self.atr_period}:{self.rsi_period}:{self.ema_fast}:{self.ema_slow}"
+        return hashlib.blake2b(params.encode(), digest_size=8).hexdigest()
+
+    def plan(self, features: Optional[Iterable[str]] = None) -> Tuple[Tuple[str, ...], Optional[int], FeatureSchema]:
+        """Resolve requested features to an evaluation order, bar lookback and output schema."""
+        requested = FEATURE_NAMES if features is None else tuple(n for n in FEATURE_NAMES if n in set(features))
+        cached = self._plans.get(requested)
+        if cached is not None:
+            return cached
+        order: list[str] = []
+        lookbacks: Dict[str, Optional[int]] = {}
+
+        def visit(name: str) -> Optional[int]:
+            if name in lookbacks:
+                return lookbacks[name]
+            spec = FEATURE_REGISTRY[name]
+            own = spec.window(self)
+            total: Optional[int] = own
+            for dependency in spec.inputs:
+                upstream = visit(dependency)
+                total = None if total is None or upstream is None else max(total, own + upstream - 1)
+            lookbacks[name] = total
+            order.append(name)
+            return total
+
+        totals = [visit(name) for name in requested]
+        lookback = None if any(total is None for total in totals) else max(totals, default=1)
+        schema = FEATURE_SCHEMA if requested == FEATURE_NAMES else FeatureSchema(requested)
+        plan = (tuple(order), lookback, schema)
+        self._plans[requested] = plan
+        return plan
 
-    def compute(self, symbol: str, bars: pd.DataFrame) -> Features:
-        df = bars.copy()
-        df["prev_close"] = df["close"].shift(1)
-        tr = pd.concat(
-            [
-                (df["high"] - df["low"]).abs(),
-                (df["high"] - df["prev_close"]).abs(),
-                (df["low"] - df["prev_close"]).abs(),
-            ],
-            axis=1,
-        ).max(axis=1)
-        df["atr"] = tr.rolling(self.atr_period).mean()
-        delta = df["close"].diff()
-        gain = delta.clip(lower=0).rolling(self.rsi_period).mean()
-        loss = -delta.clip(upper=0).rolling(self.rsi_period).mean()
-        rs = gain / loss.replace(0, np.nan)
-        df["rsi"] = 100 - (100 / (1 + rs))
-        df["ema_fast"] = df["close"].ewm(span=self.ema_fast, adjust=False).mean()
-        df["ema_slow"] = df["close"].ewm(span=self.ema_slow, adjust=False).mean()
-        df["trend"] = df["ema_fast"] - df["ema_slow"]
-        df["vol_avg"] = df["volume"].rolling(20).mean()
-        latest = df.iloc[-1].fillna(0)
-        prev = df.iloc[-2].fillna(0) if len(df) > 1 else latest
-        prev2 = df.iloc[-3].fillna(0) if len(df) > 2 else prev
-        lookback = min(len(df), 50)
-        rolling_high = float(df["high"].tail(lookback).max())
-        rolling_low = float(df["low"].tail(lookback).min())
-        values = {
-            "open": float(latest["open"]),
-            "high": float(latest["high"]),
-            "low": float(latest["low"]),
-            "close": float(latest["close"]),
-            "atr": float(latest["atr"]),
-            "rsi": float(latest["rsi"]),
-            "ema_fast": float(latest["ema_fast"]),
-            "ema_slow": float(latest["ema_slow"]),
-            "trend": float(latest["trend"]),
-            "vol_avg": float(latest["vol_avg"]),
-            "volume": float(latest["volume"]),
-            "prev_open": float(prev["open"]),
-            "prev_high": float(prev["high"]),
-            "prev_low": float(prev["low"]),
-            "prev_close": float(prev["close"]),
-            "prev_volume": float(prev["volume"]),
-            "prev2_open": float(prev2["open"]),
-            "prev2_high": float(prev2["high"]),
-            "prev2_low": float(prev2["low"]),
-            "prev2_close": float(prev2["close"]),
-            "prev2_volume": float(prev2["volume"]),
-            "swing_high_50": rolling_high,
-            "swing_low_50": rolling_low,
-        }
-        return Features(symbol=symbol, values=values)
+    def _evaluate(self, bars: pd.DataFrame, order: Tuple[str, ...]) -> Columns:
+        frame = bars.reset_index(drop=True)
+        cols: Columns = {}
+        for name in order:
+            if name in BAR_COLUMNS:
+                cols[name] = frame[name].astype(float)
+            else:
+                cols[name] = FEATURE_REGISTRY[name].fn(cols, self)
+        return cols
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureKey(NamedTuple):
+    symbol: str
+    last_ts: str
+    params_hash: str
+    digest: str
+
+
+@dataclass
+class FeatureStore:
+    """Latest-bar feature rows shared by every consumer and process on the host.
+
+    Rows are keyed by (symbol, last bar ts, engine parameter hash) plus a digest
+    of the bar window and requested names, so two callers that hand the engine
+    the same effective window share one computation. Writing a newer bar for a
+    symbol prunes its older rows, which is what invalidates the store when
+    ``DataCache`` receives fresh bars.
+    """
+
+    path: str | Path
+    lru_size: int = 4096
+    hits: int = 0
+    misses: int = 0
+    _lru: "OrderedDict[FeatureKey, List[float]]" = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _local: threading.local = field(default_factory=threading.local, repr=False)
+    _connections: List[sqlite3.Connection] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            # WAL is persistent in the database file, so it is set once here.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feature_rows ("
+                "symbol TEXT NOT NULL, last_ts TEXT NOT NULL, params_hash TEXT NOT NULL, digest TEXT NOT NULL, "
+                "payload BLOB NOT NULL, created_at TEXT NOT NULL, "
+                "PRIMARY KEY (symbol, last_ts, params_hash, digest))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use and kept until ``close``."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    @staticmethod
+    def key(symbol: str, window: pd.DataFrame, names: Sequence[str], params_hash: str) -> FeatureKey:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(window[["open", "high", "low", "close", "volume"]].to_numpy(dtype=float)))
+        digest.update("|".join(names).encode())
+        last_ts = pd.to_datetime(window["ts"].iloc[-1], utc=True).isoformat() if "ts" in window.columns else ""
+        return FeatureKey(symbol, last_ts, params_hash, digest.hexdigest())
+
+    def get(self, key: FeatureKey) -> Optional[List[float]]:
+        with self._lock:
+            cached = self._lru.get(key)
+            if cached is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return cached
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM feature_rows WHERE symbol = ? AND last_ts = ? AND params_hash = ? AND digest = ?",
+                key,
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            values = np.frombuffer(row[0], dtype=np.float64).tolist()
+            self._remember(key, values)
+            return values
+
+    def put(self, key: FeatureKey, values: List[float]) -> None:
+        with self._connect() as conn:
+            if key.last_ts:
+                conn.execute("DELETE FROM feature_rows WHERE symbol = ? AND last_ts < ?", (key.symbol, key.last_ts))
+            conn.execute(
+                "INSERT OR REPLACE INTO feature_rows (symbol, last_ts, params_hash, digest, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, np.asarray(values, dtype=np.float64).tobytes(), datetime.now(timezone.utc).isoformat()),
+            )
+        with self._lock:
+            self._remember(key, values)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "lru_entries": len(self._lru)}
+
+    def _remember(self, key: FeatureKey, values: List[float]) -> None:
+        self._lru[key] = values
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+
+from src.core.data.cache import DataCache
+from src.core.features.feature_engine import FEATURE_NAMES, FeatureEngine
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class LabeledDataset:
+    features: pd.DataFrame
+    target: pd.Series
+    symbols: np.ndarray
+    timestamps: pd.Series
+    manifest: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.target)
+
+
+def forward_return_labels(close: np.ndarray, horizon: int, threshold: float = 0.0) -> np.ndarray:
+    """1.0 when the close ``horizon`` bars ahead beats ``threshold``; NaN where the horizon is incomplete."""
+    labels = np.full(close.shape[0], np.nan)
+    if horizon <= 0 or close.shape[0] <= horizon:
+        return labels
+    forward = close[horizon:] / close[:-horizon] - 1.0
+    labels[:-horizon] = (forward > threshold).astype(float)
+    return labels
+
+
+def tp_before_sl_labels(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    atr: np.ndarray,
+    horizon: int,
+    stop_multiplier: float = 2.0,
+    tp_multiplier: float = 4.0,
+) -> np.ndarray:
+    """1.0 when the ATR take-profit is touched before the stop within ``horizon`` bars.
+
+    Bars are viewed as ``(n - horizon, horizon)`` windows of the following bars so
+    first-touch indexes come from one ``argmax`` per side. A bar that touches both
+    levels counts as a stop, the conservative reading of daily OHLC.
+    """
+    n = close.shape[0]
+    labels = np.full(n, np.nan)
+    if horizon <= 0 or n <= horizon:
+        return labels
+    rows = n - horizon
+    highs = sliding_window_view(high[1:], horizon)[:rows]
+    lows = sliding_window_view(low[1:], horizon)[:rows]
+    take_profit = (close + tp_multiplier * atr)[:rows, None]
+    stop = (close - stop_multiplier * atr)[:rows, None]
+    hit_tp = highs >= take_profit
+    hit_sl = lows <= stop
+    first_tp = np.where(hit_tp.any(axis=1), hit_tp.argmax(axis=1), horizon)
+    first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), horizon)
+    result = (first_tp < first_sl).astype(float)
+    result[np.isnan(atr[:rows])] = np.nan
+    labels[:rows] = result
+    return labels
+
+
+@dataclass
+class DatasetBuilder:
+    cache: DataCache
+    feature_engine: FeatureEngine
+    horizon: int = 10
+    label: str = "tp_before_sl"
+    return_threshold: float = 0.0
+    atr_multiplier_stop: float = 2.0
+    atr_multiplier_tp: float = 4.0
+
+    def build(
+        self,
+        symbols: List[str],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> LabeledDataset:
+        if self.label not in {"tp_before_sl", "forward_return"}:
+            raise ValueError(f"Unsupported label: {self.label}")
+        lower = _as_timestamp(start)
+        upper = _as_timestamp(end)
+        frames: List[pd.DataFrame] = []
+        missing: List[str] = []
+        for symbol in symbols:
+            bars = self.cache.load_daily_bars(symbol, limit=0)
+            if bars is None or bars.empty:
+                missing.append(symbol)
+                continue
+            frame = self._label_symbol(symbol, bars)
+            # Features use the full cached history for warm-up; the range only
+            # selects which rows enter the dataset.
+            if lower is not None:
+                frame = frame[frame["ts"] >= lower]
+            if upper is not None:
+                frame = frame[frame["ts"] <= upper]
+            frames.append(frame)
+        if frames:
+            combined = pd.concat(frames, ignore_index=True)
+            combined = combined.sort_values(["ts", "symbol"], kind="stable").reset_index(drop=True)
+        else:
+            combined = pd.DataFrame(columns=["symbol", "ts", *FEATURE_NAMES, "target"])
+        manifest = {
+            "symbols": [s for s in symbols if s not in missing],
+            "missing_symbols": missing,
+            "start": start,
+            "end": end,
+            "rows": int(len(combined)),
+            "feature_columns": list(FEATURE_NAMES),
+            "label": {
+                "kind": self.label,
+                "horizon": self.horizon,
+                "return_threshold": self.return_threshold,
+                "atr_multiplier_stop": self.atr_multiplier_stop,
+                "atr_multiplier_tp": self.atr_multiplier_tp,
+            },
+            "feature_engine": {
+                "atr_period": self.feature_engine.atr_period,
+                "rsi_period": self.feature_engine.rsi_period,
+                "ema_fast": self.feature_engine.ema_fast,
+                "ema_slow": self.feature_engine.ema_slow,
+            },
+            "positive_rate": float(combined["target"].mean()) if len(combined) else 0.0,
+        }
+        return LabeledDataset(
+            features=combined[list(FEATURE_NAMES)].astype(float).reset_index(drop=True),
+            target=combined["target"].astype(int).reset_index(drop=True),
+            symbols=combined["symbol"].to_numpy(dtype=str),
+            timestamps=combined["ts"].reset_index(drop=True),
+            manifest=manifest,
+        )
+
+    def _label_symbol(self, symbol: str, bars: pd.DataFrame) -> pd.DataFrame:
+        bars = bars.reset_index(drop=True)
+        features = self.feature_engine.compute_frame(bars)
+        close = features["close"].to_numpy(dtype=float)
+        if self.label == "forward_return":
+            target = forward_return_labels(close, self.horizon, self.return_threshold)
+        else:
+            target = tp_before_sl_labels(
+                close,
+                features["high"].to_numpy(dtype=float),
+                features["low"].to_numpy(dtype=float),
+                features["atr"].to_numpy(dtype=float),
+                self.horizon,
+                stop_multiplier=self.atr_multiplier_stop,
+                tp_multiplier=self.atr_multiplier_tp,
+            )
+        frame = features.assign(symbol=symbol, ts=pd.to_datetime(bars["ts"], utc=True), target=target)
+        return frame.dropna(subset=[*FEATURE_NAMES, "target"])
+
+    def write(self, dataset: LabeledDataset, output_dir: str | Path, data_format: str = "parquet") -> Path:
+        """Write ``dataset`` under ``output_dir`` and return the manifest path."""
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        if data_format == "parquet":
+            data_path = out / "data.parquet"
+            frame = dataset.features.assign(
+                symbol=dataset.symbols,
+                ts=dataset.timestamps.to_numpy(),
+                target=dataset.target.to_numpy(),
+            )
+            frame.to_parquet(data_path, index=False)
+        elif data_format == "npz":
+            data_path = out / "data.npz"
+            np.savez_compressed(
+                data_path,
+                features=dataset.features.to_numpy(dtype=np.float64),
+                target=dataset.target.to_numpy(dtype=np.int8),
+                symbols=dataset.symbols.astype(str),
+                ts=pd.to_datetime(dataset.timestamps, utc=True).astype("int64").to_numpy(),
+                columns=np.asarray(dataset.features.columns, dtype=str),
+            )
+        else:
+            raise ValueError(f"Unsupported dataset format: {data_format}")
+        manifest = {
+            **dataset.manifest,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "format": data_format,
+            "data_file": data_path.name,
+            "sha256": _sha256(data_path),
+        }
+        manifest_path = out / MANIFEST_NAME
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        dataset.manifest = manifest
+        return manifest_path
+
+
+def load_dataset(path: str | Path) -> LabeledDataset:
+    """Load a dataset directory (or its manifest) written by ``DatasetBuilder.write``."""
+    manifest_path = Path(path)
+    if manifest_path.is_dir():
+        manifest_path = manifest_path / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    data_path = manifest_path.parent / manifest["data_file"]
+    if manifest["format"] == "npz":
+        with np.load(data_path, allow_pickle=False) as payload:
+            columns = [str(c) for c in payload["columns"]]
+            features = pd.DataFrame(payload["features"], columns=columns)
+            target = pd.Series(payload["target"].astype(int), name="target")
+            symbols = payload["symbols"].astype(str)
+            timestamps = pd.Series(pd.to_datetime(payload["ts"], utc=True), name="ts")
+    else:
+        frame = pd.read_parquet(data_path)
+        columns = list(manifest["feature_columns"])
+        features = frame[columns].astype(float)
+        target = frame["target"].astype(int).rename("target")
+        symbols = frame["symbol"].to_numpy(dtype=str)
+        timestamps = pd.to_datetime(frame["ts"], utc=True).rename("ts")
+    return LabeledDataset(
+        features=features,
+        target=target,
+        symbols=symbols,
+        timestamps=timestamps,
+        manifest=manifest,
+    )
+
+
+def _as_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
+    if not value:
+        return None
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from importlib.util import find_spec
 import sys
-from typing import Dict, List
+from typing import Deque, Dict, List, Optional
 
 import numpy as np
 import pandas as pd
 
+from src.core.contracts import Features
+from src.core.ml.registry import ModelRegistry
+from src.core.ml.retrain import RetrainPipeline, RetrainPlan
+from src.core.ml.sketch import TDigest, ks_distance
+
+
+PSI_EPSILON = 1e-4
+
 
 @dataclass
 class DriftReport:
@@ -18,18 +27,216 @@ class DriftReport:
     drifted_features: List[str] = field(default_factory=list)
     scores: Dict[str, float] = field(default_factory=dict)
     method_used: str = "unknown"
+    ks_statistics: Dict[str, float] = field(default_factory=dict)
+    psi: Dict[str, float] = field(default_factory=dict)
+    wasserstein: Dict[str, float] = field(default_factory=dict)
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 
+@dataclass
+class StreamingDriftResult:
+    model_id: str
+    report: DriftReport
+    plan: Optional[RetrainPlan] = None
+
+
 @dataclass
 class DriftMonitor:
+    """Streaming drift monitor over live feature vectors.
+
+    Each window buffers at most ``window_size`` raw vectors; closed windows are
+    folded into per-feature t-digests and only the last ``max_windows`` are kept,
+    so memory does not grow with history length.
+    """
+
     data_threshold: float
     performance_threshold: float
+    window_size: int = 500
+    max_windows: int = 4
+    ks_threshold: float = 0.2
+    compression: int = 100
+    registry: Optional[ModelRegistry] = None
+    retrain_pipeline: Optional[RetrainPipeline] = None
+    _buffer: Dict[str, List[float]] = field(default_factory=dict, repr=False)
+    _buffered: int = field(default=0, repr=False)
+    _windows: Deque[Dict[str, TDigest]] = field(default_factory=deque, repr=False)
+    _pending_windows: int = field(default=0, repr=False)
+    _baseline: Optional[tuple[str, Dict[str, TDigest]]] = field(default=None, repr=False)
 
     def check(self, data_drift: float, performance_drift: float) -> DriftReport:
         triggered = data_drift > self.data_threshold or performance_drift > self.performance_threshold
         return DriftReport(data_drift=data_drift, performance_drift=performance_drift, triggered=triggered)
 
+    def observe(self, features: Features) -> None:
+        for name, value in features.values.items():
+            self._buffer.setdefault(name, []).append(float(value))
+        self._buffered += 1
+        if self._buffered >= self.window_size:
+            self._close_window()
+
+    def _close_window(self) -> None:
+        window = {
+            name: TDigest.from_values(np.asarray(values, dtype=float), compression=self.compression)
+            for name, values in self._buffer.items()
+        }
+        self._windows.append(window)
+        while len(self._windows) > self.max_windows:
+            self._windows.popleft()
+        self._buffer = {}
+        self._buffered = 0
+        self._pending_windows += 1
+
+    def rolling_sketches(self) -> Dict[str, TDigest]:
+        merged: Dict[str, TDigest] = {}
+        for window in self._windows:
+            for name, digest in window.items():
+                merged[name] = merged[name].merge(digest) if name in merged else digest
+        return merged
+
+    def _active_baseline(self) -> Optional[tuple[str, Dict[str, TDigest]]]:
+        if self.registry is None:
+            return None
+        active = self.registry.get_active_model()
+        if not active:
+            return None
+        model_id = active["model_id"]
+        if self._baseline is not None and self._baseline[0] == model_id:
+            return self._baseline
+        payload = self.registry.get_baseline(model_id)
+        if not payload:
+            return None
+        self._baseline = (model_id, {name: TDigest.from_dict(item) for name, item in payload.items()})
+        return self._baseline
+
+    def evaluate(self, performance_drift: float = 0.0) -> Optional[StreamingDriftResult]:
+        """Compare the rolling windows with the active model's training baseline.
+
+        Runs only when a window has closed since the last call, so one drift
+        episode yields one retrain trigger per window rather than one per cycle.
+        """
+        if self._pending_windows == 0:
+            return None
+        baseline = self._active_baseline()
+        if baseline is None:
+            return None
+        self._pending_windows = 0
+        model_id, baseline_sketches = baseline
+        rolling = self.rolling_sketches()
+        scores = {
+            name: ks_distance(baseline_sketches[name], rolling[name])
+            for name in baseline_sketches
+            if name in rolling
+        }
+        drifted = [name for name, score in scores.items() if score > self.ks_threshold]
+        data_drift = len(drifted) / max(len(scores), 1)
+        report = self.check(data_drift, performance_drift)
+        report.drifted_features = drifted
+        report.scores = scores
+        report.ks_statistics = dict(scores)
+        report.method_used = "tdigest_ks"
+        plan = None
+        if report.triggered and self.retrain_pipeline is not None:
+            reason = f"data drift {data_drift:.2f} on {', '.join(drifted)}" if drifted else "performance drift"
+            plan = self.retrain_pipeline.plan(reason)
+        return StreamingDriftResult(model_id=model_id, report=report, plan=plan)
+
+
+@dataclass
+class DriftReference:
+    """Precomputed baseline snapshot; repeated checks only pay for the current window.
+
+    Columns are sorted once (NaN last) and quantile bin edges/proportions for PSI are
+    fixed at build time, so ``compare`` never re-sorts or re-bins the baseline.
+    """
+
+    columns: List[str]
+    sorted_values: np.ndarray
+    counts: np.ndarray
+    bin_edges: np.ndarray
+    bin_props: np.ndarray
+    median: np.ndarray
+    std: np.ndarray
+
+    @classmethod
+    def from_frame(cls, baseline_df: pd.DataFrame, bins: int = 10) -> "DriftReference":
+        numeric = baseline_df.select_dtypes(include=[np.number])
+        values = numeric.to_numpy(dtype=float)
+        if values.ndim != 2 or values.shape[0] == 0:
+            values = np.empty((0, numeric.shape[1]))
+        sorted_values = np.sort(values, axis=0)
+        counts = np.sum(~np.isnan(values), axis=0)
+        quantiles = np.linspace(0.0, 1.0, bins + 1)[1:-1]
+        bin_edges = _masked_quantiles(sorted_values, quantiles, presorted=True)
+        median = _masked_quantiles(sorted_values, np.array([0.5]), presorted=True)[0]
+        safe_counts = np.maximum(counts, 1)
+        mean = np.nansum(values, axis=0) / safe_counts
+        std = np.sqrt(np.nansum((values - mean) ** 2, axis=0) / safe_counts)
+        bin_props = _bin_proportions(values, bin_edges, bins)
+        return cls(
+            columns=list(numeric.columns),
+            sorted_values=sorted_values,
+            counts=counts,
+            bin_edges=bin_edges,
+            bin_props=bin_props,
+            median=median,
+            std=std,
+        )
+
+    @property
+    def bins(self) -> int:
+        return self.bin_props.shape[0]
+
+    def statistics(self, current_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        current = _numeric_matrix(current_df, self.columns)
+        current_sorted = np.sort(current, axis=0)
+        ks, wasserstein = _ks_wasserstein(self.sorted_values, self.counts, current_sorted)
+        current_counts = np.sum(~np.isnan(current), axis=0)
+        current_props = _bin_proportions(current, self.bin_edges, self.bins)
+        base_p = np.maximum(self.bin_props, PSI_EPSILON)
+        curr_p = np.maximum(current_props, PSI_EPSILON)
+        psi = np.sum((curr_p - base_p) * np.log(curr_p / base_p), axis=0)
+        median = _masked_quantiles(current_sorted, np.array([0.5]), presorted=True)[0]
+        std = np.where(self.std > 0, self.std, 1.0)
+        shift = np.abs(median - self.median) / std
+        return {
+            "ks": ks,
+            "wasserstein": wasserstein,
+            "psi": psi,
+            "shift": shift,
+            "current_counts": current_counts,
+        }
+
+    def compare(self, current_df: pd.DataFrame, alpha: float = 0.05, use_scipy: Optional[bool] = None) -> DriftReport:
+        if not self.columns or current_df.empty or not self.counts.any():
+            return DriftReport(data_drift=0.0, performance_drift=0.0, triggered=False, method_used="empty")
+        stats = self.statistics(current_df)
+        valid = (self.counts > 0) & (stats["current_counts"] > 0)
+        if use_scipy is None:
+            use_scipy = _scipy_available()
+        pvalues = _ks_pvalues(stats["ks"], self.counts, stats["current_counts"]) if use_scipy else None
+        if pvalues is not None:
+            method_used = "ks_test"
+            score_arr = 1 - pvalues
+            drifted_mask = valid & (pvalues < alpha)
+        else:
+            method_used = "percentile_shift"
+            score_arr = stats["shift"]
+            drifted_mask = valid & (score_arr > 0.5)
+        columns = np.asarray(self.columns, dtype=object)
+        drifted_features = columns[drifted_mask].tolist()
+        data_drift = len(drifted_features) / max(len(self.columns), 1)
+        return DriftReport(
+            data_drift=float(data_drift),
+            performance_drift=0.0,
+            triggered=data_drift > 0.0,
+            drifted_features=drifted_features,
+            scores=_as_dict(columns[valid], score_arr[valid]),
+            method_used=method_used,
+            ks_statistics=_as_dict(columns[valid], stats["ks"][valid]),
+            psi=_as_dict(columns[valid], stats["psi"][valid]),
+            wasserstein=_as_dict(columns[valid], stats["wasserstein"][valid]),
+        )
+
 
 def detect_drift(baseline_df: pd.DataFrame, current_df: pd.DataFrame, alpha: float = 0.05) -> DriftReport:
     if baseline_df.empty or current_df.empty:
@@ -37,44 +244,82 @@ def detect_drift(baseline_df: pd.DataFrame, current_df: pd.DataFrame, alpha: flo
     numeric_cols = baseline_df.select_dtypes(include=[np.number]).columns.intersection(
         current_df.select_dtypes(include=[np.number]).columns
     )
-    drifted_features: list[str] = []
-    scores: dict[str, float] = {}
-    method_used = "percentile_shift"
-    scipy_available = sys.modules.get("scipy") is not None and find_spec("scipy") is not None
-    if scipy_available:
-        try:
-            from scipy.stats import ks_2samp
+    reference = DriftReference.from_frame(baseline_df[numeric_cols])
+    return reference.compare(current_df, alpha=alpha)
 
-            method_used = "ks_test"
-            for col in numeric_cols:
-                stat = ks_2samp(baseline_df[col].dropna(), current_df[col].dropna())
-                score = 1 - stat.pvalue
-                scores[col] = float(score)
-                if stat.pvalue < alpha:
-                    drifted_features.append(col)
-        except Exception:  # noqa: BLE001
-            method_used = "percentile_shift"
-            scipy_available = False
-    if not scipy_available:
-        for col in numeric_cols:
-            base = baseline_df[col].dropna().to_numpy()
-            curr = current_df[col].dropna().to_numpy()
-            if base.size == 0 or curr.size == 0:
-                continue
-            base_median = np.median(base)
-            curr_median = np.median(curr)
-            base_std = np.std(base) or 1.0
-            shift = abs(curr_median - base_median) / base_std
-            scores[col] = float(shift)
-            if shift > 0.5:
-                drifted_features.append(col)
-    data_drift = len(drifted_features) / max(len(numeric_cols), 1)
-    report = DriftReport(
-        data_drift=float(data_drift),
-        performance_drift=0.0,
-        triggered=data_drift > 0.0,
-        drifted_features=drifted_features,
-        scores=scores,
-        method_used=method_used,
-    )
-    return report
+
+def _scipy_available() -> bool:
+    return sys.modules.get("scipy", True) is not None and find_spec("scipy") is not None
+
+
+def _numeric_matrix(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    subset = frame.reindex(columns=columns)
+    return subset.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+
+def _ks_wasserstein(base_sorted: np.ndarray, base_counts: np.ndarray, curr_sorted: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Two-sample KS statistic and Wasserstein-1 distance for every column at once.
+
+    Both inputs are already sorted per column, so the stable sort of their
+    concatenation is a run merge; the signed ECDF difference is a single cumsum.
+    Columns with no values on either side score 0.
+    """
+    n_base = base_sorted.shape[0]
+    curr_counts = np.sum(~np.isnan(curr_sorted), axis=0)
+    joint = np.concatenate([base_sorted, curr_sorted], axis=0)
+    order = np.argsort(joint, axis=0, kind="stable")
+    values = np.take_along_axis(joint, order, axis=0)
+    finite = ~np.isnan(values)
+    base_step = np.where(base_counts > 0, 1.0 / np.maximum(base_counts, 1), 0.0)
+    curr_step = np.where(curr_counts > 0, 1.0 / np.maximum(curr_counts, 1), 0.0)
+    steps = np.where(order < n_base, base_step, -curr_step) * finite
+    cdf_diff = np.cumsum(steps, axis=0)
+    # Only the last element of a run of ties is a valid evaluation point of the ECDFs.
+    next_values = np.vstack([values[1:], np.full((1, values.shape[1]), np.nan)])
+    run_end = finite & (values != next_values)
+    abs_diff = np.abs(cdf_diff)
+    ks = np.max(np.where(run_end, abs_diff, 0.0), axis=0, initial=0.0)
+    gaps = np.nan_to_num(next_values - values, nan=0.0)
+    wasserstein = np.sum(abs_diff * gaps * finite, axis=0)
+    return ks, wasserstein
+
+
+def _ks_pvalues(ks: np.ndarray, base_counts: np.ndarray, curr_counts: np.ndarray) -> Optional[np.ndarray]:
+    try:
+        from scipy.stats import distributions
+    except Exception:  # noqa: BLE001
+        return None
+    en = base_counts * curr_counts / np.maximum(base_counts + curr_counts, 1)
+    return np.clip(distributions.kstwo.sf(ks, np.maximum(np.round(en), 1)), 0.0, 1.0)
+
+
+def _bin_proportions(values: np.ndarray, edges: np.ndarray, bins: int) -> np.ndarray:
+    n_cols = values.shape[1]
+    if values.shape[0] == 0 or n_cols == 0:
+        return np.zeros((bins, n_cols))
+    finite = ~np.isnan(values)
+    bin_index = np.sum(values[:, None, :] >= edges[None, :, :], axis=1)
+    flat = (bin_index + np.arange(n_cols) * bins)[finite]
+    counts = np.bincount(flat, minlength=bins * n_cols).reshape(n_cols, bins).T
+    totals = np.maximum(finite.sum(axis=0), 1)
+    return counts / totals
+
+
+def _masked_quantiles(values: np.ndarray, quantiles: np.ndarray, presorted: bool = False) -> np.ndarray:
+    """Linear-interpolated quantiles per column that tolerate all-NaN columns."""
+    sorted_values = values if presorted else np.sort(values, axis=0)
+    counts = np.sum(~np.isnan(sorted_values), axis=0)
+    if sorted_values.shape[0] == 0:
+        return np.full((len(quantiles), sorted_values.shape[1]), np.nan)
+    position = quantiles[:, None] * np.maximum(counts - 1, 0)[None, :]
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, np.maximum(counts - 1, 0)[None, :])
+    weight = position - lower
+    low_vals = np.take_along_axis(sorted_values, lower, axis=0)
+    high_vals = np.take_along_axis(sorted_values, upper, axis=0)
+    result = low_vals + (high_vals - low_vals) * weight
+    return np.where(counts[None, :] > 0, result, np.nan)
+
+
+def _as_dict(columns: np.ndarray, values: np.ndarray) -> Dict[str, float]:
+    return dict(zip(columns.tolist(), np.asarray(values, dtype=float).tolist()))
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import math
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Split = Tuple[np.ndarray, np.ndarray]
+
+_WORKER_DATA: Dict[str, np.ndarray] = {}
+
+
+@dataclass
+class TrialResult:
+    params: Dict[str, Any]
+    fold_scores: List[float] = field(default_factory=list)
+
+    @property
+    def score(self) -> float:
+        return float(np.mean(self.fold_scores)) if self.fold_scores else 0.0
+
+
+@dataclass
+class SearchResult:
+    best_params: Dict[str, Any]
+    best_score: float
+    trials: List[TrialResult]
+    engine: str
+    evaluations: int
+
+
+@dataclass
+class HyperparameterSearch:
+    engine: str = "successive_halving"
+    trials: int = 50
+    max_workers: int = 0
+    eta: int = 3
+    seed: int = 42
+
+    def sample_params(self) -> List[Dict[str, Any]]:
+        rng = np.random.default_rng(self.seed)
+        log_c = rng.uniform(math.log10(1e-3), math.log10(1e2), size=self.trials)
+        balanced = rng.random(self.trials) < 0.5
+        return [
+            {"C": float(10**c), "class_weight": "balanced" if flag else None}
+            for c, flag in zip(log_c, balanced)
+        ]
+
+    def search(self, features: np.ndarray, target: np.ndarray, splits: Sequence[Split]) -> SearchResult:
+        if not splits:
+            raise ValueError("Hyperparameter search requires at least one CV split.")
+        candidates = [TrialResult(params=params) for params in self.sample_params()]
+        with self._executor(features, target) as pool:
+            if self.engine == "random":
+                evaluations = self._evaluate(pool, candidates, list(range(len(splits))), splits)
+                survivors = candidates
+            else:
+                survivors, evaluations = self._successive_halving(pool, candidates, splits)
+        best = max(survivors, key=lambda trial: trial.score)
+        return SearchResult(
+            best_params=best.params,
+            best_score=best.score,
+            trials=candidates,
+            engine=self.engine,
+            evaluations=evaluations,
+        )
+
+    def _successive_halving(
+        self,
+        pool: Optional[ProcessPoolExecutor],
+        candidates: List[TrialResult],
+        splits: Sequence[Split],
+    ) -> Tuple[List[TrialResult], int]:
+        # Budget is the number of CV folds; the most recent folds are scored first so
+        # early-stopped trials are judged on the regime closest to live trading.
+        order = list(range(len(splits)))[::-1]
+        eta = max(self.eta, 2)
+        survivors = candidates
+        evaluated = 0
+        budget = 1
+        evaluations = 0
+        while True:
+            folds = order[evaluated:budget]
+            evaluations += self._evaluate(pool, survivors, folds, splits)
+            evaluated = budget
+            if evaluated >= len(order) or len(survivors) <= 1:
+                break
+            keep = max(len(survivors) // eta, 1)
+            survivors = sorted(survivors, key=lambda trial: trial.score, reverse=True)[:keep]
+            budget = min(budget * eta, len(order))
+        return survivors, evaluations
+
+    def _evaluate(
+        self,
+        pool: Optional[ProcessPoolExecutor],
+        trials: List[TrialResult],
+        folds: List[int],
+        splits: Sequence[Split],
+    ) -> int:
+        tasks = [(trial, splits[fold]) for trial in trials for fold in folds]
+        if not tasks:
+            return 0
+        if pool is None:
+            scores = [_score_fold(trial.params, split[0], split[1]) for trial, split in tasks]
+        else:
+            scores = list(
+                pool.map(
+                    _score_fold,
+                    [trial.params for trial, _ in tasks],
+                    [split[0] for _, split in tasks],
+                    [split[1] for _, split in tasks],
+                )
+            )
+        for (trial, _), score in zip(tasks, scores):
+            trial.fold_scores.append(score)
+        return len(tasks)
+
+    def _executor(self, features: np.ndarray, target: np.ndarray) -> "_PoolContext":
+        workers = self.max_workers or os.cpu_count() or 1
+        return _PoolContext(workers=min(workers, max(self.trials, 1)), features=features, target=target)
+
+
+class _PoolContext:
+    def __init__(self, workers: int, features: np.ndarray, target: np.ndarray) -> None:
+        self.workers = workers
+        self.features = features
+        self.target = target
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            _init_worker(self.features, self.target)
+            return None
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Spawned, not forked: the API calls this from a threadpool, and a forked child
+            # would inherit whatever locks (sqlite, logging) other threads held.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.features, self.target),
+        )
+        return self.pool
+
+    def __exit__(self, *exc: object) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        _WORKER_DATA.clear()
+
+
+def _init_worker(features: np.ndarray, target: np.ndarray) -> None:
+    _WORKER_DATA["features"] = features
+    _WORKER_DATA["target"] = target
+
+
+def build_estimator(params: Dict[str, Any]) -> Any:
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(max_iter=500, **params)
+
+
+def _score_fold(params: Dict[str, Any], train_idx: np.ndarray, test_idx: np.ndarray) -> float:
+    features = _WORKER_DATA["features"]
+    target = _WORKER_DATA["target"]
+    y_train = target[train_idx]
+    if np.unique(y_train).size < 2:
+        return 0.0
+    model = build_estimator(params)
+    model.fit(features[train_idx], y_train)
+    preds = model.predict(features[test_idx]).astype(int)
+    actual = target[test_idx].astype(int)
+    true_pos = float((preds & actual).sum())
+    predicted = float(preds.sum())
+    positives = float(actual.sum())
+    if predicted == 0 or positives == 0 or true_pos == 0:
+        return 0.0
+    precision = true_pos / predicted
+    recall = true_pos / positives
+    return 2 * precision * recall / (precision + recall)
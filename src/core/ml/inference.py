@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+import pickle
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.contracts import Features
+from src.core.ml.registry import ModelRegistry
+
+
+@dataclass
+class LoadedModel:
+    model_id: str
+    model: Any
+    feature_list: List[str]
+
+
+@dataclass
+class ModelInference:
+    """Scores a whole cycle's candidates with the registry's active model in one call.
+
+    Unpickled models are cached by model id, so steady-state cycles cost one
+    registry snapshot lookup plus one ``predict_proba`` regardless of universe size.
+    """
+
+    registry: ModelRegistry
+    _models: Dict[str, LoadedModel] = field(default_factory=dict, repr=False)
+    _failed: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    def active(self) -> Optional[LoadedModel]:
+        entry = self.registry.get_active_model()
+        return self.load(entry) if entry is not None else None
+
+    def load(self, entry: Dict[str, Any]) -> Optional[LoadedModel]:
+        model_id = entry["model_id"]
+        cached = self._models.get(model_id)
+        if cached is not None:
+            return cached
+        if model_id in self._failed:
+            return None
+        try:
+            model = _load_artifact(self.registry.base_dir, entry["artifact_path"])
+        except Exception as exc:  # noqa: BLE001
+            logging.getLogger(__name__).warning("Failed to load model %s: %s", model_id, exc)
+            self._failed[model_id] = str(exc)
+            return None
+        loaded = LoadedModel(model_id=model_id, model=model, feature_list=list(entry["feature_list"]))
+        self._models[model_id] = loaded
+        return loaded
+
+    def evict(self, keep: Sequence[str]) -> None:
+        for model_id in [m for m in self._models if m not in keep]:
+            del self._models[model_id]
+
+    def predict(self, candidates: Sequence[Features]) -> Dict[str, float]:
+        """Positive-class probability per symbol; empty when no usable model is active."""
+        if not candidates:
+            return {}
+        loaded = self.active()
+        if loaded is None:
+            return {}
+        return self.score(loaded, candidates)
+
+    def score(self, loaded: LoadedModel, candidates: Sequence[Features]) -> Dict[str, float]:
+        matrix = np.array(
+            [[float(item.values.get(name, 0.0)) for name in loaded.feature_list] for item in candidates],
+            dtype=float,
+        )
+        try:
+            probabilities = positive_probability(loaded.model, pd.DataFrame(matrix, columns=loaded.feature_list))
+        except Exception as exc:  # noqa: BLE001
+            logging.getLogger(__name__).warning("Inference with %s failed: %s", loaded.model_id, exc)
+            return {}
+        return {item.symbol: float(p) for item, p in zip(candidates, probabilities)}
+
+
+def _load_artifact(base_dir: Path, artifact_path: str) -> Any:
+    path = Path(artifact_path)
+    if not path.is_absolute() and not path.exists():
+        path = Path(base_dir) / path
+    with path.open("rb") as f:
+        return pickle.load(f)
+
+
+def positive_probability(model: Any, frame: pd.DataFrame) -> np.ndarray:
+    if hasattr(model, "predict_proba"):
+        proba = np.asarray(model.predict_proba(frame))
+        classes = list(getattr(model, "classes_", range(proba.shape[1])))
+        column = classes.index(1) if 1 in classes else proba.shape[1] - 1
+        return proba[:, column]
+    if hasattr(model, "predict"):
+        return np.asarray(model.predict(frame), dtype=float)
+    # Rule-based fallback models from RetrainPipeline only carry a threshold.
+    return (frame.sum(axis=1).to_numpy() >= model["threshold"]).astype(float)
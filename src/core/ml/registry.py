@@ -1,29 +1,157 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional
 
 from src.core.contracts import ModelVersionMeta
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    model_id TEXT PRIMARY KEY,
+    artifact_path TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    feature_list TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    trained_range TEXT NOT NULL,
+    feature_schema TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 0,
+    params TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_models_created_at ON models (created_at);
+CREATE INDEX IF NOT EXISTS idx_models_active ON models (active);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_models_single_active ON models (active) WHERE active = 1;
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('version', 0);
+CREATE TABLE IF NOT EXISTS model_baselines (
+    model_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class _RegistrySnapshot:
+    version: int
+    models: Dict[str, Dict[str, Any]]
+    active_id: Optional[str]
+
+
+# Shared across ModelRegistry instances so per-request registries reuse the same
+# read cache; entries are keyed by database path and invalidated by the version counter.
+_SNAPSHOTS: Dict[str, _RegistrySnapshot] = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+# One connection per (thread, database path), likewise shared so per-request registries
+# don't open a connection per call; ``close_connections`` closes them at shutdown.
+_CONNECTIONS = threading.local()
+_OPEN_CONNECTIONS: List[sqlite3.Connection] = []
+
+
 @dataclass
 class ModelRegistry:
     base_dir: Path
 
     def __post_init__(self) -> None:
+        self.base_dir = Path(self.base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self._registry_path = self.base_dir / "registry.json"
+        self._db_path = self.base_dir / "registry.db"
+        self._cache_key = str(self._db_path.resolve())
+        with self._connect() as conn:
+            # WAL is persistent in the database file, so it is set once here.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+        self._import_legacy_json()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(models)").fetchall()}
+        if "params" not in columns:
+            conn.execute("ALTER TABLE models ADD COLUMN params TEXT NOT NULL DEFAULT '{}'")
+
+    def _connect(self) -> sqlite3.Connection:
+        connections = _CONNECTIONS.__dict__.setdefault("by_path", {})
+        conn = connections.get(self._cache_key)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            connections[self._cache_key] = conn
+            with _SNAPSHOTS_LOCK:
+                _OPEN_CONNECTIONS.append(conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        self.export_json()
+
+    def _import_legacy_json(self) -> None:
         if not self._registry_path.exists():
-            self._registry_path.write_text(json.dumps({"models": []}, indent=2), encoding="utf-8")
+            return
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM models LIMIT 1").fetchone():
+                return
+        try:
+            payload = json.loads(self._registry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        models = payload.get("models", []) if isinstance(payload, dict) else []
+        if not models:
+            return
+        active_ids = [m.get("model_id") for m in models if m.get("active")]
+        with self._write() as conn:
+            for model in models:
+                conn.execute(
+                    "INSERT OR REPLACE INTO models (model_id, artifact_path, metrics, feature_list, algorithm, "
+                    "trained_range, feature_schema, created_at, params, active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    _row_params(model),
+                )
+            if active_ids:
+                conn.execute("UPDATE models SET active = 1 WHERE model_id = ?", (active_ids[-1],))
 
-    def _load(self) -> Dict[str, Any]:
-        return json.loads(self._registry_path.read_text(encoding="utf-8"))
+    def version(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM registry_meta WHERE key = 'version'").fetchone()
+        return int(row["value"]) if row else 0
 
-    def _save(self, payload: Dict[str, Any]) -> None:
-        self._registry_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    def _snapshot(self) -> _RegistrySnapshot:
+        version = self.version()
+        with _SNAPSHOTS_LOCK:
+            cached = _SNAPSHOTS.get(self._cache_key)
+            if cached is not None and cached.version == version:
+                return cached
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM models ORDER BY created_at, rowid").fetchall()
+            row = conn.execute("SELECT value FROM registry_meta WHERE key = 'version'").fetchone()
+        models = {r["model_id"]: _row_to_entry(r) for r in rows}
+        active_id = next((model_id for model_id, entry in models.items() if entry["active"]), None)
+        snapshot = _RegistrySnapshot(version=int(row["value"]), models=models, active_id=active_id)
+        with _SNAPSHOTS_LOCK:
+            _SNAPSHOTS[self._cache_key] = snapshot
+        return snapshot
 
     def register_model(
         self,
@@ -35,8 +163,8 @@ class ModelRegistry:
         trained_range: str = "unknown",
         feature_schema: str = "v1",
         set_active: bool = False,
+        params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        payload = self._load()
         entry = {
             "model_id": model_id,
             "artifact_path": artifact_path,
@@ -46,39 +174,58 @@ class ModelRegistry:
             "trained_range": trained_range,
             "feature_schema": feature_schema,
             "created_at": datetime.now(timezone.utc).isoformat(),
+            "params": params or {},
             "active": False,
         }
-        payload["models"] = [m for m in payload.get("models", []) if m.get("model_id") != model_id]
-        if set_active:
-            for model in payload["models"]:
-                model["active"] = False
-            entry["active"] = True
-        payload["models"].append(entry)
-        self._save(payload)
+        with self._write() as conn:
+            if set_active:
+                conn.execute("UPDATE models SET active = 0 WHERE active = 1")
+            conn.execute("DELETE FROM models WHERE model_id = ?", (model_id,))
+            conn.execute(
+                "INSERT INTO models (model_id, artifact_path, metrics, feature_list, algorithm, "
+                "trained_range, feature_schema, created_at, params, active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*_row_params(entry), int(set_active)),
+            )
+        entry["active"] = set_active
         return entry
 
     def list_models(self) -> List[Dict[str, Any]]:
-        payload = self._load()
-        return list(payload.get("models", []))
+        return [dict(entry) for entry in self._snapshot().models.values()]
+
+    def get_model(self, model_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._snapshot().models.get(model_id)
+        return dict(entry) if entry else None
 
     def get_active_model(self) -> Optional[Dict[str, Any]]:
-        for model in self.list_models():
-            if model.get("active"):
-                return model
-        return None
+        snapshot = self._snapshot()
+        if snapshot.active_id is None:
+            return None
+        return dict(snapshot.models[snapshot.active_id])
 
     def set_active_model(self, model_id: str) -> None:
-        payload = self._load()
-        updated = False
-        for model in payload.get("models", []):
-            if model.get("model_id") == model_id:
-                model["active"] = True
-                updated = True
-            else:
-                model["active"] = False
-        if not updated:
-            raise ValueError(f"Model {model_id} not found in registry.")
-        self._save(payload)
+        with self._write() as conn:
+            if not conn.execute("SELECT 1 FROM models WHERE model_id = ?", (model_id,)).fetchone():
+                raise ValueError(f"Model {model_id} not found in registry.")
+            conn.execute("UPDATE models SET active = 0 WHERE active = 1")
+            conn.execute("UPDATE models SET active = 1 WHERE model_id = ?", (model_id,))
+
+    def set_baseline(self, model_id: str, baseline: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO model_baselines (model_id, payload) VALUES (?, ?)",
+                (model_id, json.dumps(baseline)),
+            )
+
+    def get_baseline(self, model_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM model_baselines WHERE model_id = ?", (model_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def export_json(self) -> None:
+        payload = {"models": self.list_models()}
+        tmp_path = self._registry_path.with_name(f"registry.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        tmp_path.replace(self._registry_path)
 
     def promote(self, meta: ModelVersionMeta) -> None:
         self.set_active_model(meta.model_id)
@@ -87,6 +234,46 @@ class ModelRegistry:
         self.set_active_model(meta.model_id)
 
 
+def close_connections() -> None:
+    """Close every registry connection opened by any thread (on process shutdown)."""
+    global _CONNECTIONS
+    with _SNAPSHOTS_LOCK:
+        connections = list(_OPEN_CONNECTIONS)
+        _OPEN_CONNECTIONS.clear()
+        _CONNECTIONS = threading.local()
+    for conn in connections:
+        conn.close()
+
+
+def _row_params(entry: Dict[str, Any]) -> tuple:
+    return (
+        entry["model_id"],
+        entry.get("artifact_path", ""),
+        json.dumps(entry.get("metrics", {})),
+        json.dumps(entry.get("feature_list", [])),
+        entry.get("algorithm", "unknown"),
+        entry.get("trained_range", "unknown"),
+        entry.get("feature_schema", "v1"),
+        entry.get("created_at") or datetime.now(timezone.utc).isoformat(),
+        json.dumps(entry.get("params") or {}),
+    )
+
+
+def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "model_id": row["model_id"],
+        "artifact_path": row["artifact_path"],
+        "metrics": json.loads(row["metrics"]),
+        "feature_list": json.loads(row["feature_list"]),
+        "algorithm": row["algorithm"],
+        "trained_range": row["trained_range"],
+        "feature_schema": row["feature_schema"],
+        "created_at": row["created_at"],
+        "params": json.loads(row["params"]),
+        "active": bool(row["active"]),
+    }
+
+
 def register_model(
     model_dir: str,
     model_id: str,
@@ -97,6 +284,7 @@ def register_model(
     trained_range: str = "unknown",
     feature_schema: str = "v1",
     set_active: bool = False,
+    params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     registry = ModelRegistry(base_dir=Path(model_dir))
     return registry.register_model(
@@ -108,6 +296,7 @@ def register_model(
         trained_range=trained_range,
         feature_schema=feature_schema,
         set_active=set_active,
+        params=params,
     )
 
 
@@ -4,12 +4,16 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 import pickle
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
+from src.core.ml.hpo import HyperparameterSearch, build_estimator
 from src.core.ml.registry import ModelRegistry
+from src.core.ml.sketch import build_baseline
+from src.core.ml.validation import purged_walk_forward_splits
+from src.core.settings import MLHPOSettings
 
 
 @dataclass
@@ -29,6 +33,7 @@ class RetrainResult:
 @dataclass
 class RetrainPipeline:
     schedule: str
+    hpo: Optional[MLHPOSettings] = None
 
     def plan(self, reason: str) -> RetrainPlan:
         return RetrainPlan(reason=reason, triggered=True)
@@ -40,12 +45,37 @@ class RetrainPipeline:
         registry_dir: str,
         feature_list: Optional[List[str]] = None,
         algorithm: str = "logistic_regression",
+        timestamps: Optional[Sequence] = None,
+        horizon: int = 0,
     ) -> RetrainResult:
-        model, used_algorithm = _train_model(features, target, algorithm)
+        """Train, validate and register a model.
+
+        ``timestamps`` (one per row) make the purged splits cut by date rather
+        than by row, and ``horizon`` (the label look-ahead in bars) is a floor
+        on the purge.
+        """
+        params: Dict[str, Any] = {}
+        search_metrics: Dict[str, float] = {}
+        splits = self._splits(len(features), timestamps, horizon)
+        if splits and self.hpo is not None and self.hpo.enabled and _sklearn_available():
+            search = HyperparameterSearch(
+                engine=self.hpo.engine,
+                trials=self.hpo.trials,
+                max_workers=self.hpo.max_workers,
+                eta=self.hpo.eta,
+                seed=self.hpo.seed,
+            ).search(features.to_numpy(dtype=float), target.to_numpy(dtype=int), splits)
+            params = search.best_params
+            search_metrics = {"hpo_best_f1": search.best_score, "hpo_evaluations": float(search.evaluations)}
+        model, used_algorithm = _train_model(features, target, algorithm, params)
         metrics = _evaluate_model(model, features, target)
+        if splits:
+            metrics.update(_cross_validate(features, target, splits, algorithm, params))
+        metrics.update(search_metrics)
         model_id = f"model-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
         registry = ModelRegistry(base_dir=Path(registry_dir))
         model_path = _save_model(registry.base_dir, model_id, model)
+        registry.set_baseline(model_id, build_baseline(features))
         registry.register_model(
             model_id=model_id,
             artifact_path=model_path,
@@ -53,9 +83,40 @@ class RetrainPipeline:
             feature_list=feature_list or list(features.columns),
             algorithm=used_algorithm,
             set_active=True,
+            params=params,
         )
         return RetrainResult(model_id=model_id, model_path=model_path, metrics=metrics, algorithm=used_algorithm)
 
+    def fit(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        algorithm: str = "logistic_regression",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Any, str]:
+        """Train a model without registering it (walk-forward folds, offline experiments)."""
+        return _train_model(features, target, algorithm, params)
+
+    def _splits(
+        self, n_samples: int, timestamps: Optional[Sequence] = None, horizon: int = 0
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        hpo = self.hpo or MLHPOSettings()
+        return purged_walk_forward_splits(
+            n_samples,
+            n_splits=hpo.cv_splits,
+            purge=max(hpo.purge_bars, horizon),
+            test_gap=hpo.test_gap_bars,
+            timestamps=timestamps,
+        )
+
+
+def _sklearn_available() -> bool:
+    try:
+        import sklearn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 def _save_model(base_dir: Path, model_id: str, model: Any) -> str:
     artifact_path = base_dir / f"{model_id}.pkl"
@@ -64,11 +125,14 @@ def _save_model(base_dir: Path, model_id: str, model: Any) -> str:
     return str(artifact_path)
 
 
-def _train_model(features: pd.DataFrame, target: pd.Series, algorithm: str) -> Tuple[Any, str]:
+def _train_model(
+    features: pd.DataFrame,
+    target: pd.Series,
+    algorithm: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, str]:
     try:
-        from sklearn.linear_model import LogisticRegression
-
-        model = LogisticRegression(max_iter=500)
+        model = build_estimator(params or {})
         model.fit(features, target)
         return model, "logistic_regression"
     except Exception:  # noqa: BLE001
@@ -77,6 +141,31 @@ def _train_model(features: pd.DataFrame, target: pd.Series, algorithm: str) -> T
         return model, "rule_based"
 
 
+def _cross_validate(
+    features: pd.DataFrame,
+    target: pd.Series,
+    splits: List[Tuple[np.ndarray, np.ndarray]],
+    algorithm: str,
+    params: Dict[str, Any],
+) -> Dict[str, float]:
+    """Pool out-of-fold predictions across purged splits into ``oos_*`` metrics."""
+    preds: list[np.ndarray] = []
+    actual: list[np.ndarray] = []
+    for train_idx, test_idx in splits:
+        train_target = target.iloc[train_idx]
+        if train_target.nunique() < 2:
+            continue
+        model, _ = _train_model(features.iloc[train_idx], train_target, algorithm, params)
+        preds.append(np.asarray(_predict(model, features.iloc[test_idx])).astype(int))
+        actual.append(target.iloc[test_idx].to_numpy().astype(int))
+    if not preds:
+        return {}
+    oos = _evaluate_predictions(np.concatenate(preds), np.concatenate(actual))
+    metrics = {f"oos_{name}": value for name, value in oos.items()}
+    metrics["cv_folds"] = float(len(preds))
+    return metrics
+
+
 def _predict(model: Any, features: pd.DataFrame) -> np.ndarray:
     if hasattr(model, "predict"):
         return model.predict(features)
@@ -85,8 +174,10 @@ def _predict(model: Any, features: pd.DataFrame) -> np.ndarray:
 
 
 def _evaluate_model(model: Any, features: pd.DataFrame, target: pd.Series) -> Dict[str, float]:
-    preds = _predict(model, features)
-    target_values = target.to_numpy()
+    return _evaluate_predictions(_predict(model, features), target.to_numpy())
+
+
+def _evaluate_predictions(preds: np.ndarray, target_values: np.ndarray) -> Dict[str, float]:
     accuracy = float((preds == target_values).mean())
     precision = _safe_div((preds & target_values).sum(), preds.sum())
     recall = _safe_div((preds & target_values).sum(), target_values.sum())
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import numpy as np
+import pandas as pd
+
+from src.core.contracts import Features
+from src.core.ml.dataset import forward_return_labels, tp_before_sl_labels
+from src.core.ml.inference import ModelInference
+from src.core.ml.registry import ModelRegistry
 
 
 @dataclass
@@ -36,6 +49,356 @@ class ShadowTester:
         return ShadowTestResult(passed=passed, details=details, metric_diff=metric_diff)
 
 
+_PREDICTION_COLUMNS = ["ts", "symbol", "model_id", "role", "probability", "entry", "atr"]
+_OUTCOME_COLUMNS = ["ts", "symbol", "label"]
+
+
+@dataclass
+class _Confusion:
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+    tn: int = 0
+
+    def add(self, predicted: np.ndarray, actual: np.ndarray) -> None:
+        self.tp += int((predicted & actual).sum())
+        self.fp += int((predicted & ~actual).sum())
+        self.fn += int((~predicted & actual).sum())
+        self.tn += int((~predicted & ~actual).sum())
+
+    def metrics(self) -> Dict[str, float]:
+        total = self.tp + self.fp + self.fn + self.tn
+        precision = _safe_div(self.tp, self.tp + self.fp)
+        recall = _safe_div(self.tp, self.tp + self.fn)
+        f1 = _safe_div(2 * precision * recall, precision + recall) if precision + recall > 0 else 0.0
+        return {
+            "accuracy": _safe_div(self.tp + self.tn, total),
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "outcomes": float(total),
+        }
+
+
+@dataclass
+class ShadowScorer:
+    """Live shadow period for candidate models.
+
+    ``submit`` hands the cycle's feature batch to a single background thread, so
+    the cycle only pays for a queue put. The worker scores every candidate on the
+    batch, appends predictions to a columnar part log, labels rows whose horizon
+    has elapsed in the latest bars and folds them into per-candidate confusion
+    counts; the verdict is read from those counts without rescanning the log.
+    Rows still unlabeled ``2 * horizon`` business days past their bar (measured
+    on the newest bar seen) are dropped. Once a log holds more than
+    ``max_parts`` parts it is compacted into one, keeping only rows a tracked
+    candidate can still use.
+    """
+
+    registry: ModelRegistry
+    log_dir: Path
+    days: int = 3
+    horizon: int = 10
+    label: str = "tp_before_sl"
+    return_threshold: float = 0.0
+    atr_multiplier_stop: float = 2.0
+    atr_multiplier_tp: float = 4.0
+    threshold: float = 0.5
+    metric_name: str = "f1"
+    delta: float = 0.01
+    min_outcomes: int = 20
+    max_parts: int = 32
+    _inference: ModelInference = field(init=False, repr=False)
+    _executor: ThreadPoolExecutor = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _futures: List[Future] = field(default_factory=list, repr=False)
+    _candidates: Dict[str, str] = field(default_factory=dict, repr=False)
+    _pending: Dict[Tuple[str, int], Dict[str, Any]] = field(default_factory=dict, repr=False)
+    _counts: Dict[str, Dict[str, _Confusion]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self.log_dir = Path(self.log_dir)
+        (self.log_dir / "predictions").mkdir(parents=True, exist_ok=True)
+        (self.log_dir / "outcomes").mkdir(parents=True, exist_ok=True)
+        self._inference = ModelInference(registry=self.registry)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        candidates_path = self.log_dir / "candidates.json"
+        if candidates_path.exists():
+            self._candidates = json.loads(candidates_path.read_text(encoding="utf-8"))
+        self._replay_log()
+
+    def add_candidate(self, model_id: str) -> None:
+        if self.registry.get_model(model_id) is None:
+            raise ValueError(f"Model {model_id} not found in registry.")
+        with self._lock:
+            self._candidates.setdefault(model_id, datetime.now(timezone.utc).isoformat())
+            self._counts.setdefault(model_id, {"candidate": _Confusion(), "active": _Confusion()})
+            self._save_candidates()
+
+    def remove_candidate(self, model_id: str) -> None:
+        with self._lock:
+            self._candidates.pop(model_id, None)
+            self._counts.pop(model_id, None)
+            self._save_candidates()
+        self._inference.evict(list(self._candidates))
+
+    def feature_names(self) -> set[str]:
+        names: set[str] = set()
+        for model_id in self.candidates():
+            entry = self.registry.get_model(model_id)
+            if entry:
+                names.update(entry["feature_list"])
+        return names
+
+    def candidates(self) -> List[str]:
+        with self._lock:
+            return list(self._candidates)
+
+    def submit(
+        self,
+        features: Sequence[Features],
+        bars: Mapping[str, pd.DataFrame],
+        active_model_id: Optional[str] = None,
+        active_probabilities: Optional[Mapping[str, float]] = None,
+    ) -> Optional[Future]:
+        """Queue one cycle for shadow scoring; returns immediately."""
+        if not self._candidates and not self._pending:
+            return None
+        future = self._executor.submit(
+            self._process,
+            list(features),
+            dict(bars),
+            active_model_id,
+            dict(active_probabilities or {}),
+        )
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+        return future
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            report: Dict[str, Dict[str, Any]] = {}
+            for model_id, started_at in self._candidates.items():
+                counts = self._counts.get(model_id, {"candidate": _Confusion(), "active": _Confusion()})
+                candidate = counts["candidate"].metrics()
+                active = counts["active"].metrics()
+                metric_diff = candidate.get(self.metric_name, 0.0) - active.get(self.metric_name, 0.0)
+                elapsed = now - datetime.fromisoformat(started_at)
+                complete = elapsed >= timedelta(days=self.days) and candidate["outcomes"] >= self.min_outcomes
+                report[model_id] = {
+                    "started_at": started_at,
+                    "complete": complete,
+                    "passed": complete and metric_diff >= self.delta,
+                    "metric_diff": metric_diff,
+                    "candidate": candidate,
+                    "active": active,
+                    "pending": sum(1 for row in self._pending.values() if model_id in row["candidates"]),
+                }
+            return report
+
+    def _process(
+        self,
+        features: List[Features],
+        bars: Dict[str, pd.DataFrame],
+        active_model_id: Optional[str],
+        active_probabilities: Dict[str, float],
+    ) -> None:
+        try:
+            self._mature(bars)
+            self._expire(bars)
+            self._score(features, bars, active_model_id, active_probabilities)
+            if max(len(self._parts(kind)) for kind in ("predictions", "outcomes")) > self.max_parts:
+                self._compact()
+        except Exception:  # noqa: BLE001
+            logging.getLogger(__name__).exception("Shadow scoring failed.")
+
+    def _score(
+        self,
+        features: List[Features],
+        bars: Dict[str, pd.DataFrame],
+        active_model_id: Optional[str],
+        active_probabilities: Dict[str, float],
+    ) -> None:
+        with self._lock:
+            candidate_ids = list(self._candidates)
+        stamps = {symbol: _last_ts(frame) for symbol, frame in bars.items() if not frame.empty}
+        fresh = [f for f in features if f.symbol in stamps and (f.symbol, stamps[f.symbol]) not in self._pending]
+        if not fresh or not candidate_ids:
+            return
+        scored: Dict[str, Dict[str, float]] = {}
+        for model_id in candidate_ids:
+            entry = self.registry.get_model(model_id)
+            loaded = self._inference.load(entry) if entry else None
+            if loaded is not None:
+                scored[model_id] = self._inference.score(loaded, fresh)
+        rows: List[Tuple[Any, ...]] = []
+        with self._lock:
+            for item in fresh:
+                key = (item.symbol, stamps[item.symbol])
+                entry_price = float(item.values.get("close", 0.0))
+                atr = float(item.values.get("atr", 0.0))
+                row = {
+                    "entry": entry_price,
+                    "atr": atr,
+                    "active": active_probabilities.get(item.symbol),
+                    "candidates": {m: p[item.symbol] for m, p in scored.items() if item.symbol in p},
+                }
+                if not row["candidates"]:
+                    continue
+                self._pending[key] = row
+                if row["active"] is not None:
+                    rows.append((key[1], key[0], active_model_id or "", "active", row["active"], entry_price, atr))
+                for model_id, probability in row["candidates"].items():
+                    rows.append((key[1], key[0], model_id, "candidate", probability, entry_price, atr))
+        if rows:
+            self._append("predictions", pd.DataFrame(rows, columns=_PREDICTION_COLUMNS))
+
+    def _mature(self, bars: Dict[str, pd.DataFrame]) -> None:
+        with self._lock:
+            pending = [(key, row) for key, row in self._pending.items() if key[0] in bars]
+        if not pending:
+            return
+        matured: List[Tuple[int, str, float]] = []
+        stamps = {
+            symbol: pd.to_datetime(bars[symbol]["ts"], utc=True).astype("int64").to_numpy()
+            for symbol in {key[0] for key, _ in pending}
+        }
+        for (symbol, ts), row in pending:
+            after = bars[symbol].loc[stamps[symbol] > ts]
+            if len(after) < self.horizon:
+                continue
+            matured.append((ts, symbol, self._label(row, after.head(self.horizon))))
+        if not matured:
+            return
+        outcomes = pd.DataFrame(matured, columns=_OUTCOME_COLUMNS)
+        self._append("outcomes", outcomes)
+        with self._lock:
+            for ts, symbol, label in matured:
+                self._fold(self._pending.pop((symbol, ts)), label)
+
+    def _expire(self, bars: Dict[str, pd.DataFrame]) -> None:
+        stamps = [_last_ts(frame) for frame in bars.values() if not frame.empty]
+        if not stamps:
+            return
+        cutoff = (pd.Timestamp(max(stamps), tz="UTC") - pd.offsets.BDay(2 * self.horizon)).value
+        with self._lock:
+            for key in [key for key in self._pending if key[1] < cutoff]:
+                del self._pending[key]
+
+    def _compact(self) -> None:
+        """Fold each log's parts into one, keeping rows a tracked candidate can still use."""
+        parts = {kind: self._parts(kind) for kind in ("predictions", "outcomes")}
+        predictions = self._read("predictions", _PREDICTION_COLUMNS)
+        outcomes = self._read("outcomes", _OUTCOME_COLUMNS)
+        with self._lock:
+            tracked = set(self._candidates)
+            pending = [(ts, symbol) for symbol, ts in self._pending]
+        row_keys = pd.MultiIndex.from_frame(predictions[["ts", "symbol"]])
+        candidate = predictions["role"].eq("candidate") & predictions["model_id"].isin(tracked)
+        useful = row_keys.isin(row_keys[candidate.to_numpy()]) & (candidate | predictions["role"].eq("active")).to_numpy()
+        labeled = row_keys.isin(pd.MultiIndex.from_frame(outcomes[["ts", "symbol"]]))
+        waiting = row_keys.isin(pd.MultiIndex.from_tuples(pending, names=["ts", "symbol"])) if pending else False
+        predictions = predictions[useful & (labeled | waiting)]
+        kept = pd.MultiIndex.from_frame(predictions[["ts", "symbol"]])
+        outcomes = outcomes[pd.MultiIndex.from_frame(outcomes[["ts", "symbol"]]).isin(kept)]
+        for kind, frame in (("predictions", predictions), ("outcomes", outcomes)):
+            if not frame.empty:
+                self._append(kind, frame)
+            for part in parts[kind]:
+                part.unlink()
+
+    def _label(self, row: Dict[str, Any], after: pd.DataFrame) -> float:
+        close = np.r_[row["entry"], after["close"].to_numpy(dtype=float)]
+        if self.label == "forward_return":
+            return float(forward_return_labels(close, self.horizon, self.return_threshold)[0])
+        high = np.r_[row["entry"], after["high"].to_numpy(dtype=float)]
+        low = np.r_[row["entry"], after["low"].to_numpy(dtype=float)]
+        atr = np.full(close.shape[0], row["atr"])
+        return float(
+            tp_before_sl_labels(
+                close, high, low, atr, self.horizon, self.atr_multiplier_stop, self.atr_multiplier_tp
+            )[0]
+        )
+
+    def _fold(self, row: Dict[str, Any], label: float) -> None:
+        actual = np.array([label >= 0.5])
+        for model_id, probability in row["candidates"].items():
+            counts = self._counts.get(model_id)
+            if counts is None:
+                continue
+            counts["candidate"].add(np.array([probability >= self.threshold]), actual)
+            if row["active"] is not None:
+                counts["active"].add(np.array([row["active"] >= self.threshold]), actual)
+
+    def _replay_log(self) -> None:
+        predictions = self._read("predictions", _PREDICTION_COLUMNS)
+        outcomes = self._read("outcomes", _OUTCOME_COLUMNS)
+        for model_id in self._candidates:
+            self._counts[model_id] = {"candidate": _Confusion(), "active": _Confusion()}
+        if predictions.empty:
+            return
+        merged = predictions.merge(outcomes, on=["ts", "symbol"], how="left")
+        matured = merged[merged["label"].notna()]
+        active = matured[matured["role"] == "active"][["ts", "symbol", "probability"]]
+        candidates = matured[matured["role"] == "candidate"].merge(
+            active, on=["ts", "symbol"], how="left", suffixes=("", "_active")
+        )
+        for model_id, group in candidates.groupby("model_id"):
+            counts = self._counts.get(str(model_id))
+            if counts is None:
+                continue
+            actual = group["label"].to_numpy() >= 0.5
+            counts["candidate"].add(group["probability"].to_numpy() >= self.threshold, actual)
+            with_active = group["probability_active"].notna().to_numpy()
+            counts["active"].add(
+                group["probability_active"].to_numpy()[with_active] >= self.threshold, actual[with_active]
+            )
+        open_rows = merged[merged["label"].isna()]
+        # Unlabeled rows come back as pending; ones past their horizon expire on the next cycle's bars.
+        for (ts, symbol), group in open_rows.groupby(["ts", "symbol"]):
+            roles = group.set_index("model_id")
+            active_rows = group[group["role"] == "active"]
+            self._pending[(str(symbol), int(ts))] = {
+                "entry": float(group["entry"].iloc[0]),
+                "atr": float(group["atr"].iloc[0]),
+                "active": float(active_rows["probability"].iloc[0]) if not active_rows.empty else None,
+                "candidates": {
+                    str(m): float(p)
+                    for m, p in roles[roles["role"] == "candidate"]["probability"].items()
+                },
+            }
+
+    def _append(self, kind: str, frame: pd.DataFrame) -> None:
+        path = self.log_dir / kind / f"part-{time.time_ns()}.parquet"
+        frame.to_parquet(path, index=False)
+
+    def _parts(self, kind: str) -> List[Path]:
+        return sorted((self.log_dir / kind).glob("part-*.parquet"))
+
+    def _read(self, kind: str, columns: List[str]) -> pd.DataFrame:
+        parts = self._parts(kind)
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+    def _save_candidates(self) -> None:
+        (self.log_dir / "candidates.json").write_text(json.dumps(self._candidates, indent=2), encoding="utf-8")
+
+
+def _last_ts(frame: pd.DataFrame) -> int:
+    return int(pd.to_datetime(frame["ts"].iloc[-1], utc=True).value)
+
+
 def _predict(model: Any, features: np.ndarray) -> np.ndarray:
     if hasattr(model, "predict"):
         return model.predict(features)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest with the arcsine scale function).
+
+    Incoming values are buffered and folded into at most ``compression + 1``
+    centroids with vectorized bucket assignment, so memory stays bounded no
+    matter how many values are observed.
+    """
+
+    compression: int = 100
+    means: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+    min_value: float = math.inf
+    max_value: float = -math.inf
+    buffer_size: int = 0
+    _buffer: List[np.ndarray] = field(default_factory=list, repr=False)
+    _buffered: int = field(default=0, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.buffer_size <= 0:
+            self.buffer_size = 5 * self.compression
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], compression: int = 100) -> "TDigest":
+        digest = cls(compression=compression)
+        digest.update(values)
+        digest.flush()
+        return digest
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values: Iterable[float] | float) -> None:
+        arr = np.asarray(values, dtype=float).ravel()
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return
+        self._buffer.append(arr)
+        self._buffered += arr.size
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        incoming = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._compress(incoming, np.ones_like(incoming))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        self.flush()
+        other.flush()
+        merged = TDigest(compression=self.compression, means=self.means.copy(), weights=self.weights.copy())
+        merged.min_value = min(self.min_value, other.min_value)
+        merged.max_value = max(self.max_value, other.max_value)
+        merged._compress(other.means, other.weights)
+        return merged
+
+    def cdf(self, x: np.ndarray | float) -> np.ndarray:
+        self.flush()
+        points = np.asarray(x, dtype=float)
+        if self.weights.size == 0:
+            return np.full(points.shape, np.nan)
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        xs = np.concatenate([[self.min_value], self.means, [self.max_value]])
+        ys = np.concatenate([[0.0], centers, [1.0]])
+        return np.interp(points, xs, ys)
+
+    def quantile(self, q: np.ndarray | float) -> np.ndarray:
+        self.flush()
+        probs = np.asarray(q, dtype=float)
+        if self.weights.size == 0:
+            return np.full(probs.shape, np.nan)
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        xs = np.concatenate([[0.0], centers, [1.0]])
+        ys = np.concatenate([[self.min_value], self.means, [self.max_value]])
+        return np.interp(probs, xs, ys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.flush()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min_value,
+            "max": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "TDigest":
+        return cls(
+            compression=int(payload.get("compression", 100)),
+            means=np.asarray(payload.get("means", []), dtype=float),
+            weights=np.asarray(payload.get("weights", []), dtype=float),
+            min_value=float(payload.get("min", math.inf)),
+            max_value=float(payload.get("max", -math.inf)),
+        )
+
+    def _compress(self, extra_means: np.ndarray, extra_weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, extra_means])
+        weights = np.concatenate([self.weights, extra_weights])
+        if means.size == 0:
+            return
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        self.min_value = min(self.min_value, float(means[0]))
+        self.max_value = max(self.max_value, float(means[-1]))
+        total = weights.sum()
+        q_mid = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression * (np.arcsin(2 * q_mid - 1) / math.pi + 0.5))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+
+def ks_distance(first: TDigest, second: TDigest) -> float:
+    """Approximate KS distance between two sketches on the union of centroid means."""
+    first.flush()
+    second.flush()
+    if first.weights.size == 0 or second.weights.size == 0:
+        return 0.0
+    grid = np.concatenate(
+        [first.means, second.means, [first.min_value, first.max_value, second.min_value, second.max_value]]
+    )
+    return float(np.max(np.abs(first.cdf(grid) - second.cdf(grid))))
+
+
+def build_baseline(features: pd.DataFrame, compression: int = 100) -> Dict[str, Dict[str, Any]]:
+    numeric = features.select_dtypes(include=[np.number])
+    return {
+        str(column): TDigest.from_values(numeric[column].to_numpy(dtype=float), compression=compression).to_dict()
+        for column in numeric.columns
+    }
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def purged_walk_forward_splits(
+    n_samples: int,
+    n_splits: int = 5,
+    purge: int = 0,
+    test_gap: int = 0,
+    min_train_size: int | None = None,
+    timestamps: Optional[Sequence] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Expanding-window splits over time-ordered rows.
+
+    ``purge`` drops the training bars immediately before each test block (labels
+    that look ``purge`` bars ahead would otherwise leak the test period) and
+    ``test_gap`` skips bars at the start of each test block. Training never
+    follows a test block here, so no post-test embargo is needed. Without
+    ``timestamps`` every row is one bar. With them (one per row, e.g. a
+    multi-symbol dataset interleaved by date), blocks, purge and gap are
+    counted in distinct timestamps, so all symbols' rows for a date fall on the
+    same side of every cut.
+    """
+    if n_splits < 1 or n_samples <= 0:
+        return []
+    if timestamps is None:
+        bars = np.arange(n_samples)
+    else:
+        _, bars = np.unique(np.asarray(timestamps), return_inverse=True)
+    n_bars = int(bars.max()) + 1
+    min_train = min_train_size if min_train_size is not None else max(n_bars // (n_splits + 1), 1)
+    test_size = (n_bars - min_train) // n_splits
+    if test_size <= test_gap:
+        return []
+    splits: List[Tuple[np.ndarray, np.ndarray]] = []
+    for fold in range(n_splits):
+        test_start = min_train + fold * test_size
+        test_end = n_bars if fold == n_splits - 1 else test_start + test_size
+        train_end = max(test_start - purge, 0)
+        train_idx = np.flatnonzero(bars < train_end)
+        test_idx = np.flatnonzero((bars >= test_start + test_gap) & (bars < test_end))
+        if train_idx.size == 0 or test_idx.size == 0:
+            continue
+        splits.append((train_idx, test_idx))
+    return splits
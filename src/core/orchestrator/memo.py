@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.core.contracts import FeatureVector
+
+MemoKey = Tuple[str, str, str, Optional[str]]
+
+
+@dataclass
+class MemoEntry:
+    key: MemoKey
+    features: FeatureVector
+    allowed: bool
+    gate_reason: str
+    # Filled once the candidate has been through strategies/ensemble; ``final`` may be None.
+    evaluated: bool = False
+    probability: Optional[float] = None
+    final: Any = None
+
+
+@dataclass
+class DecisionMemo:
+    """Per-symbol bar-derived decisions reused while a symbol's inputs are unchanged.
+
+    Entries are keyed on (last bar ts, hash of the last bar's values, config
+    hash, active model id), where the config hash also covers the cycle's
+    required feature set; gate, model score and ensemble output depend only on
+    those, so a hit skips straight to the portfolio-dependent checks. Hashing
+    the last row catches a bar revised in place (e.g. a provisional close).
+    """
+
+    _entries: Dict[str, MemoEntry] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def config_hash(settings: Any, *parts: str) -> str:
+        digest = hashlib.blake2b(settings.model_dump_json().encode(), digest_size=8)
+        for part in parts:
+            digest.update(part.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(bars: pd.DataFrame, config_hash: str, model_id: Optional[str]) -> MemoKey:
+        last = bars.iloc[[-1]]
+        row_hash = int(pd.util.hash_pandas_object(last, index=False).iloc[0])
+        return str(last["ts"].iloc[0]), f"{row_hash:016x}", config_hash, model_id
+
+    def get(self, symbol: str, key: MemoKey) -> Optional[MemoEntry]:
+        entry = self._entries.get(symbol)
+        return entry if entry is not None and entry.key == key else None
+
+    def put(self, symbol: str, entry: MemoEntry) -> None:
+        self._entries[symbol] = entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
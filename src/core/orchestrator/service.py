@@ -3,16 +3,22 @@ from __future__ import annotations
 import json
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
-from typing import Iterable
+from typing import Iterable, Optional
 
-from src.core.contracts import FinalSignal, OrderRequest, RiskDecision
+import pandas as pd
+
+from src.core.contracts import DecisionRecord, FeatureVector, FundingAlert, OrderRequest, OrderResult, SignalRecord
 from src.core.data.market_data import MarketDataProvider
+from src.core.data.paper_broker import PaperBroker
 from src.core.data.validator import MarketDataValidator
 from src.core.ensemble.aggregator import EnsembleAggregator
 from src.core.execution.execution_service import ExecutionService
 from src.core.execution.order_manager import OrderManager
 from src.core.execution.slippage import SlippageModel
 from src.core.features.feature_engine import FeatureEngine
+from src.core.ml.drift import DriftMonitor
+from src.core.ml.inference import LoadedModel, ModelInference
+from src.core.ml.shadow import ShadowScorer
 from src.core.monitoring.alerts import AlertManager
 from src.core.monitoring.circuit_breaker import CircuitBreaker
 from src.core.monitoring.error_handler import ConnectivityError, DataValidationError, ErrorHandler
@@ -20,15 +26,24 @@ from src.core.monitoring.health import HealthMonitor
 from src.core.monitoring.notifications import send_desktop_notification
 from src.core.monitoring.performance import PerformanceMonitor
 from src.core.portfolio.position_manager import PositionManager
+from src.core.portfolio.rebalance import RebalancePlan, RebalancePlanner
 from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.portfolio.stop_monitor import StopMonitor
 from src.core.portfolio.trade_queue import TradeQueue
 from src.core.risk.correlation import CorrelationManager
+from src.core.risk.covariance import daily_returns
+from src.core.risk.funding import HeldPosition, remaining_positions
+from src.core.risk.portfolio_risk import PortfolioRiskEngine
 from src.core.risk.manager import RiskManager
+from src.core.risk.optimizer import PortfolioOptimizer
 from src.core.sentiment.provider import SentimentProvider
 from src.core.settings import Settings
 from src.core.storage.db import SQLiteStore
-from src.core.strategies.strategies import build_strategies
+from src.core.strategies.base import Strategy
+from src.core.strategies.strategies import build_model_intent, build_strategies, required_features
+from src.core.orchestrator.memo import DecisionMemo, MemoEntry
 from src.core.orchestrator.setup_gate import SetupGate
+from src.integrations.openai_schemas import NewsRiskGateResult
 from src.integrations.openai_services import NewsRiskGateService
 
 
@@ -56,19 +71,33 @@ class Orchestrator:
     sentiment_provider: SentimentProvider | None
     position_manager: PositionManager
     news_gate_service: NewsRiskGateService | None = None
+    drift_monitor: DriftMonitor | None = None
+    model_inference: ModelInference | None = None
+    shadow_scorer: ShadowScorer | None = None
+    decision_memo: DecisionMemo = field(default_factory=DecisionMemo)
+    portfolio_risk: PortfolioRiskEngine | None = None
+    portfolio_optimizer: PortfolioOptimizer | None = None
+    rebalance_planner: RebalancePlanner | None = None
+    stop_monitor: StopMonitor | None = None
     status: str = "stopped"
     last_run_summary: dict = field(default_factory=dict)
 
     def start(self) -> None:
         self.status = "running"
+        if self.stop_monitor is not None:
+            self.stop_monitor.start()
         self.store.add_log("info", "Orchestrator started.")
 
     def pause(self) -> None:
         self.status = "paused"
+        if self.stop_monitor is not None:
+            self.stop_monitor.stop()
         self.store.add_log("warning", "Orchestrator paused.")
 
     def stop(self) -> None:
         self.status = "stopped"
+        if self.stop_monitor is not None:
+            self.stop_monitor.stop()
         self.store.add_log("warning", "Orchestrator stopped.")
 
     def run_cycle(self, symbols: Iterable[str]) -> dict:
@@ -77,6 +106,7 @@ class Orchestrator:
 
         self.store.add_log("info", "Starting analysis cycle.")
         self.health_monitor.tick()
+        paper_fills = self._advance_paper_clock()
         self.order_manager.purge_stale_orders()
         exit_actions = self.position_manager.evaluate_exits()
         for action in exit_actions:
@@ -106,6 +136,21 @@ class Orchestrator:
         processed = 0
         decisions = []
         cycle_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        candidates: list[tuple[str, pd.DataFrame, FeatureVector, MemoEntry | None]] = []
+        strategies = build_strategies(self.settings.strategies)
+        loaded = self._active_model()
+        model_id = loaded.model_id if loaded is not None else None
+        feature_names = self._required_features(strategies, loaded)
+        learner = self.ensemble.learner
+        config_hash = DecisionMemo.config_hash(
+            self.settings,
+            self.feature_engine.params_hash,
+            # Learned weights move as trades close; a new weight set re-scores every symbol.
+            repr(sorted(learner.weights.items())) if learner is not None else "",
+            ",".join(sorted(feature_names)),
+        )
+        short_circuited = 0
+        cycle_bars: dict[str, pd.DataFrame] = {}
         for symbol in symbols:
             if open_positions >= max_positions:
                 self.store.add_log("warning", "Max open positions reached; skipping new entries.")
@@ -122,20 +167,68 @@ class Orchestrator:
                 classification = self.error_handler.handle(ConnectivityError(str(exc)), f"fetch/validate {symbol}")
                 self.circuit_breaker.record_failure(classification)
                 continue
-            features = self.feature_engine.compute(symbol, bars)
-            allowed, reason = self.setup_gate.allow(features)
+            cycle_bars[symbol] = bars
+            memo_key = None
+            if self.settings.app.decision_memo and "ts" in bars.columns and not bars.empty:
+                memo_key = DecisionMemo.key(bars, config_hash, model_id)
+            memo = self.decision_memo.get(symbol, memo_key) if memo_key is not None else None
+            if memo is not None:
+                # Unchanged bars: the drift monitor already saw this row.
+                short_circuited += 1
+                features = memo.features
+            else:
+                features = self.feature_engine.compute(symbol, bars, feature_names)
+                if self.drift_monitor is not None:
+                    self.drift_monitor.observe(features)
+                allowed, reason = self.setup_gate.allow(features)
+                if memo_key is not None:
+                    memo = MemoEntry(key=memo_key, features=features, allowed=allowed, gate_reason=reason)
+                    self.decision_memo.put(symbol, memo)
+            if memo is not None:
+                allowed, reason = memo.allowed, memo.gate_reason
             if not allowed:
                 self.store.add_log("info", f"Setup gate blocked {symbol}: {reason}")
                 continue
-            intents = []
-            for strategy in build_strategies(self.settings.strategies):
-                signal = strategy.generate(features)
-                if signal:
-                    intents.append(signal)
-            final = self.ensemble.aggregate(intents)
+            candidates.append((symbol, bars, features, memo))
+
+        probabilities = self._score_candidates(
+            loaded, [features for _, _, features, memo in candidates if memo is None or not memo.evaluated]
+        )
+        for symbol, _, _, memo in candidates:
+            if memo is not None and memo.evaluated and memo.probability is not None:
+                probabilities[symbol] = memo.probability
+        if self.shadow_scorer is not None:
+            self.shadow_scorer.submit(
+                [features for _, _, features, _ in candidates],
+                {symbol: bars for symbol, bars, _, _ in candidates},
+                active_model_id=model_id,
+                active_probabilities=probabilities,
+            )
+        if candidates:
+            self._refresh_risk_panels(cycle_bars)
+        signals: list[tuple[str, pd.DataFrame, SignalRecord, NewsRiskGateResult | None]] = []
+        scores: dict[str, float] = {}
+        for symbol, bars, features, memo in candidates:
+            if open_positions >= max_positions:
+                self.store.add_log("warning", "Max open positions reached; skipping new entries.")
+                break
+            if memo is not None and memo.evaluated:
+                final = memo.final
+            else:
+                intents = []
+                for strategy in strategies:
+                    signal = strategy.generate(features)
+                    if signal:
+                        intents.append(signal)
+                if symbol in probabilities:
+                    intents.append(build_model_intent(features, probabilities[symbol], model_id))
+                final = self.ensemble.aggregate(intents)
+                if memo is not None:
+                    memo.evaluated, memo.probability, memo.final = True, probabilities.get(symbol), final
             if final is None:
                 self.store.add_log("info", f"No final signal for {symbol}.")
                 continue
+            scores[symbol] = final.score
             if self.settings.sentiment.enabled and self.sentiment_provider:
                 sentiment = self.sentiment_provider.get_sentiment(symbol)
                 if sentiment.score < self.settings.sentiment.min_score:
@@ -169,107 +262,377 @@ class Orchestrator:
                 take_profit=final.take_profit,
                 reasons=", ".join(final.reasons),
             )
-            decision, funding = self.risk_manager.evaluate(final, portfolio)
-            if (
-                news_gate_result
-                and self.settings.openai_news_gate_mode == "reduce"
-                and news_gate_result.risk_flag == "HIGH"
-                and decision.approved
-            ):
-                factor = self.settings.openai_news_gate_reduce_factor
-                reduced_shares = int(decision.shares * factor)
-                if reduced_shares <= 0:
-                    self.store.add_log("warning", f"OpenAI news gate reduced {symbol} to zero shares.")
-                    continue
-                decision = RiskDecision(
-                    symbol=decision.symbol,
-                    outcome=decision.outcome,
-                    approved=decision.approved,
-                    shares=reduced_shares,
-                    cash_required=reduced_shares * final.entry,
-                    reasons=decision.reasons + ["OpenAI news gate reduced size"],
-                    constraints=decision.constraints,
-                )
-            decisions.append(decision.model_dump())
-            if funding:
-                self.store.add_funding_alert(
-                    symbol=final.symbol,
-                    missing_cash=funding.missing_cash,
-                    proposed_actions=", ".join(funding.proposed_actions),
-                    details=json.dumps(funding.details),
-                )
-                self.trade_queue.enqueue(final.symbol, final.model_dump())
-                if self.settings.notifications_enabled and self.settings.funding_alert.desktop_notifications:
-                    notification = send_desktop_notification(
-                        "Funding Alert",
-                        f"{final.symbol}: missing ${funding.missing_cash:.2f}",
-                    )
-                    self.store.add_log("info", f"Desktop notify: {notification.detail}")
-                self.store.add_log("warning", f"Funding alert for {final.symbol}; queued trade.")
-                continue
-            if not decision.approved:
-                self.store.add_log("warning", f"Risk veto for {final.symbol}: {decision.reasons}")
-                continue
-            candidate_weight = (decision.shares * final.entry) / max(portfolio.equity, 1)
-            holdings = {pos["symbol"]: float(pos.get("market_value", 0)) / max(equity, 1) for pos in self.execution.client.list_positions()}
-            price_history = {final.symbol: bars}
-            held_symbols = [symbol for symbol in holdings if symbol != final.symbol]
-            if held_symbols:
-                try:
-                    price_history.update(self.data_provider.get_daily_bars_batch(held_symbols, limit=160))
-                except ValueError as exc:
-                    self.store.add_log("warning", f"Price history fetch failed: {exc}")
-                    continue
-            corr_ok, corr_reason = self.correlation_manager.check_symbol(
-                final.symbol,
-                candidate_weight,
-                holdings,
-                price_history,
-            )
-            sector_ok, sector_reason = self.correlation_manager.check_sector(
-                final.symbol,
-                candidate_weight,
-                holdings,
-                sector_map=self.sector_map,
+            signals.append((symbol, bars, final, news_gate_result))
+
+        # Fund signals best-first against one cash balance so approvals cannot double-spend it. Only as many
+        # as there are free position slots are sized at a time, and a funded candidate that a later check
+        # vetoes (news gate, correlation, sector, VaR) gives its cash back: the ones behind it are re-sized.
+        # The funding solver only weighs holdings scored by this cycle's finals: an unscored holding has no
+        # score to compare against the candidate's, so it is never proposed as a swap.
+        signals.sort(key=lambda item: -item[2].score)
+        held = [
+            HeldPosition.from_position(pos, scores[pos["symbol"]])
+            for pos in self.execution.client.list_positions()
+            if pos["symbol"] in scores
+        ]
+        weight_caps = self._target_weights([final for _, _, final, _ in signals], equity)
+        remaining = list(signals)
+        spent = 0.0
+        while remaining and open_positions < max_positions:
+            batch = remaining[: max_positions - open_positions]
+            budget = PortfolioSnapshot(
+                cash=max(portfolio.cash - spent, 0.0), equity=portfolio.equity, open_positions=open_positions
             )
-            if not corr_ok or not sector_ok:
-                self.store.add_log("warning", f"Correlation veto for {final.symbol}: {corr_reason or sector_reason}")
-                continue
-            idempotency_key = f"{cycle_id}-{final.symbol}-{decision.shares}"
-            order = OrderRequest(
-                symbol=final.symbol,
-                side="buy",
-                quantity=decision.shares,
-                stop_loss=final.stop,
-                take_profit=final.take_profit,
-                idempotency_key=idempotency_key,
-                client_order_id=idempotency_key,
+            sized = self.risk_manager.evaluate_many(
+                [final for _, _, final, _ in batch], budget, positions=held, weight_caps=weight_caps
             )
-            est_cost = self.slippage_model.estimate_cost(final.entry, decision.shares)
-            self.store.add_log("info", f"Estimated slippage+fees for {final.symbol}: ${est_cost:.2f}")
-            result = self.execution.submit_order(order)
-            if result.status == "blocked":
-                self.store.add_log("warning", f"Order blocked for {final.symbol} (mock mode).")
-                continue
-            trade_id = self.store.add_trade(
-                symbol=final.symbol,
-                side="buy",
-                quantity=decision.shares,
-                entry=final.entry,
-                stop=final.stop,
-                take_profit=final.take_profit,
-            )
-            self.store.add_fill(trade_id, final.symbol, decision.shares, final.entry)
-            self.performance_monitor.record_trade(-est_cost)
-            open_positions += 1
-            self.store.add_log("info", f"Bracket order submitted for {final.symbol}.")
+            for (symbol, bars, final, news_gate_result), (decision, funding) in zip(batch, sized):
+                remaining.pop(0)
+                funded = decision.approved
+                submitted = self._place_signal(
+                    symbol, bars, final, news_gate_result, decision, funding, decisions, portfolio, equity, cycle_id
+                )
+                if funding:
+                    # Funding stops at the first candidate that does not fit; later ones see no leftover cash,
+                    # nor the shares this alert already plans to sell.
+                    spent = portfolio.cash
+                    held = remaining_positions(held, funding.orders)
+                if submitted is not None:
+                    spent += submitted
+                    open_positions += 1
+                elif funded:
+                    break  # vetoed after funding: re-size the rest without it
+        if remaining and open_positions >= max_positions:
+            self.store.add_log("warning", "Max open positions reached; skipping new entries.")
         self.last_run_summary = {
             "status": "completed",
             "processed": processed,
+            "short_circuited": short_circuited,
             "decisions": decisions,
             "exit_actions": exit_actions,
         }
+        if paper_fills:
+            self.last_run_summary["paper_fills"] = paper_fills
+        if short_circuited:
+            self.store.add_log("info", f"Reused memoized decisions for {short_circuited} unchanged symbols.")
+        drift = self._evaluate_drift()
+        if drift:
+            self.last_run_summary["drift"] = drift
+        if (
+            self.settings.risk.rebalance.enabled
+            and self.rebalance_planner is not None
+            and self.rebalance_planner.due(self.store.last_rebalance_at())
+        ):
+            self.last_run_summary["rebalance"] = self.rebalance(dry_run=False).to_dict()
+        if self.stop_monitor is not None:
+            # Pick up this cycle's entries, exits and trailing-stop raises.
+            self.stop_monitor.refresh()
         return self.last_run_summary
 
+    def _advance_paper_clock(self) -> list[dict]:
+        """Step a PaperBroker one cycle's worth of bars so resting orders and bracket legs can fill."""
+        client = self.execution.client
+        days = self.settings.paper_broker.advance_per_cycle
+        if not isinstance(client, PaperBroker) or days <= 0:
+            return []
+        try:
+            fills = client.advance(days)
+        except ValueError as exc:
+            self.store.add_log("warning", f"Paper broker clock not advanced: {exc}")
+            return []
+        for fill in fills:
+            self.store.add_log("info", f"Paper fill {fill.symbol} {fill.filled_qty} @ {fill.average_fill_price}")
+        return [fill.model_dump() for fill in fills]
+
+    def _place_signal(
+        self,
+        symbol: str,
+        bars: pd.DataFrame,
+        final: SignalRecord,
+        news_gate_result: NewsRiskGateResult | None,
+        decision: DecisionRecord,
+        funding: FundingAlert | None,
+        decisions: list[dict],
+        portfolio: PortfolioSnapshot,
+        equity: float,
+        cycle_id: str,
+    ) -> float | None:
+        """Run one sized signal through the remaining checks; returns the cash spent if an order went out."""
+        correlation_service = self.correlation_manager.service
+        if (
+            news_gate_result
+            and self.settings.openai_news_gate_mode == "reduce"
+            and news_gate_result.risk_flag == "HIGH"
+            and decision.approved
+        ):
+            factor = self.settings.openai_news_gate_reduce_factor
+            reduced_shares = int(decision.shares * factor)
+            if reduced_shares <= 0:
+                self.store.add_log("warning", f"OpenAI news gate reduced {symbol} to zero shares.")
+                return None
+            decision = DecisionRecord(
+                symbol=decision.symbol,
+                outcome=decision.outcome,
+                approved=decision.approved,
+                shares=reduced_shares,
+                cash_required=reduced_shares * final.entry,
+                reasons=decision.reasons + ["OpenAI news gate reduced size"],
+                constraints=decision.constraints,
+            )
+        decisions.append(decision.model_dump())
+        if funding:
+            self.store.add_funding_alert(
+                symbol=final.symbol,
+                missing_cash=funding.missing_cash,
+                proposed_actions=", ".join(funding.proposed_actions),
+                details=json.dumps(funding.details),
+                orders=json.dumps([order.model_dump() for order in funding.orders]),
+            )
+            self.trade_queue.enqueue(final.symbol, final.to_model().model_dump(mode="json"))
+            if self.settings.notifications_enabled and self.settings.funding_alert.desktop_notifications:
+                notification = send_desktop_notification(
+                    "Funding Alert",
+                    f"{final.symbol}: missing ${funding.missing_cash:.2f}",
+                )
+                self.store.add_log("info", f"Desktop notify: {notification.detail}")
+            self.store.add_log("warning", f"Funding alert for {final.symbol}; queued trade.")
+            return None
+        if not decision.approved:
+            self.store.add_log("warning", f"Risk veto for {final.symbol}: {decision.reasons}")
+            return None
+        candidate_weight = (decision.shares * final.entry) / max(portfolio.equity, 1)
+        holdings = {pos["symbol"]: float(pos.get("market_value", 0)) / max(equity, 1) for pos in self.execution.client.list_positions()}
+        price_history = {final.symbol: bars}
+        held_symbols = [symbol for symbol in holdings if symbol != final.symbol]
+        if correlation_service is not None and correlation_service.tracks(final.symbol):
+            held_symbols = [symbol for symbol in held_symbols if not correlation_service.tracks(symbol)]
+        if held_symbols:
+            try:
+                price_history.update(self.data_provider.get_daily_bars_batch(held_symbols, limit=160))
+            except ValueError as exc:
+                self.store.add_log("warning", f"Price history fetch failed: {exc}")
+                return None
+        corr_ok, corr_reason = self.correlation_manager.check_symbol(
+            final.symbol,
+            candidate_weight,
+            holdings,
+            price_history,
+        )
+        sector_ok, sector_reason = self.correlation_manager.check_sector(
+            final.symbol,
+            candidate_weight,
+            holdings,
+            sector_map=self.sector_map,
+        )
+        if not corr_ok or not sector_ok:
+            self.store.add_log("warning", f"Correlation veto for {final.symbol}: {corr_reason or sector_reason}")
+            return None
+        if self.portfolio_risk is not None:
+            var_ok, var_reason = self.portfolio_risk.check(holdings, final.symbol, candidate_weight)
+            if not var_ok:
+                self.store.add_log("warning", f"Portfolio risk veto for {final.symbol}: {var_reason}")
+                return None
+        idempotency_key = f"{cycle_id}-{final.symbol}-{decision.shares}"
+        order = OrderRequest(
+            symbol=final.symbol,
+            side="buy",
+            quantity=decision.shares,
+            stop_loss=final.stop,
+            take_profit=final.take_profit,
+            idempotency_key=idempotency_key,
+            client_order_id=idempotency_key,
+        )
+        est_cost = self.slippage_model.estimate_cost(final.entry, decision.shares)
+        self.store.add_log("info", f"Estimated slippage+fees for {final.symbol}: ${est_cost:.2f}")
+        result = self.execution.submit_order(order)
+        if result.status == "blocked":
+            self.store.add_log("warning", f"Order blocked for {final.symbol} (mock mode).")
+            return None
+        trade_id = self.store.add_trade(
+            symbol=final.symbol,
+            side="buy",
+            quantity=decision.shares,
+            entry=final.entry,
+            stop=final.stop,
+            take_profit=final.take_profit,
+            strategies={intent.strategy: intent.confidence for intent in final.intents},
+        )
+        self.store.add_fill(trade_id, final.symbol, decision.shares, final.entry)
+        self.performance_monitor.record_trade(-est_cost)
+        self.store.add_log("info", f"Bracket order submitted for {final.symbol}.")
+        return decision.shares * final.entry
+
+    def rebalance(self, dry_run: bool = True) -> RebalancePlan:
+        """Plan (and unless ``dry_run``, submit) the orders that bring holdings back to target weights.
+
+        Targets come from the portfolio optimizer for holdings it has history
+        for and equal weights otherwise; holdings the optimizer cannot price
+        keep their current weight.
+        """
+        planner = self.rebalance_planner
+        if planner is None:
+            return RebalancePlan(dry_run=dry_run)
+        account = self.execution.client.get_account()
+        portfolio = PortfolioSnapshot.from_account(account)
+        equity = float(account.get("equity", portfolio.cash))
+        positions = self.execution.client.list_positions()
+        optimizer = self.portfolio_optimizer
+        if optimizer is not None and optimizer.symbols:
+            targets = {pos["symbol"]: float(pos.get("market_value", 0)) / max(equity, 1) for pos in positions}
+            known = [symbol for symbol in targets if symbol in optimizer.symbols]
+            targets.update(optimizer.optimize(known, sectors=self.sector_map))
+        else:
+            targets = planner.equal_weight_targets(positions, equity)
+        plan = planner.plan(positions, targets, equity=equity, cash=portfolio.cash)
+        plan.dry_run = dry_run
+        if not dry_run:
+            prices = {pos["symbol"]: float(pos.get("current_price", 0) or 0.0) for pos in positions}
+            for order in plan.orders:
+                result = self.execution.submit_order(order)
+                self.store.add_log("info", f"Rebalance {order.side} {order.quantity} {order.symbol}: {result.status}")
+                self._record_rebalance_fill(order, result, prices.get(order.symbol, 0.0))
+            self.store.add_rebalance(
+                orders=json.dumps([order.model_dump() for order in plan.orders]),
+                details=json.dumps({"drift": plan.drift, "estimated_costs": plan.estimated_costs}),
+                dry_run=False,
+            )
+        return plan
+
+    def _record_rebalance_fill(self, order: OrderRequest, result: OrderResult, price: float) -> None:
+        """Mirror a rebalance order in ``trades``: sells shrink open rows oldest first, buys open a row."""
+        if result.status in {"blocked", "rejected", "canceled"}:
+            return
+        quantity = int(result.filled_qty or order.quantity)
+        price = float(result.average_fill_price or price)
+        rows = [trade for trade in self.store.list_open_trades() if trade["symbol"] == order.symbol]
+        if order.side == "sell":
+            for trade in rows:
+                if quantity <= 0:
+                    break
+                sold = min(quantity, int(trade["quantity"]))
+                self.store.resize_trade(int(trade["id"]), int(trade["quantity"]) - sold)
+                self.store.add_fill(int(trade["id"]), order.symbol, -sold, price)
+                quantity -= sold
+            return
+        # Top-ups inherit the protective levels of the latest entry in the symbol;
+        # a holding without one gets ATR levels, as a fresh entry would.
+        levels = (float(rows[-1]["stop"]), float(rows[-1]["take_profit"])) if rows else self._atr_levels(order.symbol)
+        if levels is None:
+            self.store.add_log("warning", f"No bars to price a bracket for rebalanced {order.symbol}; trade row skipped.")
+            return
+        trade_id = self.store.add_trade(
+            symbol=order.symbol,
+            side="buy",
+            quantity=quantity,
+            entry=price,
+            stop=levels[0],
+            take_profit=levels[1],
+        )
+        self.store.add_fill(trade_id, order.symbol, quantity, price)
+
+    def _atr_levels(self, symbol: str) -> Optional[tuple[float, float]]:
+        """Stop and take-profit around the latest close, priced like a strategy intent's bracket."""
+        try:
+            bars = self.data_provider.get_daily_bars(symbol, limit=160)
+        except ValueError:
+            return None
+        if bars.empty:
+            return None
+        close = float(bars["close"].iloc[-1])
+        atr = max(float(self.feature_engine.latest_atr([bars])[0]), 0.1)
+        levels = self.settings.risk.stop_takeprofit
+        return close - levels.atr_multiplier_stop * atr, close + levels.atr_multiplier_tp * atr
+
+    def _refresh_risk_panels(self, cycle_bars: dict[str, pd.DataFrame]) -> None:
+        """Advance the rolling covariance and VaR panel with this cycle's bars plus holdings, fetched once."""
+        service = self.correlation_manager.service
+        if service is None and self.portfolio_risk is None and self.portfolio_optimizer is None:
+            return
+        bars = dict(cycle_bars)
+        held = [pos["symbol"] for pos in self.execution.client.list_positions() if pos["symbol"] not in bars]
+        if held:
+            try:
+                bars.update(self.data_provider.get_daily_bars_batch(held, limit=160))
+            except ValueError as exc:
+                self.store.add_log("warning", f"Price history fetch failed: {exc}")
+        if service is not None:
+            service.update(bars)
+        if self.portfolio_risk is not None or self.portfolio_optimizer is not None:
+            returns = daily_returns(bars)
+            if self.portfolio_risk is not None:
+                self.portfolio_risk.set_panel(returns)
+            if self.portfolio_optimizer is not None:
+                self.portfolio_optimizer.set_panel(returns)
+
+    def _target_weights(self, finals: list[SignalRecord], equity: float) -> dict[str, float] | None:
+        """Per-candidate weight caps from the portfolio optimizer: target weight minus what is already held.
+
+        Holdings and candidates are optimised together; a candidate's expected
+        daily return is its score times the take-profit distance over the
+        maximum holding period.
+        """
+        optimizer = self.portfolio_optimizer
+        if optimizer is None or not finals:
+            return None
+        holdings = {
+            pos["symbol"]: float(pos.get("market_value", 0)) / max(equity, 1)
+            for pos in self.execution.client.list_positions()
+        }
+        hold_days = max(self.settings.trading.target_hold_days_max, 1)
+        expected = {
+            final.symbol: final.score * (final.take_profit / final.entry - 1) / hold_days
+            for final in finals
+            if final.entry > 0
+        }
+        targets = optimizer.optimize([*holdings, *expected], expected=expected, sectors=self.sector_map)
+        known = set(optimizer.symbols)
+        return {
+            symbol: max(targets[symbol] - holdings.get(symbol, 0.0), 0.0) for symbol in expected if symbol in known
+        }
+
+    def _active_model(self) -> LoadedModel | None:
+        if self.model_inference is None or not self.settings.ml.live_inference:
+            return None
+        return self.model_inference.active()
+
+    def _required_features(self, strategies: list[Strategy], loaded: LoadedModel | None = None) -> set[str]:
+        """Features this cycle reads: enabled strategies, the setup gate, and live/shadow models."""
+        names = required_features(strategies) | set(self.setup_gate.required_features)
+        if loaded is not None:
+            names.update(loaded.feature_list)
+        if self.shadow_scorer is not None:
+            names.update(self.shadow_scorer.feature_names())
+        return names
+
+    def _score_candidates(self, loaded: LoadedModel | None, candidates: list[FeatureVector]) -> dict[str, float]:
+        if loaded is None or self.model_inference is None or not candidates:
+            return {}
+        probabilities = self.model_inference.score(loaded, candidates)
+        if probabilities:
+            self.store.add_log("info", f"Scored {len(probabilities)} candidates with {loaded.model_id}.")
+        return probabilities
+
+    def _evaluate_drift(self) -> dict | None:
+        if self.drift_monitor is None:
+            return None
+        result = self.drift_monitor.evaluate()
+        if result is None:
+            return None
+        report = result.report
+        if report.triggered:
+            self.store.add_log(
+                "warning",
+                f"Feature drift {report.data_drift:.2f} vs {result.model_id}: {', '.join(report.drifted_features)}",
+            )
+        if result.plan and result.plan.triggered:
+            self.store.add_log("warning", f"Retrain planned: {result.plan.reason}")
+        return {
+            "model_id": result.model_id,
+            "data_drift": report.data_drift,
+            "triggered": report.triggered,
+            "drifted_features": report.drifted_features,
+            "retrain_planned": bool(result.plan and result.plan.triggered),
+        }
+
     def mock_mode(self) -> bool:
         return bool(getattr(self.execution.client, "is_mock", False))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import ClassVar, Tuple
 
 from src.core.contracts import Features
 
@@ -9,6 +10,7 @@ from src.core.contracts import Features
 class SetupGate:
     min_trend: float = 0.0
     min_rsi: float = 45.0
+    required_features: ClassVar[Tuple[str, ...]] = ("trend", "rsi", "close", "ema_slow")
 
     def allow(self, features: Features) -> tuple[bool, str]:
         trend = features.values.get("trend", 0.0)
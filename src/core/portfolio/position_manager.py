@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+import json
+import sqlite3
+import threading
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
 
 from src.core.contracts import OrderRequest
 from src.core.data.market_data import MarketDataProvider
+from src.core.ensemble.learner import OnlineWeightLearner
 from src.core.execution.execution_service import ExecutionService
 from src.core.features.feature_engine import FeatureEngine
 from src.core.monitoring.performance import PerformanceMonitor
@@ -21,47 +29,107 @@ class PositionManager:
     max_hold_days: int
     trailing_stop_enabled: bool
     trailing_atr_multiplier: float
+    weight_learner: OnlineWeightLearner | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def evaluate_exits(self) -> list[str]:
-        actions: list[str] = []
-        open_trades = self.store.list_open_trades()
-        for trade in open_trades:
-            symbol = trade["symbol"]
-            bars = self.data_provider.get_daily_bars(symbol, limit=120)
-            features = self.feature_engine.compute(symbol, bars)
-            latest_close = features.values["close"]
-            stop = float(trade["stop"])
-            take_profit = float(trade["take_profit"])
-            opened_at = datetime.fromisoformat(trade["opened_at"])
-            held_days = (datetime.now(timezone.utc) - opened_at).days
+        """Check every open trade's stop, take-profit and hold limit in one pass.
+
+        Bars for all open symbols come from one batch fetch (per symbol if the
+        batch fails, skipping only the trades whose bars are unavailable);
+        closes, ATRs and the exit masks are arrays over the trades; stop raises
+        and the closes whose sells went through are written in one transaction.
+        """
+        with self._lock:
+            open_trades = self.store.list_open_trades()
+            if not open_trades:
+                return []
+            bars = self._fetch_bars(list(dict.fromkeys(trade["symbol"] for trade in open_trades)))
+            open_trades = [trade for trade in open_trades if trade["symbol"] in bars]
+            if not open_trades:
+                return []
+            symbols = [trade["symbol"] for trade in open_trades]
+            frames = [bars[symbol] for symbol in symbols]
+            latest_close = np.array([float(frame["close"].iloc[-1]) for frame in frames])
+            stop = np.array([float(trade["stop"]) for trade in open_trades])
+            take_profit = np.array([float(trade["take_profit"]) for trade in open_trades])
+            now = datetime.now(timezone.utc)
+            held_days = np.array([(now - datetime.fromisoformat(trade["opened_at"])).days for trade in open_trades])
+
+            raised = np.zeros(len(open_trades), dtype=bool)
             if self.trailing_stop_enabled:
-                atr = max(features.values.get("atr", 0.0), 0.01)
-                new_stop = max(stop, latest_close - atr * self.trailing_atr_multiplier)
-                if new_stop > stop:
-                    self.store.update_trade_stop(int(trade["id"]), new_stop)
-                    stop = new_stop
-                    actions.append(f"Trailing stop updated for {symbol} -> {new_stop:.2f}")
-            exit_reason = None
-            if latest_close <= stop:
-                exit_reason = "stop_loss"
-            elif latest_close >= take_profit:
-                exit_reason = "take_profit"
-            elif held_days >= self.max_hold_days:
-                exit_reason = "time_exit"
+                atr = np.maximum(self.feature_engine.latest_atr(frames), 0.01)
+                new_stop = np.maximum(stop, latest_close - atr * self.trailing_atr_multiplier)
+                raised = new_stop > stop
+                stop = new_stop
+            reasons = np.select(
+                [latest_close <= stop, latest_close >= take_profit, held_days >= self.max_hold_days],
+                ["stop_loss", "take_profit", "time_exit"],
+                default="",
+            )
+            exiting = np.flatnonzero(reasons != "")
+            actions = [f"Trailing stop updated for {symbols[i]} -> {stop[i]:.2f}" for i in np.flatnonzero(raised)]
+            actions += self._close(
+                [open_trades[i] for i in exiting],
+                [float(latest_close[i]) for i in exiting],
+                [str(reasons[i]) for i in exiting],
+                stops={int(open_trades[i]["id"]): float(stop[i]) for i in np.flatnonzero(raised)},
+            )
+            return actions
 
-            if exit_reason:
-                idempotency_key = f"exit-{trade['id']}-{symbol}"
-                request = OrderRequest(
-                    symbol=symbol,
-                    side="sell",
-                    quantity=int(trade["quantity"]),
-                    idempotency_key=idempotency_key,
-                    client_order_id=idempotency_key,
-                )
+    def _fetch_bars(self, symbols: list[str]) -> dict[str, pd.DataFrame]:
+        try:
+            return self.data_provider.get_daily_bars_batch(symbols, limit=120)
+        except Exception as exc:  # noqa: BLE001
+            self.store.add_log("warning", f"Batch bar fetch for exits failed ({exc}); retrying per symbol.")
+        bars: dict[str, pd.DataFrame] = {}
+        for symbol in symbols:
+            try:
+                bars.update(self.data_provider.get_daily_bars_batch([symbol], limit=120))
+            except Exception as exc:  # noqa: BLE001
+                self.store.add_log("warning", f"No bars for {symbol}; skipping its exit checks: {exc}")
+        return bars
+
+    def close_trades(self, trade_ids: Sequence[int], prices: Sequence[float], reasons: Sequence[str]) -> list[str]:
+        """Exit the given trades at ``prices`` if they are still open (used by the intraday stop monitor)."""
+        with self._lock:
+            open_trades = {int(trade["id"]): trade for trade in self.store.list_open_trades()}
+            picked = [(open_trades[i], p, r) for i, p, r in zip(trade_ids, prices, reasons) if i in open_trades]
+            if not picked:
+                return []
+            trades, exit_prices, exit_reasons = map(list, zip(*picked))
+            return self._close(trades, exit_prices, exit_reasons)
+
+    def _close(
+        self,
+        trades: Sequence[sqlite3.Row],
+        prices: Sequence[float],
+        reasons: Sequence[str],
+        stops: Mapping[int, float] | None = None,
+    ) -> list[str]:
+        # Each sell is submitted on its own; only the trades whose sell went through are closed.
+        sold = []
+        for trade, price, reason in zip(trades, prices, reasons):
+            idempotency_key = f"exit-{trade['id']}-{trade['symbol']}"
+            request = OrderRequest(
+                symbol=trade["symbol"],
+                side="sell",
+                quantity=int(trade["quantity"]),
+                idempotency_key=idempotency_key,
+                client_order_id=idempotency_key,
+            )
+            try:
                 self.execution.submit_order(request, allow_exit_without_unlock=True)
-                entry_price = float(trade["entry"])
-                pnl = (latest_close - entry_price) * int(trade["quantity"])
-                self.performance_monitor.record_trade(pnl)
-                self.store.close_trade(int(trade["id"]))
-                actions.append(f"Exit {symbol} triggered by {exit_reason} at {latest_close:.2f}")
+            except Exception as exc:  # noqa: BLE001
+                self.store.add_log("error", f"Exit order for {trade['symbol']} failed: {exc}")
+                continue
+            sold.append((trade, price, reason))
+        self.store.update_open_trades(stops=stops or {}, closed=[int(trade["id"]) for trade, _, _ in sold])
+        actions: list[str] = []
+        for trade, price, reason in sold:
+            entry_price = float(trade["entry"])
+            self.performance_monitor.record_trade((price - entry_price) * int(trade["quantity"]))
+            if self.weight_learner is not None and trade["strategies"]:
+                self.weight_learner.update(json.loads(trade["strategies"]), entry_price, price)
+            actions.append(f"Exit {trade['symbol']} triggered by {reason} at {price:.2f}")
         return actions
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.core.contracts import OrderRequest
+from src.core.execution.slippage import SlippageModel
+
+FREQUENCIES = {"daily": timedelta(days=1), "weekly": timedelta(days=7)}
+
+
+@dataclass
+class RebalancePlan:
+    orders: list[OrderRequest] = field(default_factory=list)
+    drift: Dict[str, float] = field(default_factory=dict)
+    estimated_costs: Dict[str, float] = field(default_factory=dict)
+    turnover: float = 0.0
+    dry_run: bool = True
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def estimated_cost(self) -> float:
+        return float(sum(self.estimated_costs.values()))
+
+    def to_dict(self) -> dict:
+        return {
+            "orders": [order.model_dump() for order in self.orders],
+            "drift": self.drift,
+            "estimated_costs": self.estimated_costs,
+            "estimated_cost": self.estimated_cost,
+            "turnover": self.turnover,
+            "dry_run": self.dry_run,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+@dataclass
+class RebalancePlanner:
+    """Trades the book back to target weights once a symbol drifts past ``threshold``.
+
+    Drift is ``target - current`` weight per symbol over the union of holdings
+    and targets. Only symbols whose absolute drift reaches the threshold trade,
+    straight to target, so each symbol gets at most one (already netted) order.
+    Buys are scaled down so they never spend more than the sells free up plus
+    the cash above the buffer. Everything is array math over the book.
+    """
+
+    slippage_model: SlippageModel
+    threshold: float = 0.06
+    frequency: str = "weekly"
+    max_position_weight: float = 1.0
+    cash_buffer: float = 0.0
+
+    def due(self, last_run: Optional[datetime], now: Optional[datetime] = None) -> bool:
+        interval = FREQUENCIES.get(self.frequency)
+        if interval is None:
+            return False  # "manual": only on request
+        now = now or datetime.now(timezone.utc)
+        return last_run is None or now - last_run >= interval
+
+    def equal_weight_targets(self, positions: Sequence[Mapping], equity: float) -> Dict[str, float]:
+        """Equal weights over the holdings at the book's current gross exposure."""
+        if not positions or equity <= 0:
+            return {}
+        invested = sum(float(pos.get("market_value", 0) or 0.0) for pos in positions) / equity
+        weight = min(invested / len(positions), self.max_position_weight)
+        return {str(pos["symbol"]): weight for pos in positions}
+
+    def plan(
+        self,
+        positions: Sequence[Mapping],
+        targets: Mapping[str, float],
+        equity: float,
+        cash: float,
+        prices: Optional[Mapping[str, float]] = None,
+    ) -> RebalancePlan:
+        held = {str(pos["symbol"]): pos for pos in positions}
+        symbols = list(dict.fromkeys([*held, *targets]))
+        if not symbols or equity <= 0:
+            return RebalancePlan()
+        prices = prices or {}
+        quantity = np.array([float(held[s].get("qty", 0) or 0.0) if s in held else 0.0 for s in symbols])
+        price = np.array(
+            [
+                float(prices.get(s) or (held[s].get("current_price") if s in held else 0.0) or 0.0)
+                for s in symbols
+            ]
+        )
+        value = np.array([float(held[s].get("market_value", 0) or 0.0) if s in held else 0.0 for s in symbols])
+        current = np.where(value != 0, value, quantity * price) / equity
+        target = np.minimum(np.array([float(targets.get(s, 0.0)) for s in symbols]), self.max_position_weight)
+        drift = target - current
+        trade = (np.abs(drift) >= self.threshold) & (price > 0)
+
+        shares = np.where(trade, drift * equity / np.where(price > 0, price, 1.0), 0.0)
+        sells = np.where(shares < 0, np.minimum(np.ceil(-shares), quantity), 0.0)
+        buys = np.where(shares > 0, np.floor(shares), 0.0)
+        budget = sells @ price + max(cash - self.cash_buffer * equity, 0.0)
+        spend = buys @ price
+        if spend > budget > 0:
+            buys = np.floor(buys * budget / spend)
+        elif budget <= 0:
+            buys[:] = 0.0
+
+        costs = self.slippage_model.estimate_cost(price, sells + buys)
+        plan = RebalancePlan(drift={s: float(d) for s, d, t in zip(symbols, drift, trade) if t})
+        for side, amounts in (("sell", sells), ("buy", buys)):
+            for pos in np.flatnonzero(amounts > 0):
+                symbol, count = symbols[pos], int(amounts[pos])
+                key = f"rebalance-{plan.created_at:%Y%m%d}-{symbol}-{side}-{count}"
+                plan.orders.append(
+                    OrderRequest(symbol=symbol, side=side, quantity=count, idempotency_key=key, client_order_id=key)
+                )
+                plan.estimated_costs[symbol] = float(costs[pos])
+        plan.turnover = float(((sells + buys) @ price) / equity)
+        return plan
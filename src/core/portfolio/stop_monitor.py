@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+import threading
+from typing import Dict, Iterable, Mapping, Optional, Protocol, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.portfolio.position_manager import PositionManager
+from src.core.storage.db import SQLiteStore
+
+Tick = tuple[str, float]
+
+
+class QuoteSource(Protocol):
+    def poll(self, symbols: Sequence[str]) -> list[Tick]:
+        """Latest (symbol, price) ticks for ``symbols``; may be empty."""
+
+
+@dataclass
+class ClientQuoteSource:
+    """Polls the broker client's latest trade prices."""
+
+    client: object
+
+    def poll(self, symbols: Sequence[str]) -> list[Tick]:
+        if not symbols:
+            return []
+        return list(self.client.get_latest_prices(list(symbols)).items())
+
+
+@dataclass
+class ReplayQuoteSource:
+    """Replays recorded tick batches, one batch per ``poll``; stands in for the live feed in tests."""
+
+    batches: list[list[Tick]]
+    _cursor: int = 0
+
+    @classmethod
+    def from_bars(cls, bars: Mapping[str, pd.DataFrame]) -> "ReplayQuoteSource":
+        """Four ticks per daily bar (open, low/high, high/low, close), all symbols stepped together.
+
+        Down bars visit the high first and up bars the low first, the usual
+        assumption when only OHLC is known.
+        """
+        paths = {}
+        for symbol, frame in bars.items():
+            open_, high, low, close = (frame[name].to_numpy(dtype=float) for name in ("open", "high", "low", "close"))
+            up = close >= open_
+            steps = np.column_stack([open_, np.where(up, low, high), np.where(up, high, low), close])
+            paths[symbol] = steps.ravel().tolist()
+        length = max((len(path) for path in paths.values()), default=0)
+        batches = [[(symbol, path[i]) for symbol, path in paths.items() if i < len(path)] for i in range(length)]
+        return cls(batches)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._cursor >= len(self.batches)
+
+    def poll(self, symbols: Sequence[str]) -> list[Tick]:
+        if self.exhausted:
+            return []
+        wanted = set(symbols)
+        batch = self.batches[self._cursor]
+        self._cursor += 1
+        return [(symbol, price) for symbol, price in batch if symbol in wanted]
+
+
+@dataclass
+class PriceLevelIndex:
+    """Per-symbol sorted stop and take-profit levels; a tick finds its breaches by bisection."""
+
+    _stops: Dict[str, list[tuple[float, int]]] = field(default_factory=dict)
+    _targets: Dict[str, list[tuple[float, int]]] = field(default_factory=dict)
+    _levels: Dict[int, tuple[str, float, float]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._stops)
+
+    def add(self, trade_id: int, symbol: str, stop: float, take_profit: float) -> None:
+        if trade_id in self._levels:
+            self.remove(trade_id)
+        insort(self._stops.setdefault(symbol, []), (stop, trade_id))
+        insort(self._targets.setdefault(symbol, []), (take_profit, trade_id))
+        self._levels[trade_id] = (symbol, stop, take_profit)
+
+    def remove(self, trade_id: int) -> None:
+        symbol, stop, take_profit = self._levels.pop(trade_id)
+        for book, level in ((self._stops, stop), (self._targets, take_profit)):
+            levels = book[symbol]
+            del levels[bisect_left(levels, (level, trade_id))]
+            if not levels:
+                del book[symbol]
+
+    def breaches(self, symbol: str, price: float) -> list[tuple[int, str]]:
+        """Trades whose stop is at or above ``price`` or whose take-profit is at or below it."""
+        stops = self._stops.get(symbol)
+        if not stops:
+            return []
+        hit = [(trade_id, "stop_loss") for _, trade_id in stops[bisect_left(stops, (price, -1)) :]]
+        targets = self._targets[symbol]
+        hit += [(trade_id, "take_profit") for _, trade_id in targets[: bisect_right(targets, (price, float("inf")))]]
+        return hit
+
+
+@dataclass
+class StopMonitor:
+    """Intraday stop/take-profit watcher over latest prices for the open trades.
+
+    ``refresh`` loads stop and take-profit levels from the store (after every
+    cycle, so trailing raises and new entries are picked up); each tick is a
+    bisection into ``PriceLevelIndex``; breaches exit through
+    ``PositionManager.close_trades`` with ``allow_exit_without_unlock``.
+    Breached trades leave the index while their exit is in flight, and any
+    whose exit fails are reloaded from the store.
+    """
+
+    store: SQLiteStore
+    position_manager: PositionManager
+    source: QuoteSource
+    poll_seconds: float = 5.0
+    index: PriceLevelIndex = field(default_factory=PriceLevelIndex)
+    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+    _stop_event: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _index_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def refresh(self) -> int:
+        index = PriceLevelIndex()
+        for trade in self.store.list_open_trades():
+            index.add(int(trade["id"]), trade["symbol"], float(trade["stop"]), float(trade["take_profit"]))
+        with self._index_lock:
+            self.index = index
+        return len(index)
+
+    def on_ticks(self, ticks: Iterable[Tick]) -> list[str]:
+        exits: Dict[int, tuple[float, str]] = {}
+        with self._index_lock:
+            for symbol, price in ticks:
+                for trade_id, reason in self.index.breaches(symbol, price):
+                    exits.setdefault(trade_id, (price, reason))
+            for trade_id in exits:
+                self.index.remove(trade_id)
+        if not exits:
+            return []
+        ids = list(exits)
+        try:
+            actions = self.position_manager.close_trades(
+                ids, [exits[i][0] for i in ids], [f"intraday_{exits[i][1]}" for i in ids]
+            )
+        except Exception:
+            self.refresh()  # the breached trades are still open: watch them again
+            raise
+        if len(actions) < len(ids):
+            # Some exits did not go through (or were already closed); re-sync the index with the store.
+            self.refresh()
+        return actions
+
+    def poll_once(self) -> list[str]:
+        with self._index_lock:
+            symbols = self.index.symbols
+        return self.on_ticks(self.source.poll(symbols)) if symbols else []
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="stop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.poll_seconds):
+            try:
+                for action in self.poll_once():
+                    self.store.add_log("info", action)
+            except Exception as exc:  # noqa: BLE001
+                self.store.add_log("error", f"Stop monitor poll failed: {exc}")
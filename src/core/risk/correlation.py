@@ -5,12 +5,15 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
+from src.core.risk.covariance import CorrelationService
+
 
 @dataclass
 class CorrelationManager:
     max_symbol_correlation: float
     max_sector_weight: float
     window: int = 60
+    service: CorrelationService | None = None
 
     def check_symbol(
         self,
@@ -21,6 +24,17 @@ class CorrelationManager:
     ) -> tuple[bool, str]:
         if not holdings:
             return True, "no_holdings"
+        if self.service is not None and self.service.tracks(candidate):
+            # Row lookup against the incrementally maintained matrix; only
+            # holdings the service does not track fall through to price history.
+            correlations = self.service.correlations(candidate)
+            for symbol in holdings:
+                corr = correlations.get(symbol) if symbol != candidate else None
+                if corr is not None and corr >= self.max_symbol_correlation:
+                    return False, f"correlation {corr:.2f} with {symbol}"
+            holdings = {symbol: weight for symbol, weight in holdings.items() if not self.service.tracks(symbol)}
+            if not holdings:
+                return True, "ok"
         candidates = {candidate: price_history.get(candidate)}
         for symbol, df in price_history.items():
             if symbol in holdings and df is not None:
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RollingCovariance:
+    """Rolling-window pairwise covariance/correlation over a fixed symbol set.
+
+    Each pushed return row is a rank-one add (and, once the window is full, the
+    row leaving it a rank-one remove) on four accumulators, so an update is
+    O(symbols^2) and a pair lookup is O(1). Missing returns (NaN) are handled
+    pairwise like ``DataFrame.corr``: a pair only uses rows where both are present.
+    """
+
+    def __init__(self, symbols: Sequence[str], window: int) -> None:
+        self.symbols = list(symbols)
+        self.index: Dict[str, int] = {symbol: pos for pos, symbol in enumerate(self.symbols)}
+        self.window = window
+        size = len(self.symbols)
+        self._buffer = np.full((window, size), np.nan)
+        self._head = 0
+        self.count = 0
+        self._pushes_since_rebuild = 0
+        self._counts = np.zeros((size, size))
+        self._sums = np.zeros((size, size))  # [i, j] = sum of x_i over rows where j is present
+        self._squares = np.zeros((size, size))
+        self._products = np.zeros((size, size))
+
+    def push(self, returns: Sequence[float]) -> None:
+        row = np.asarray(returns, dtype=float)
+        if self.count == self.window:
+            self._apply(self._buffer[self._head], -1.0)
+        else:
+            self.count += 1
+        self._buffer[self._head] = row
+        self._apply(row, 1.0)
+        self._head = (self._head + 1) % self.window
+        self._pushes_since_rebuild += 1
+        # Add/remove round-off accumulates; re-summing the window once per cycle of it keeps drift bounded.
+        if self._pushes_since_rebuild >= self.window:
+            self._rebuild()
+
+    def returns(self) -> np.ndarray:
+        """The window's return rows, oldest first."""
+        order = [(self._head - self.count + offset) % self.window for offset in range(self.count)]
+        return self._buffer[order]
+
+    def covariance(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self._products - self._sums * self._sums.T / self._counts) / (self._counts - 1)
+        return np.where(self._counts >= 2, cov, np.nan)
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (self._squares - self._sums**2 / self._counts) / (self._counts - 1)
+            corr = self.covariance() / np.sqrt(var * var.T)
+        return np.clip(np.where(var * var.T > 0, corr, np.nan), -1.0, 1.0)
+
+    def correlation_row(self, symbol: str) -> np.ndarray:
+        i = self.index[symbol]
+        counts = self._counts[i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_i = self._sums[i] / counts
+            mean_j = self._sums[:, i] / counts
+            cov = self._products[i] / counts - mean_i * mean_j
+            var_i = self._squares[i] / counts - mean_i**2
+            var_j = self._squares[:, i] / counts - mean_j**2
+            corr = cov / np.sqrt(var_i * var_j)
+        return np.clip(np.where((counts >= 2) & (var_i * var_j > 0), corr, np.nan), -1.0, 1.0)
+
+    def _apply(self, row: np.ndarray, sign: float) -> None:
+        present = np.isfinite(row).astype(float)
+        values = np.where(present > 0, row, 0.0)
+        self._counts += sign * np.outer(present, present)
+        self._sums += sign * np.outer(values, present)
+        self._squares += sign * np.outer(values * values, present)
+        self._products += sign * np.outer(values, values)
+
+    def _rebuild(self) -> None:
+        for accumulator in (self._counts, self._sums, self._squares, self._products):
+            accumulator.fill(0.0)
+        for offset in range(self.count):
+            self._apply(self._buffer[(self._head - 1 - offset) % self.window], 1.0)
+        self._pushes_since_rebuild = 0
+
+
+@dataclass
+class CorrelationService:
+    """Daily-return covariance for the watchlist plus holdings, advanced one bar at a time.
+
+    ``update`` only pushes bars newer than the last one seen; a symbol joining
+    the set, or closes arriving for dates already pushed without them (the
+    symbol was left out of an earlier update), trigger a rebuild from the
+    retained closes so no return is lost to a partial update.
+    """
+
+    window: int = 60
+    _rolling: Optional[RollingCovariance] = field(default=None, repr=False)
+    _last_date: Optional[pd.Timestamp] = field(default=None, repr=False)
+    _closes: Optional[pd.DataFrame] = field(default=None, repr=False)  # last window + 1 dates pushed
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._rolling.symbols) if self._rolling is not None else []
+
+    def tracks(self, symbol: str) -> bool:
+        return self._rolling is not None and symbol in self._rolling.index
+
+    def update(self, bars: Mapping[str, pd.DataFrame]) -> int:
+        """Fold in any new daily bars; returns the number of return rows pushed."""
+        closes = _daily_closes(bars)
+        if closes.empty:
+            return 0
+        if self._rolling is None or not set(closes.columns) <= set(self._rolling.symbols):
+            return self._rebuild(closes)
+        closes = closes.reindex(columns=self._rolling.symbols)
+        seen = closes[closes.index.isin(self._closes.index)]
+        if (seen.notna() & self._closes.reindex(seen.index).isna()).to_numpy().any():
+            return self._rebuild(closes)
+        fresh = closes[closes.index > self._last_date]
+        if fresh.empty:
+            return 0
+        # Symbols absent from this update push NaN; their closes for these dates backfill later.
+        returns = pd.concat([self._closes.iloc[[-1]], fresh]).pct_change(fill_method=None).iloc[1:]
+        for row in returns.to_numpy():
+            self._rolling.push(row)
+        self._remember(pd.concat([self._closes, fresh]))
+        return len(fresh)
+
+    def correlation(self, a: str, b: str) -> Optional[float]:
+        if not (self.tracks(a) and self.tracks(b)):
+            return None
+        value = self._rolling.correlation_row(a)[self._rolling.index[b]]
+        return None if np.isnan(value) else float(value)
+
+    def correlations(self, symbol: str) -> Dict[str, float]:
+        if not self.tracks(symbol):
+            return {}
+        row = self._rolling.correlation_row(symbol)
+        return {other: float(value) for other, value in zip(self._rolling.symbols, row) if not np.isnan(value)}
+
+    def returns_panel(self) -> pd.DataFrame:
+        if self._rolling is None:
+            return pd.DataFrame()
+        return pd.DataFrame(self._rolling.returns(), columns=self._rolling.symbols)
+
+    def covariance_matrix(self) -> pd.DataFrame:
+        if self._rolling is None:
+            return pd.DataFrame()
+        return pd.DataFrame(self._rolling.covariance(), index=self._rolling.symbols, columns=self._rolling.symbols)
+
+    def correlation_matrix(self) -> pd.DataFrame:
+        if self._rolling is None:
+            return pd.DataFrame()
+        return pd.DataFrame(self._rolling.correlation(), index=self._rolling.symbols, columns=self._rolling.symbols)
+
+    def _rebuild(self, closes: pd.DataFrame) -> int:
+        symbols = sorted(set(closes.columns) | set(self.symbols))
+        closes = closes.reindex(columns=symbols)
+        if self._closes is not None:
+            closes = closes.combine_first(self._closes.reindex(columns=symbols))
+        returns = closes.pct_change(fill_method=None).iloc[1:].tail(self.window)
+        self._rolling = RollingCovariance(symbols, self.window)
+        for row in returns.to_numpy():
+            self._rolling.push(row)
+        self._remember(closes)
+        return len(returns)
+
+    def _remember(self, closes: pd.DataFrame) -> None:
+        self._last_date = closes.index[-1]
+        self._closes = closes.tail(self.window + 1)
+
+
+def daily_returns(bars: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Date-aligned (days x symbols) simple returns from per-symbol daily bars."""
+    return _daily_closes(bars).pct_change(fill_method=None).iloc[1:]
+
+
+def _daily_closes(bars: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    columns = {}
+    for symbol, frame in bars.items():
+        if frame is None or frame.empty or "ts" not in frame.columns or "close" not in frame.columns:
+            continue
+        ts = frame["ts"]
+        if not isinstance(ts.dtype, pd.DatetimeTZDtype):
+            ts = pd.to_datetime(ts, utc=True)
+        # UTC calendar days; flooring the raw values skips pandas' per-call frequency inference.
+        dates = pd.DatetimeIndex(ts.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]"))
+        closes = pd.Series(frame["close"].to_numpy(dtype=float), index=dates)
+        columns[symbol] = closes if dates.is_unique else closes.groupby(level=0).last()
+    return pd.concat(columns, axis=1).sort_index() if columns else pd.DataFrame()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import math
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from src.core.contracts import OrderRequest
+from src.core.execution.slippage import SlippageModel
+
+
+@dataclass
+class HeldPosition:
+    symbol: str
+    shares: int
+    price: float
+    score: float = 0.0  # current ensemble score
+    unrealized_pl: float = 0.0
+
+    @classmethod
+    def from_position(cls, position: Mapping, score: float = 0.0) -> "HeldPosition":
+        shares = int(float(position.get("qty", 0) or 0))
+        price = float(position.get("current_price") or 0.0)
+        if price <= 0 and shares:
+            price = float(position.get("market_value", 0) or 0.0) / shares
+        return cls(
+            symbol=str(position["symbol"]),
+            shares=shares,
+            price=price,
+            score=score,
+            unrealized_pl=float(position.get("unrealized_pl", 0) or 0.0),
+        )
+
+
+def remaining_positions(positions: Sequence[HeldPosition], orders: Sequence[OrderRequest]) -> list[HeldPosition]:
+    """Holdings left once ``orders`` (a funding plan's sells) are accounted for."""
+    sold: dict[str, int] = {}
+    for order in orders:
+        if order.side == "sell":
+            sold[order.symbol] = sold.get(order.symbol, 0) + int(order.quantity)
+    return [replace(p, shares=max(p.shares - sold[p.symbol], 0)) if p.symbol in sold else p for p in positions]
+
+
+@dataclass
+class FundingPlan:
+    orders: list[OrderRequest] = field(default_factory=list)
+    actions: list[str] = field(default_factory=list)
+    freed_cash: float = 0.0
+    transaction_cost: float = 0.0
+    covered: bool = False
+    partial_entry_shares: int = 0
+
+
+@dataclass
+class FundingSolver:
+    """Cheapest trims/swaps that free a funding shortfall.
+
+    Only holdings whose current score trails the candidate's by at least
+    ``swap_score_gap_threshold`` are eligible. They are sold in order of
+    ``SlippageModel`` cost per dollar freed, then lowest score, then unrealised
+    losers before winners, as a fractional knapsack: whole
+    positions become swaps and the last one is trimmed to the shares still
+    needed. Net proceeds come after ``SlippageModel`` costs. The cost is a
+    sort plus a prefix sum. When even selling every eligible holding falls
+    short, no orders are proposed and the plan falls back to a partial entry
+    and/or the trade queue.
+    """
+
+    slippage_model: SlippageModel
+    swap_score_gap_threshold: float = 0.15
+    partial_entry_enabled: bool = True
+    partial_entry_fraction: float = 0.25
+    trade_queue_enabled: bool = True
+
+    def solve(
+        self,
+        symbol: str,
+        score: float,
+        missing_cash: float,
+        positions: Sequence[HeldPosition],
+        entry: float = 0.0,
+        shares: int = 0,
+        available_cash: float = 0.0,
+    ) -> FundingPlan:
+        plan = FundingPlan()
+        eligible = [
+            p
+            for p in positions
+            if p.symbol != symbol and p.shares > 0 and p.price > 0 and score - p.score >= self.swap_score_gap_threshold
+        ]
+        if eligible and missing_cash > 0:
+            self._sell_plan(plan, symbol, missing_cash, eligible)
+        if not plan.covered:
+            partial = int(shares * self.partial_entry_fraction) if self.partial_entry_enabled else 0
+            if partial > 0 and partial * entry <= available_cash:
+                plan.partial_entry_shares = partial
+                plan.actions.append(f"partial_entry {symbol} {partial}")
+            if self.trade_queue_enabled:
+                plan.actions.append("trade_queue")
+        return plan
+
+    def _sell_plan(self, plan: FundingPlan, symbol: str, missing_cash: float, eligible: list[HeldPosition]) -> None:
+        price = np.array([p.price for p in eligible])
+        held = np.array([p.shares for p in eligible], dtype=float)
+        scores = np.array([p.score for p in eligible])
+        pl_pct = np.array([p.unrealized_pl for p in eligible]) / np.maximum(price * held, 1e-9)
+        cost_per_share = np.array([self.slippage_model.estimate_cost(x, 1) for x in price])
+        net_per_share = price - cost_per_share
+        # Costs are linear in shares, so the greedy order by cost per dollar freed is the cheapest
+        # cover; rounding keeps bps-only models (equal ratios) tied so score decides.
+        cost_ratio = np.round(cost_per_share / np.maximum(net_per_share, 1e-9), 12)
+        order = np.lexsort((pl_pct, scores, cost_ratio))
+        proceeds = np.cumsum((net_per_share * held)[order])
+        # First position whose cumulative proceeds cover the shortfall; everything before it is sold whole.
+        last = int(np.searchsorted(proceeds, missing_cash - 1e-9))
+        if last >= len(order):
+            return  # selling every eligible holding still falls short; leave the book alone
+        plan.covered = True
+        before = proceeds[last - 1] if last > 0 else 0.0
+        for rank, idx in enumerate(order[: last + 1]):
+            position = eligible[idx]
+            quantity = position.shares
+            if rank == last:
+                quantity = min(position.shares, math.ceil((missing_cash - before) / net_per_share[idx]))
+            action = "swap" if quantity == position.shares else "trim"
+            key = f"funding-{symbol}-{action}-{position.symbol}-{quantity}"
+            plan.orders.append(
+                OrderRequest(
+                    symbol=position.symbol,
+                    side="sell",
+                    quantity=quantity,
+                    idempotency_key=key,
+                    client_order_id=key,
+                )
+            )
+            plan.actions.append(f"{action} {position.symbol} {quantity}")
+            plan.freed_cash += quantity * float(net_per_share[idx])
+            plan.transaction_cost += self.slippage_model.estimate_cost(position.price, quantity)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
 
-from src.core.contracts import FinalSignal, FundingAlert, RiskDecision
+import numpy as np
+
+from src.core.contracts import DecisionRecord, FinalSignal, FundingAlert, SignalRecord
 from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.risk.funding import FundingSolver, HeldPosition, remaining_positions
 
 
 @dataclass
@@ -11,12 +15,18 @@ class RiskManager:
     risk_per_trade: float
     max_position_weight: float
     cash_buffer: float
+    funding_solver: Optional[FundingSolver] = None
 
-    def evaluate(self, signal: FinalSignal, portfolio: PortfolioSnapshot) -> tuple[RiskDecision, FundingAlert | None]:
+    def evaluate(
+        self,
+        signal: FinalSignal | SignalRecord,
+        portfolio: PortfolioSnapshot,
+        positions: Sequence[HeldPosition] = (),
+    ) -> tuple[DecisionRecord, FundingAlert | None]:
         reasons: list[str] = []
         if signal.entry <= 0 or signal.stop <= 0 or signal.entry <= signal.stop:
             return (
-                RiskDecision(
+                DecisionRecord(
                     symbol=signal.symbol,
                     outcome="veto",
                     approved=False,
@@ -30,7 +40,7 @@ class RiskManager:
         risk_per_share = signal.entry - signal.stop
         if risk_per_share <= 0:
             return (
-                RiskDecision(
+                DecisionRecord(
                     symbol=signal.symbol,
                     outcome="veto",
                     approved=False,
@@ -47,7 +57,7 @@ class RiskManager:
         shares = int(min(max_cash / signal.entry, target_risk_cash / risk_per_share))
         if shares <= 0:
             return (
-                RiskDecision(
+                DecisionRecord(
                     symbol=signal.symbol,
                     outcome="veto",
                     approved=False,
@@ -61,14 +71,9 @@ class RiskManager:
         cash_required = shares * signal.entry
         available_cash = portfolio.cash * (1 - self.cash_buffer)
         if cash_required > available_cash:
-            missing = cash_required - available_cash
-            funding = FundingAlert(
-                missing_cash=missing,
-                proposed_actions=["swap", "trim", "partial_entry", "trade_queue"],
-                details={"cash_required": cash_required, "available_cash": available_cash},
-            )
+            funding = self._funding_alert(signal, shares, cash_required, available_cash, positions)
             reasons.append("Insufficient cash, funding alert created")
-            decision = RiskDecision(
+            decision = DecisionRecord(
                 symbol=signal.symbol,
                 outcome="veto",
                 approved=False,
@@ -79,7 +84,7 @@ class RiskManager:
             )
             return decision, funding
         reasons.append("Risk checks passed")
-        decision = RiskDecision(
+        decision = DecisionRecord(
             symbol=signal.symbol,
             outcome="approved",
             approved=True,
@@ -89,3 +94,141 @@ class RiskManager:
             constraints={"max_position_weight": self.max_position_weight, "risk_per_trade": self.risk_per_trade},
         )
         return decision, None
+
+    def evaluate_many(
+        self,
+        signals: Sequence[FinalSignal | SignalRecord],
+        portfolio: PortfolioSnapshot,
+        positions: Sequence[HeldPosition] = (),
+        weight_caps: Optional[Mapping[str, float]] = None,
+    ) -> list[tuple[DecisionRecord, FundingAlert | None]]:
+        """Size a whole cycle's signals against one shared cash balance.
+
+        Each candidate is sized exactly as ``evaluate`` would, then candidates
+        are funded in descending score order from ``cash * (1 - cash_buffer)``
+        by a prefix sum over their cash requirements. Those past the point where
+        cash runs out get a FundingAlert for what the leftover cannot cover;
+        alerts are solved in score order, each against the holdings the earlier
+        ones have not already planned to sell.
+        ``weight_caps`` (e.g. a portfolio optimizer's targets) tighten
+        ``max_position_weight`` per symbol. Results keep the input order.
+        """
+        count = len(signals)
+        if count == 0:
+            return []
+        entry = np.array([float(s.entry) for s in signals])
+        stop = np.array([float(s.stop) for s in signals])
+        score = np.array([float(s.score) for s in signals])
+        invalid = (entry <= 0) | (stop <= 0) | (entry <= stop)
+        equity = portfolio.equity
+        safe_entry = np.where(invalid, 1.0, entry)
+        risk_per_share = np.where(invalid, 1.0, entry - stop)
+        max_weight = np.full(count, self.max_position_weight)
+        if weight_caps:
+            caps = np.array([weight_caps.get(s.symbol, self.max_position_weight) for s in signals], dtype=float)
+            max_weight = np.minimum(max_weight, caps)
+        shares = np.floor(
+            np.minimum(equity * max_weight / safe_entry, equity * self.risk_per_trade / risk_per_share)
+        )
+        shares = np.where(invalid, 0, np.maximum(shares, 0)).astype(int)
+        sized = ~invalid & (shares > 0)
+        cash_required = np.where(sized, shares * entry, 0.0)
+
+        available_cash = portfolio.cash * (1 - self.cash_buffer)
+        order = np.argsort(-score, kind="stable")
+        spent_after = np.cumsum(cash_required[order])
+        spent_before = spent_after - cash_required[order]
+        funded = np.zeros(count, dtype=bool)
+        funded[order] = spent_after <= available_cash
+        # Funding stops at the first candidate that does not fit; later ones see no leftover cash.
+        first_short = int(np.argmax(~funded[order])) if not funded[order].all() else count
+        leftover = np.zeros(count)
+        if first_short < count:
+            leftover[order[first_short]] = max(available_cash - spent_before[first_short], 0.0)
+        funded[order[first_short:]] = False
+        funded &= sized
+
+        alerts: dict[int, FundingAlert] = {}
+        book = list(positions)
+        for i in order:
+            if sized[i] and not funded[i]:
+                alerts[i] = self._funding_alert(
+                    signals[i], int(shares[i]), float(cash_required[i]), float(leftover[i]), book
+                )
+                book = remaining_positions(book, alerts[i].orders)
+
+        constraints = {"max_position_weight": self.max_position_weight, "risk_per_trade": self.risk_per_trade}
+        results: list[tuple[DecisionRecord, FundingAlert | None]] = []
+        for i, signal in enumerate(signals):
+            if invalid[i]:
+                results.append((self._veto(signal.symbol, "Invalid entry/stop configuration"), None))
+            elif not sized[i]:
+                results.append((self._veto(signal.symbol, "Position size below minimum"), None))
+            elif funded[i]:
+                decision = DecisionRecord(
+                    symbol=signal.symbol,
+                    outcome="approved",
+                    approved=True,
+                    shares=int(shares[i]),
+                    cash_required=float(cash_required[i]),
+                    reasons=["Risk checks passed"],
+                    constraints={**constraints, "max_position_weight": float(max_weight[i])},
+                )
+                results.append((decision, None))
+            else:
+                funding = alerts[i]
+                decision = DecisionRecord(
+                    symbol=signal.symbol,
+                    outcome="veto",
+                    approved=False,
+                    shares=0,
+                    cash_required=float(cash_required[i]),
+                    reasons=["Insufficient cash, funding alert created"],
+                    constraints={**constraints, "max_position_weight": float(max_weight[i])},
+                )
+                results.append((decision, funding))
+        return results
+
+    def _funding_alert(
+        self,
+        signal: FinalSignal | SignalRecord,
+        shares: int,
+        cash_required: float,
+        available_cash: float,
+        positions: Sequence[HeldPosition],
+    ) -> FundingAlert:
+        missing = cash_required - available_cash
+        details = {"cash_required": cash_required, "available_cash": available_cash}
+        if self.funding_solver is None:
+            return FundingAlert(
+                missing_cash=missing,
+                proposed_actions=["swap", "trim", "partial_entry", "trade_queue"],
+                details=details,
+            )
+        plan = self.funding_solver.solve(
+            signal.symbol,
+            float(signal.score),
+            missing,
+            positions,
+            entry=float(signal.entry),
+            shares=shares,
+            available_cash=available_cash,
+        )
+        details.update(
+            freed_cash=plan.freed_cash,
+            transaction_cost=plan.transaction_cost,
+            partial_entry_shares=float(plan.partial_entry_shares),
+        )
+        return FundingAlert(missing_cash=missing, proposed_actions=plan.actions, details=details, orders=plan.orders)
+
+    @staticmethod
+    def _veto(symbol: str, reason: str) -> DecisionRecord:
+        return DecisionRecord(
+            symbol=symbol,
+            outcome="veto",
+            approved=False,
+            shares=0,
+            cash_required=0.0,
+            reasons=[reason],
+            constraints={},
+        )
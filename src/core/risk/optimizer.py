@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def shrunk_covariance(returns: np.ndarray) -> tuple[np.ndarray, float]:
+    """Ledoit-Wolf covariance shrunk towards a scaled identity; returns (matrix, intensity).
+
+    Missing returns count as flat, matching ``PortfolioRiskEngine.set_panel``.
+    """
+    values = np.nan_to_num(np.asarray(returns, dtype=float))
+    days, size = values.shape
+    if days < 2:
+        return np.zeros((size, size)), 1.0
+    centred = values - values.mean(axis=0)
+    sample = centred.T @ centred / days
+    target = np.trace(sample) / size
+    distance = np.sum((sample - target * np.eye(size)) ** 2)
+    if distance <= 0:
+        return sample * days / (days - 1), 0.0
+    squares = centred**2
+    spread = np.sum(squares.T @ squares) / days - np.sum(sample**2)
+    intensity = float(min(1.0, max(0.0, spread / days / distance)))
+    shrunk = (1 - intensity) * sample + intensity * target * np.eye(size)
+    return shrunk * days / (days - 1), intensity
+
+
+@dataclass
+class PortfolioOptimizer:
+    """Target weights for holdings plus candidates from a shrunk covariance.
+
+    ``risk_parity`` solves equal risk contribution, scaled to the cash budget;
+    ``vol_target`` scales the same portfolio to ``target_vol`` (annualised);
+    ``mean_variance`` maximises ``mu'w - risk_aversion/2 * w'Cw`` by accelerated
+    projected gradient. Every mode ends on the feasible set ``0 <= w <=
+    max_weight``, per-sector sums ``<= max_sector_weight`` and total ``<=
+    budget``, whose projection is exact (a binary search over breakpoints).
+    """
+
+    mode: str = "risk_parity"
+    max_weight: float = 0.12
+    max_sector_weight: float = 0.30
+    budget: float = 1.0
+    target_vol: float = 0.12
+    risk_aversion: float = 5.0
+    max_iter: int = 500
+    tol: float = 1e-7
+    symbols: list[str] = field(default_factory=list)
+    shrinkage: float = 0.0
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+    _cov: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)), repr=False)
+    _mean: np.ndarray = field(default_factory=lambda: np.zeros(0), repr=False)
+
+    def set_panel(self, returns: pd.DataFrame) -> None:
+        """Load a (days x symbols) daily return panel; the covariance is shrunk once here."""
+        values = returns.astype(float).to_numpy()
+        self.symbols = list(returns.columns)
+        self._index = {symbol: pos for pos, symbol in enumerate(self.symbols)}
+        self._cov, self.shrinkage = shrunk_covariance(values)
+        self._mean = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(self.symbols))
+
+    def optimize(
+        self,
+        symbols: Sequence[str],
+        expected: Optional[Mapping[str, float]] = None,
+        sectors: Optional[Mapping[str, str]] = None,
+    ) -> Dict[str, float]:
+        """Target weights for ``symbols`` (those without history get 0).
+
+        ``expected`` overrides the panel's mean daily return per symbol; it
+        only matters for ``mean_variance``.
+        """
+        names = [symbol for symbol in dict.fromkeys(symbols) if symbol in self._index]
+        if not names:
+            return {symbol: 0.0 for symbol in symbols}
+        columns = np.array([self._index[name] for name in names])
+        cov = self._cov[np.ix_(columns, columns)]
+        groups = self._groups(names, sectors or {})
+        if self.mode == "mean_variance":
+            mu = self._mean[columns].copy()
+            for pos, name in enumerate(names):
+                if expected and name in expected:
+                    mu[pos] = expected[name]
+            weights = self._mean_variance(cov, mu, groups)
+        else:
+            weights = self._risk_parity(cov)
+            sigma = float(np.sqrt(max(weights @ cov @ weights, 0.0) * TRADING_DAYS))
+            scale = self.budget
+            if self.mode == "vol_target" and sigma > 0:
+                scale = min(self.budget, self.target_vol / sigma)
+            weights = self.project(weights * scale, groups)
+        result = {symbol: 0.0 for symbol in symbols}
+        result.update({name: float(weight) for name, weight in zip(names, weights)})
+        return result
+
+    def project(self, values: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """Euclidean projection onto the box, the sector caps and the budget.
+
+        With KKT multipliers the solution is ``clip(v - max(lam, tau_s), 0,
+        max_weight)``, where ``tau_s`` makes sector ``s`` sum to its cap on its
+        own. So all sector shifts are found in one batched search, then the
+        budget's. ``groups`` is a (sectors x members) index matrix padded with -1.
+        """
+        floor = np.zeros(len(values))
+        if groups is not None and len(groups):
+            present = groups >= 0
+            members = np.where(present, values[groups], -np.inf)
+            shifts = _shifts(members, np.full(members.shape, -np.inf), self.max_weight, self.max_sector_weight)
+            floor[groups[present]] = np.broadcast_to(np.maximum(shifts, 0.0)[:, None], groups.shape)[present]
+        budget_shift = _shifts(values[None, :], floor[None, :], self.max_weight, self.budget)[0]
+        return np.clip(values - np.maximum(floor, budget_shift), 0.0, self.max_weight)
+
+    def _groups(self, names: Sequence[str], sectors: Mapping[str, str]) -> Optional[np.ndarray]:
+        if self.max_sector_weight <= 0:
+            return None
+        labels = [sectors.get(name) for name in names]
+        rows = [
+            [pos for pos, other in enumerate(labels) if other == label]
+            for label in dict.fromkeys(labels)
+            if label is not None
+        ]
+        # Sectors too small to ever reach the cap need no constraint.
+        rows = [row for row in rows if len(row) * self.max_weight > self.max_sector_weight]
+        if not rows:
+            return None
+        groups = np.full((len(rows), max(len(row) for row in rows)), -1)
+        for pos, row in enumerate(rows):
+            groups[pos, : len(row)] = row
+        return groups
+
+    def _risk_parity(self, cov: np.ndarray) -> np.ndarray:
+        """Equal risk contribution via Newton on ``y'Cy/2 - sum(log y)/n`` (Spinu); weights sum to 1."""
+        size = len(cov)
+        variances = np.diag(cov)
+        if np.any(variances <= 0):
+            # Flat histories carry no risk estimate; fall back to equal weights.
+            return np.full(size, 1.0 / size)
+        budget = np.full(size, 1.0 / size)
+        y = budget / np.sqrt(variances)
+        y /= np.sqrt(y @ cov @ y)
+        for _ in range(50):
+            gradient = cov @ y - budget / y
+            hessian = cov + np.diag(budget / y**2)
+            step = np.linalg.solve(hessian, gradient)
+            # Damping keeps the iterate strictly positive.
+            ratio = np.max(-step / y) if np.any(step < 0) else 0.0
+            scale = 1.0 if ratio < 0.9 else 0.9 / ratio
+            y = y - scale * step
+            if np.sqrt(gradient @ step) < 1e-10:
+                break
+        return y / y.sum()
+
+    def _mean_variance(self, cov: np.ndarray, mu: np.ndarray, groups: Optional[np.ndarray]) -> np.ndarray:
+        hessian = self.risk_aversion * cov
+        lipschitz = _largest_eigenvalue(hessian)
+        if lipschitz <= 0:
+            return self.project(mu / max(np.abs(mu).max(), 1e-12) * self.max_weight, groups)
+        step = 1.0 / lipschitz
+        weights = self.project(np.full(len(mu), self.budget / len(mu)), groups)
+        momentum, t = weights.copy(), 1.0
+        for _ in range(self.max_iter):
+            gradient = hessian @ momentum - mu
+            updated = self.project(momentum - step * gradient, groups)
+            if np.max(np.abs(updated - weights)) < self.tol:
+                return updated
+            if gradient @ (updated - weights) > 0:
+                # Adaptive restart: momentum is pointing uphill, drop it.
+                momentum, t = weights.copy(), 1.0
+                continue
+            t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            momentum = updated + ((t - 1) / t_next) * (updated - weights)
+            weights, t = updated, t_next
+        return weights
+
+
+def _shifts(values: np.ndarray, floor: np.ndarray, upper: float, cap: float) -> np.ndarray:
+    """Per row, the smallest ``t`` with ``sum(clip(values - max(t, floor), 0, upper)) <= cap``.
+
+    Rows are padded with ``-inf``; a row that never exceeds ``cap`` gets
+    ``-inf``. The row sum is non-increasing and piecewise linear in ``t`` with
+    kinks at ``values``, ``values - upper`` and ``floor``, so a binary search
+    over the sorted kinks (all rows in lockstep) brackets the root and the
+    segment it lands on is solved exactly.
+    """
+    points = np.sort(np.concatenate([values, values - upper, floor], axis=1), axis=1)
+    rows = np.arange(len(points))
+
+    def totals(index: np.ndarray) -> np.ndarray:
+        t = points[rows, index][:, None]
+        return np.clip(values - np.maximum(t, floor), 0.0, upper).sum(axis=1)
+
+    lo = np.sum(~np.isfinite(points), axis=1)
+    hi = np.full(len(points), points.shape[1] - 1)
+    f_lo, f_hi = totals(lo), totals(hi)
+    binding = f_lo > cap
+    for _ in range(int(np.ceil(np.log2(points.shape[1]))) + 1):
+        open_ = hi - lo > 1
+        if not open_.any():
+            break
+        mid = (lo + hi) // 2
+        f_mid = totals(mid)
+        above = open_ & (f_mid > cap)
+        below = open_ & ~(f_mid > cap)
+        lo, f_lo = np.where(above, mid, lo), np.where(above, f_mid, f_lo)
+        hi, f_hi = np.where(below, mid, hi), np.where(below, f_mid, f_hi)
+    p_lo, p_hi = points[rows, lo], points[rows, hi]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root = p_lo + (f_lo - cap) * (p_hi - p_lo) / (f_lo - f_hi)
+    return np.where(binding, root, -np.inf)
+
+
+def _largest_eigenvalue(matrix: np.ndarray, iterations: int = 50) -> float:
+    vector = np.ones(len(matrix)) / np.sqrt(len(matrix))
+    value = 0.0
+    for _ in range(iterations):
+        product = matrix @ vector
+        norm = np.linalg.norm(product)
+        if norm == 0:
+            return 0.0
+        vector, value = product / norm, norm
+    return float(value * 1.01)  # power iteration approaches from below
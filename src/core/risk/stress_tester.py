@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
+from src.core.risk.covariance import daily_returns
+
 
 @dataclass
 class StressTestResult:
@@ -12,6 +16,34 @@ class StressTestResult:
     details: dict[str, float]
 
 
+@dataclass
+class ScenarioSet:
+    """A (scenarios x symbols) matrix of simple returns applied to a book."""
+
+    names: list[str]
+    symbols: list[str]
+    shocks: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def concat(self, other: "ScenarioSet") -> "ScenarioSet":
+        symbols = list(dict.fromkeys([*self.symbols, *other.symbols]))
+        return ScenarioSet(
+            names=[*self.names, *other.names],
+            symbols=symbols,
+            shocks=np.vstack([self._aligned(symbols), other._aligned(symbols)]),
+        )
+
+    def _aligned(self, symbols: Sequence[str]) -> np.ndarray:
+        index = {symbol: pos for pos, symbol in enumerate(self.symbols)}
+        out = np.zeros((len(self.names), len(symbols)))
+        for pos, symbol in enumerate(symbols):
+            if symbol in index:
+                out[:, pos] = self.shocks[:, index[symbol]]
+        return out
+
+
 @dataclass
 class StressTester:
     def run(
@@ -20,25 +52,104 @@ class StressTester:
         weights: dict[str, float],
         shocks: dict[str, float],
     ) -> list[StressTestResult]:
-        results: list[StressTestResult] = []
-        for scenario, shock in shocks.items():
-            impact = {}
-            portfolio_return = 0.0
-            for symbol, weight in weights.items():
-                df = price_history.get(symbol)
-                if df is None or df.empty:
-                    impact[symbol] = 0.0
-                    continue
-                last_close = float(df["close"].iloc[-1])
-                stressed_price = last_close * (1 + shock)
-                symbol_return = (stressed_price - last_close) / last_close
-                impact[symbol] = symbol_return
-                portfolio_return += symbol_return * weight
-            results.append(
-                StressTestResult(
-                    scenario=scenario,
-                    portfolio_return=portfolio_return,
-                    details=impact,
-                )
+        """Uniform shocks: every symbol with history moves by the scenario's return."""
+        symbols = list(weights)
+        has_history = np.array(
+            [price_history.get(s) is not None and not price_history[s].empty for s in symbols], dtype=float
+        )
+        scenarios = ScenarioSet(
+            names=list(shocks),
+            symbols=symbols,
+            shocks=np.outer(np.fromiter(shocks.values(), dtype=float, count=len(shocks)), has_history),
+        )
+        return self.results(scenarios, weights, sort=False)
+
+    def evaluate(self, scenarios: ScenarioSet, weights: Mapping[str, float]) -> np.ndarray:
+        """Portfolio return per scenario: one (scenarios x symbols) @ (symbols,) product."""
+        return scenarios.shocks @ self._weights(scenarios.symbols, weights)
+
+    def results(
+        self,
+        scenarios: ScenarioSet,
+        weights: Mapping[str, float],
+        top: Optional[int] = None,
+        sort: bool = True,
+    ) -> list[StressTestResult]:
+        """Scenario results, worst first when ``sort``; ``top`` limits how many get per-symbol details."""
+        returns = self.evaluate(scenarios, weights)
+        order = np.argsort(returns, kind="stable") if sort else np.arange(len(returns))
+        if top is not None:
+            order = order[:top]
+        held = [pos for pos, symbol in enumerate(scenarios.symbols) if symbol in weights]
+        return [
+            StressTestResult(
+                scenario=scenarios.names[i],
+                portfolio_return=float(returns[i]),
+                details={scenarios.symbols[pos]: float(scenarios.shocks[i, pos]) for pos in held},
             )
-        return results
+            for i in order
+        ]
+
+    @staticmethod
+    def uniform_scenarios(shocks: Mapping[str, float], symbols: Sequence[str]) -> ScenarioSet:
+        values = np.fromiter(shocks.values(), dtype=float, count=len(shocks))
+        return ScenarioSet(list(shocks), list(symbols), np.repeat(values[:, None], len(symbols), axis=1))
+
+    def historical_scenarios(
+        self,
+        price_history: Mapping[str, pd.DataFrame],
+        weights: Mapping[str, float],
+        windows: Sequence[int] = (1, 5, 20),
+        top: int = 5,
+    ) -> ScenarioSet:
+        """Replay the book's worst non-overlapping ``k``-day windows found in the cached history.
+
+        Every window's per-symbol return comes from log-return prefix sums, so
+        the search over all start days is one vectorised difference per ``k``.
+        """
+        returns = daily_returns(price_history)
+        if returns.empty:
+            return ScenarioSet([], list(weights), np.zeros((0, len(weights))))
+        symbols = list(returns.columns)
+        log_returns = np.log1p(returns.fillna(0.0).to_numpy())
+        prefix = np.vstack([np.zeros(len(symbols)), np.cumsum(log_returns, axis=0)])
+        w = self._weights(symbols, weights)
+        dates = returns.index
+        names: list[str] = []
+        rows: list[np.ndarray] = []
+        for k in windows:
+            if k > len(log_returns):
+                continue
+            window_returns = np.expm1(prefix[k:] - prefix[:-k])  # (starts x symbols)
+            book = window_returns @ w
+            taken: list[int] = []
+            for start in np.argsort(book, kind="stable"):
+                if len(taken) >= top or book[start] >= 0:
+                    break
+                if all(abs(start - other) >= k for other in taken):
+                    taken.append(int(start))
+                    names.append(f"worst_{k}d_{dates[start].date()}")
+                    rows.append(window_returns[start])
+        shocks = np.vstack(rows) if rows else np.zeros((0, len(symbols)))
+        return ScenarioSet(names, symbols, shocks)
+
+    def beta_scenarios(
+        self,
+        price_history: Mapping[str, pd.DataFrame],
+        factor_shocks: Mapping[str, float],
+        benchmark: Optional[str] = None,
+    ) -> ScenarioSet:
+        """Factor shocks scaled by each symbol's beta to ``benchmark`` (equal-weighted book if absent)."""
+        returns = daily_returns(price_history)
+        if returns.empty:
+            return ScenarioSet([], [], np.zeros((0, 0)))
+        market = returns[benchmark] if benchmark in returns.columns else returns.mean(axis=1)
+        demeaned = returns - returns.mean()
+        market_demeaned = market - market.mean()
+        betas = (demeaned.mul(market_demeaned, axis=0).sum() / (market_demeaned**2).sum()).fillna(0.0)
+        values = np.fromiter(factor_shocks.values(), dtype=float, count=len(factor_shocks))
+        return ScenarioSet(list(factor_shocks), list(returns.columns), np.outer(values, betas.to_numpy()))
+
+    @staticmethod
+    def _weights(symbols: Sequence[str], weights: Mapping[str, float]) -> np.ndarray:
+        return np.array([float(weights.get(symbol, 0.0)) for symbol in symbols])
@@ -29,6 +29,7 @@ class AppSettings(BaseModel):
     auto_open_browser: bool = True
     log_level: str = "INFO"
     cycle_interval_seconds: int = 600
+    decision_memo: bool = True
 
 
 class StorageSettings(BaseModel):
@@ -40,6 +41,8 @@ class StorageSettings(BaseModel):
     data_cache_format: str = "parquet"
     data_compression: str = "zstd"
     data_cache_keep_bars: int = 300
+    feature_store_enabled: bool = True
+    feature_store_lru_size: int = 4096
 
 
 class AlpacaSettings(BaseModel):
@@ -71,13 +74,31 @@ class StopTakeProfit(BaseModel):
     atr_multiplier_tp: float = 4.0
     trailing_stop_enabled: bool = True
     trailing_atr_multiplier: float = 2.5
+    intraday_monitor: bool = False  # poll latest prices between cycles for stop/take-profit breaches
+    monitor_poll_seconds: float = 5.0
 
 
 class RebalanceSettings(BaseModel):
-    frequency: Literal["weekly", "manual"] = "weekly"
+    enabled: bool = False  # submit scheduled rebalances from the trading cycle; the API works either way
+    frequency: Literal["daily", "weekly", "manual"] = "weekly"
     threshold: float = 0.06
 
 
+class PortfolioRiskSettings(BaseModel):
+    enabled: bool = True
+    method: Literal["historical", "parametric", "filtered"] = "historical"
+    confidence: float = 0.99
+    ewma_lambda: float = 0.94
+    max_var: float = 0.05  # one-day loss as a fraction of equity; 0 disables
+    max_cvar: float = 0.08
+
+
+class SizingSettings(BaseModel):
+    mode: Literal["fixed", "risk_parity", "vol_target", "mean_variance"] = "fixed"
+    target_vol: float = 0.12  # annualised, vol_target only
+    risk_aversion: float = 5.0  # mean_variance only
+
+
 class RiskSettings(BaseModel):
     profile: Literal["conservative", "balanced", "aggressive"] = "balanced"
     risk_per_trade: float = 0.005
@@ -85,11 +106,14 @@ class RiskSettings(BaseModel):
     max_position_weight: float = 0.12
     max_sector_weight: float = 0.30
     max_symbol_correlation: float = 0.85
+    correlation_window: int = 60  # daily returns in the rolling covariance matrix
     cash_buffer: float = 0.08
     daily_max_loss: float = 0.02
     weekly_max_drawdown: float = 0.05
     stop_takeprofit: StopTakeProfit = Field(default_factory=StopTakeProfit)
     rebalance: RebalanceSettings = Field(default_factory=RebalanceSettings)
+    portfolio_var: PortfolioRiskSettings = Field(default_factory=PortfolioRiskSettings)
+    sizing: SizingSettings = Field(default_factory=SizingSettings)
 
 
 class FundingAlertSettings(BaseModel):
@@ -116,6 +140,15 @@ class StrategyToggles(BaseModel):
 class EnsembleSettings(BaseModel):
     method: Literal["weighted", "majority", "stacking"] = "weighted"
     min_final_score_to_trade: float = 0.70
+    weights: Dict[str, float] = Field(default_factory=dict)  # strategy -> weight, default 1.0
+    vote_threshold: float = 0.5
+    stacking_coefficients: Dict[str, float] = Field(default_factory=dict)
+    stacking_intercept: float = 0.0
+    online_learning: bool = True
+    learning_rate: float = 0.5
+    reward_scale: float = 0.05  # trade return that counts as a full +/-1 reward
+    min_weight: float = 0.2
+    max_weight: float = 5.0
 
 
 class SentimentSettings(BaseModel):
@@ -136,6 +169,8 @@ class MLValidationSettings(BaseModel):
     train_window_days: int = 504
     test_window_days: int = 126
     step_window_days: int = 63
+    model_mode: bool = False
+    max_workers: int = 0  # 0 = all cores
 
 
 class MLDriftThresholds(BaseModel):
@@ -143,15 +178,43 @@ class MLDriftThresholds(BaseModel):
     performance_drift_threshold: float = 0.10
 
 
+class MLDriftMonitorSettings(BaseModel):
+    enabled: bool = True
+    window_size: int = 500
+    max_windows: int = 4
+    ks_threshold: float = 0.2
+    compression: int = 100
+
+
 class MLHPOSettings(BaseModel):
     enabled: bool = True
-    engine: Literal["optuna"] = "optuna"
+    engine: Literal["random", "successive_halving"] = "successive_halving"
     trials: int = 50
+    cv_splits: int = 5
+    purge_bars: int = 10
+    test_gap_bars: int = 0
+    max_workers: int = 0  # 0 = all cores
+    eta: int = 3
+    seed: int = 42
+
+
+class MLDatasetSettings(BaseModel):
+    directory: str = "data/datasets"
+    format: Literal["parquet", "npz"] = "parquet"
+    label: Literal["tp_before_sl", "forward_return"] = "tp_before_sl"
+    horizon_days: int = 10
+    return_threshold: float = 0.0
 
 
 class MLShadowTestSettings(BaseModel):
     on_paper: bool = True
     days: int = 3
+    live: bool = False  # scores candidates every cycle and writes prediction logs under ``directory``
+    directory: str = "data/shadow"
+    threshold: float = 0.5
+    metric: Literal["accuracy", "precision", "recall", "f1"] = "f1"
+    delta: float = 0.01
+    min_outcomes: int = 20
 
 
 class MLRegistrySettings(BaseModel):
@@ -165,9 +228,12 @@ class MLSettings(BaseModel):
     retrain_schedule: Literal["weekly", "manual"] = "weekly"
     retrain_on_drift: bool = True
     retrain_on_performance_drop: bool = True
+    live_inference: bool = True
     validation: MLValidationSettings = Field(default_factory=MLValidationSettings)
     drift_thresholds: MLDriftThresholds = Field(default_factory=MLDriftThresholds)
+    drift_monitor: MLDriftMonitorSettings = Field(default_factory=MLDriftMonitorSettings)
     hpo: MLHPOSettings = Field(default_factory=MLHPOSettings)
+    dataset: MLDatasetSettings = Field(default_factory=MLDatasetSettings)
     shadow_test: MLShadowTestSettings = Field(default_factory=MLShadowTestSettings)
     registry: MLRegistrySettings = Field(default_factory=MLRegistrySettings)
 
@@ -196,6 +262,20 @@ class OrderManagerSettings(BaseModel):
 class SlippageSettings(BaseModel):
     spread_bps: float = 2.0
     fee_bps: float = 1.0
+    per_share_fee: float = 0.0
+
+
+class PaperBrokerSettings(BaseModel):
+    enabled: bool = False  # mock mode runs on the stateful PaperBroker instead of MockAlpacaClient
+    price_model: Literal["gbm", "regime", "factor"] = "gbm"
+    seed: int = 0
+    starting_cash: float = 100_000.0
+    history_days: int = 756
+    horizon_days: int = 252
+    advance_per_cycle: int = 1  # simulated bars each run_cycle steps the clock; 0 leaves it to PaperBroker.advance
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    failure_rate: float = 0.0
 
 
 class AlertSettings(BaseModel):
@@ -233,6 +313,7 @@ class Settings(BaseSettings):
     error_handling: ErrorHandlingSettings = Field(default_factory=ErrorHandlingSettings)
     order_manager: OrderManagerSettings = Field(default_factory=OrderManagerSettings)
     slippage: SlippageSettings = Field(default_factory=SlippageSettings)
+    paper_broker: PaperBrokerSettings = Field(default_factory=PaperBrokerSettings)
     alerts: AlertSettings = Field(default_factory=AlertSettings)
     sector_map_path: str = "config/sector_map.json"
 
@@ -298,6 +379,9 @@ def _apply_backward_compat(cfg: Dict[str, Any]) -> None:
             "retrain_on_performance_drop",
             retrain_cfg.get("on_performance_drop", ml_cfg.get("retrain_on_performance_drop", True)),
         )
+    hpo_cfg = ml_cfg.get("hpo")
+    if isinstance(hpo_cfg, dict) and hpo_cfg.get("engine") == "optuna":
+        hpo_cfg["engine"] = "successive_halving"
 
 
 class LiveLockError(RuntimeError):
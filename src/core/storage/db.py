@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import json
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Mapping
 
 
 @dataclass
@@ -60,7 +61,8 @@ class SQLiteStore:
                 take_profit REAL NOT NULL,
                 status TEXT NOT NULL,
                 opened_at TEXT NOT NULL,
-                closed_at TEXT
+                closed_at TEXT,
+                strategies TEXT
             );
             CREATE TABLE IF NOT EXISTS fills (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,7 +78,8 @@ class SQLiteStore:
                 missing_cash REAL NOT NULL,
                 proposed_actions TEXT NOT NULL,
                 details TEXT NOT NULL,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                orders TEXT
             );
             CREATE TABLE IF NOT EXISTS trade_queue (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -91,8 +94,27 @@ class SQLiteStore:
                 message TEXT NOT NULL,
                 created_at TEXT NOT NULL
             );
+            CREATE TABLE IF NOT EXISTS rebalances (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                orders TEXT NOT NULL,
+                details TEXT NOT NULL,
+                dry_run INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ensemble_weights (
+                strategy TEXT PRIMARY KEY,
+                weight REAL NOT NULL,
+                updates INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            );
             """
             )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(trades)")}
+            if "strategies" not in columns:
+                conn.execute("ALTER TABLE trades ADD COLUMN strategies TEXT")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(funding_alerts)")}
+            if "orders" not in columns:
+                conn.execute("ALTER TABLE funding_alerts ADD COLUMN orders TEXT")
 
     def seed_watchlist(self, symbols: Iterable[str]) -> None:
         if self.get_watchlist():
@@ -121,11 +143,32 @@ class SQLiteStore:
                 (symbol, score, entry, stop, take_profit, reasons, datetime.now(timezone.utc).isoformat()),
             )
 
-    def add_trade(self, symbol: str, side: str, quantity: int, entry: float, stop: float, take_profit: float) -> int:
+    def add_trade(
+        self,
+        symbol: str,
+        side: str,
+        quantity: int,
+        entry: float,
+        stop: float,
+        take_profit: float,
+        strategies: Mapping[str, float] | None = None,
+    ) -> int:
+        """``strategies`` maps each contributing strategy to its intent confidence."""
         with self._connect() as conn:
             cursor = conn.execute(
-                "INSERT INTO trades (symbol, side, quantity, entry, stop, take_profit, status, opened_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (symbol, side, quantity, entry, stop, take_profit, "open", datetime.now(timezone.utc).isoformat()),
+                "INSERT INTO trades (symbol, side, quantity, entry, stop, take_profit, status, opened_at, strategies) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    symbol,
+                    side,
+                    quantity,
+                    entry,
+                    stop,
+                    take_profit,
+                    "open",
+                    datetime.now(timezone.utc).isoformat(),
+                    json.dumps(dict(strategies)) if strategies else None,
+                ),
             )
             return int(cursor.lastrowid)
 
@@ -136,15 +179,50 @@ class SQLiteStore:
                 ("closed", datetime.now(timezone.utc).isoformat(), trade_id),
             )
 
+    def resize_trade(self, trade_id: int, quantity: int) -> None:
+        """Set an open trade's remaining quantity, closing it once nothing is left."""
+        if quantity <= 0:
+            self.close_trade(trade_id)
+            return
+        with self._connect() as conn:
+            conn.execute("UPDATE trades SET quantity = ? WHERE id = ?", (quantity, trade_id))
+
     def update_trade_stop(self, trade_id: int, new_stop: float) -> None:
         with self._connect() as conn:
             conn.execute("UPDATE trades SET stop = ? WHERE id = ?", (new_stop, trade_id))
 
+    def update_open_trades(self, stops: Mapping[int, float], closed: Iterable[int]) -> None:
+        """Apply a batch of trailing-stop raises and closes in one transaction."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE trades SET stop = ? WHERE id = ?", [(stop, trade_id) for trade_id, stop in stops.items()]
+            )
+            conn.executemany(
+                "UPDATE trades SET status = ?, closed_at = ? WHERE id = ?",
+                [("closed", now, trade_id) for trade_id in closed],
+            )
+
     def list_open_trades(self) -> list[sqlite3.Row]:
         with self._connect() as conn:
             cursor = conn.execute("SELECT * FROM trades WHERE status = 'open' ORDER BY opened_at")
             return cursor.fetchall()
 
+    def get_ensemble_weights(self) -> dict[str, tuple[float, int]]:
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT strategy, weight, updates FROM ensemble_weights")
+            return {row["strategy"]: (float(row["weight"]), int(row["updates"])) for row in cursor.fetchall()}
+
+    def save_ensemble_weights(self, weights: Mapping[str, tuple[float, int]]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO ensemble_weights (strategy, weight, updates, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(strategy) DO UPDATE SET weight = excluded.weight, updates = excluded.updates, "
+                "updated_at = excluded.updated_at",
+                [(strategy, weight, updates, now) for strategy, (weight, updates) in weights.items()],
+            )
+
     def add_fill(self, trade_id: int | None, symbol: str, quantity: int, price: float) -> None:
         with self._connect() as conn:
             conn.execute(
@@ -152,11 +230,13 @@ class SQLiteStore:
                 (trade_id, symbol, quantity, price, datetime.now(timezone.utc).isoformat()),
             )
 
-    def add_funding_alert(self, symbol: str, missing_cash: float, proposed_actions: str, details: str) -> None:
+    def add_funding_alert(
+        self, symbol: str, missing_cash: float, proposed_actions: str, details: str, orders: str | None = None
+    ) -> None:
         with self._connect() as conn:
             conn.execute(
-                "INSERT INTO funding_alerts (symbol, missing_cash, proposed_actions, details, created_at) VALUES (?, ?, ?, ?, ?)",
-                (symbol, missing_cash, proposed_actions, details, datetime.now(timezone.utc).isoformat()),
+                "INSERT INTO funding_alerts (symbol, missing_cash, proposed_actions, details, created_at, orders) VALUES (?, ?, ?, ?, ?, ?)",
+                (symbol, missing_cash, proposed_actions, details, datetime.now(timezone.utc).isoformat(), orders),
             )
 
     def list_funding_alerts(self, limit: int = 50) -> list[sqlite3.Row]:
@@ -167,6 +247,18 @@ class SQLiteStore:
             )
             return cursor.fetchall()
 
+    def add_rebalance(self, orders: str, details: str, dry_run: bool) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO rebalances (orders, details, dry_run, created_at) VALUES (?, ?, ?, ?)",
+                (orders, details, int(dry_run), datetime.now(timezone.utc).isoformat()),
+            )
+
+    def last_rebalance_at(self) -> datetime | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(created_at) AS created_at FROM rebalances WHERE dry_run = 0").fetchone()
+            return datetime.fromisoformat(row["created_at"]) if row and row["created_at"] else None
+
     def enqueue_trade(self, symbol: str, payload: str, ttl_hours: int) -> None:
         expires_at = datetime.now(timezone.utc) + timedelta(hours=ttl_hours)
         with self._connect() as conn:
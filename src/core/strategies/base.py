@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List
 
-from src.core.contracts import Features, SignalIntent
+from src.core.contracts import Features, IntentRecord
 
 
 @dataclass(frozen=True)
@@ -11,5 +11,5 @@ class Strategy:
     name: str
     required_features: List[str]
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         raise NotImplementedError
@@ -1,26 +1,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Iterable
 
-from src.core.contracts import Features, SignalIntent
+from src.core.contracts import Features, IntentRecord
 from src.core.settings import StrategyToggles
 from src.core.strategies.base import Strategy
 
 
-def _build_intent(features: Features, confidence: float, reasons: list[str], strategy: str) -> SignalIntent:
+# Every intent prices its bracket from these, whichever strategy emits it.
+INTENT_FEATURES = ("close", "atr")
+
+
+def _build_intent(features: Features, confidence: float, reasons: list[str], strategy: str) -> IntentRecord:
     close = features.values["close"]
     atr = max(features.values.get("atr", 0.1), 0.1)
-    stop = close - 2 * atr
-    take_profit = close + 4 * atr
-    return SignalIntent(
-        symbol=features.symbol,
-        confidence=confidence,
-        entry=close,
-        stop=stop,
-        take_profit=take_profit,
-        reasons=reasons,
-        strategy=strategy,
-        strength="strong" if confidence > 0.75 else "medium",
+    return IntentRecord(
+        features.symbol,
+        confidence,
+        close,
+        close - 2 * atr,
+        close + 4 * atr,
+        tuple(reasons),
+        strategy,
+        "strong" if confidence > 0.75 else "medium",
     )
 
 
@@ -32,7 +35,7 @@ class TrendFollowingStrategy(Strategy):
     def __post_init__(self):
         object.__setattr__(self, "required_features", ["trend", "ema_fast", "ema_slow"])
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         if features.values["trend"] > 0:
             return _build_intent(features, 0.72, ["EMA trend up"], self.name)
         return None
@@ -46,7 +49,7 @@ class BreakoutStrategy(Strategy):
     def __post_init__(self):
         object.__setattr__(self, "required_features", ["close", "vol_avg"])
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         if features.values["close"] > 100 and features.values["vol_avg"] > 0:
             return _build_intent(features, 0.7, ["Price breakout above base"], self.name)
         return None
@@ -60,7 +63,7 @@ class PullbackRetestStrategy(Strategy):
     def __post_init__(self):
         object.__setattr__(self, "required_features", ["ema_fast", "ema_slow"])
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         if 0 < features.values["ema_fast"] - features.values["ema_slow"] < 1.0:
             return _build_intent(features, 0.68, ["Pullback near trend support"], self.name)
         return None
@@ -74,7 +77,7 @@ class RSIMomentumStrategy(Strategy):
     def __post_init__(self):
         object.__setattr__(self, "required_features", ["rsi"])
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         if 55 <= features.values["rsi"] <= 70:
             return _build_intent(features, 0.66, ["RSI momentum in swing zone"], self.name)
         return None
@@ -109,7 +112,7 @@ class CandlePatternStrategy(Strategy):
             ],
         )
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         values = features.values
         required = self.required_features or []
         if any(key not in values for key in required):
@@ -188,7 +191,7 @@ class FibonacciPullbackStrategy(Strategy):
             ["trend", "close", "prev_close", "swing_high_50", "swing_low_50", "atr", "volume", "vol_avg"],
         )
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         values = features.values
         required = self.required_features or []
         if any(key not in values for key in required):
@@ -242,12 +245,17 @@ class VolumeConfirmationStrategy(Strategy):
     def __post_init__(self):
         object.__setattr__(self, "required_features", ["vol_avg"])
 
-    def generate(self, features: Features) -> SignalIntent | None:
+    def generate(self, features: Features) -> IntentRecord | None:
         if features.values["vol_avg"] > 0:
             return _build_intent(features, 0.63, ["Volume confirmation"], self.name)
         return None
 
 
+def build_model_intent(features: Features, probability: float, model_id: str) -> IntentRecord:
+    """Wrap the active model's probability as an ensemble intent with the standard ATR bracket."""
+    return _build_intent(features, probability, [f"Model {model_id} p={probability:.2f}"], "ml_model")
+
+
 def build_strategies(toggles: StrategyToggles | None = None) -> list[Strategy]:
     toggles = toggles or StrategyToggles()
     strategies: list[Strategy] = []
@@ -266,3 +274,11 @@ def build_strategies(toggles: StrategyToggles | None = None) -> list[Strategy]:
     if toggles.enable_volume_confirm:
         strategies.append(VolumeConfirmationStrategy())
     return strategies
+
+
+def required_features(strategies: Iterable[Strategy]) -> set[str]:
+    """Union of the features the given strategies read, including the intent bracket inputs."""
+    names = set(INTENT_FEATURES)
+    for strategy in strategies:
+        names.update(strategy.required_features or [])
+    return names
@@ -5,6 +5,7 @@ import pandas as pd
 import pytest
 
 from src.core.backtest.walk_forward import WalkForwardBacktester
+from src.core.ml.retrain import RetrainPipeline
 
 
 class DummyProvider:
@@ -68,3 +69,35 @@ def test_walk_forward_deterministic_output():
         "trades": pytest.approx(0.0),
         "equity_samples": 80,
     }
+
+
+class RecordingPipeline(RetrainPipeline):
+    def fit(self, features, target, algorithm="logistic_regression", params=None):
+        self.calls.append((features.index.min(), features.index.max()))
+        return super().fit(features, target, algorithm, params)
+
+
+def test_walk_forward_model_mode_trains_each_fold_in_parallel():
+    rng = np.random.default_rng(11)
+    rows = 200
+    prices = 100 + np.cumsum(rng.normal(0.05, 1.0, rows))
+    bars = pd.DataFrame(
+        {
+            "open": prices,
+            "high": prices + rng.uniform(0.5, 1.5, rows),
+            "low": prices - rng.uniform(0.5, 1.5, rows),
+            "close": prices,
+            "volume": rng.integers(900_000, 1_200_000, rows),
+        }
+    )
+    kwargs = dict(train_days=80, test_days=30, step_days=30, model_mode=True, label_horizon=5)
+    pipeline = RecordingPipeline(schedule="manual")
+    pipeline.calls = []
+    serial = WalkForwardBacktester(
+        data_provider=DummyProvider(bars), retrain_pipeline=pipeline, max_workers=1, **kwargs
+    ).run(["AAPL"], years=1)
+    assert len(serial["folds"]) == 4
+    # One fit per fold, each ending `label_horizon` bars before its test slice.
+    assert [end for _, end in pipeline.calls] == [74, 104, 134, 164]
+    parallel = WalkForwardBacktester(data_provider=DummyProvider(bars), max_workers=2, **kwargs).run(["AAPL"], years=1)
+    assert parallel["aggregate"] == serial["aggregate"]
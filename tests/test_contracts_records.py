@@ -0,0 +1,32 @@
+from src.core.contracts import DecisionRecord, Features, FeatureVector, FinalSignal, RiskDecision
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.ensemble.aggregator import EnsembleAggregator
+from src.core.features.feature_engine import FEATURE_SCHEMA, FeatureEngine
+from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.risk.manager import RiskManager
+from src.core.strategies.strategies import build_strategies
+
+
+def test_feature_vector_reads_like_features_mapping():
+    vector = FeatureEngine().compute("AAPL", MockAlpacaClient().get_daily_bars("AAPL", limit=80))
+    assert vector.schema is FEATURE_SCHEMA
+    assert vector.values["close"] == vector.data[FEATURE_SCHEMA.index["close"]]
+    assert vector.values.get("missing", -1.0) == -1.0
+    model = vector.to_model()
+    assert isinstance(model, Features)
+    assert list(model.values) == list(FEATURE_SCHEMA.names)
+    assert not hasattr(vector, "__dict__")
+
+
+def test_records_convert_to_pydantic_at_boundaries():
+    values = {"close": 110.0, "atr": 1.5, "trend": 1.0, "ema_fast": 1.0, "ema_slow": 0.5, "vol_avg": 1.0, "rsi": 60.0}
+    vector = FeatureVector.from_mapping("AAPL", values)
+    intents = [signal for strategy in build_strategies() if (signal := strategy.generate(vector))]
+    final = EnsembleAggregator(min_score=0.0).aggregate(intents)
+    assert FinalSignal.model_validate(final.model_dump()).intents[0].strategy == intents[0].strategy
+    decision, _ = RiskManager(risk_per_trade=0.01, max_position_weight=0.2, cash_buffer=0.05).evaluate(
+        final, PortfolioSnapshot(cash=50_000.0, equity=50_000.0, open_positions=0)
+    )
+    assert isinstance(decision, DecisionRecord)
+    assert decision.to_model() == RiskDecision(**decision.model_dump())
+    assert decision.approved and decision.shares > 0
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 
 from src.core.risk.correlation import CorrelationManager
+from src.core.risk.covariance import CorrelationService, RollingCovariance
 
 
 def test_correlation_manager_blocks_high_corr():
@@ -37,3 +39,54 @@ def test_correlation_manager_blocks_sector_limit():
     )
     assert allowed is False
     assert "sector_weight" in reason
+
+
+def _bars(closes, start="2026-01-01"):
+    return pd.DataFrame({"ts": pd.date_range(start, periods=len(closes), freq="D", tz="UTC"), "close": closes})
+
+
+def test_rolling_covariance_matches_pandas_with_gaps():
+    rng = np.random.default_rng(11)
+    returns = pd.DataFrame(rng.normal(0, 0.02, size=(150, 4)), columns=list("ABCD"))
+    returns.iloc[rng.random((150, 4)) < 0.1] = np.nan
+    rolling = RollingCovariance(list("ABCD"), window=40)
+    for row in returns.to_numpy():
+        rolling.push(row)
+    expected = returns.tail(40)
+    assert np.allclose(rolling.covariance(), expected.cov().to_numpy())
+    assert np.allclose(rolling.correlation(), expected.corr().to_numpy())
+    assert np.allclose(rolling.correlation_row("B"), expected.corr()["B"].to_numpy())
+
+
+def test_service_advances_one_bar_and_backs_the_manager():
+    rng = np.random.default_rng(5)
+    base = 100 * np.cumprod(1 + rng.normal(0, 0.01, 81))
+    bars = {
+        "AAPL": _bars(base),
+        "MSFT": _bars(base * 1.5),
+        "XOM": _bars(100 * np.cumprod(1 + rng.normal(0, 0.01, 81))),
+    }
+    service = CorrelationService(window=30)
+    assert service.update({s: b.iloc[:80] for s, b in bars.items()}) == 30
+    assert service.update({s: b.iloc[:80] for s, b in bars.items()}) == 0
+    assert service.update(bars) == 1
+    expected = pd.DataFrame({s: b["close"] for s, b in bars.items()}).pct_change().tail(30).corr()
+    assert np.allclose(service.correlation_matrix().loc[expected.index, expected.columns], expected)
+
+    manager = CorrelationManager(max_symbol_correlation=0.9, max_sector_weight=0.3, service=service)
+    allowed, reason = manager.check_symbol("AAPL", 0.1, {"MSFT": 0.2}, {})
+    assert allowed is False and "MSFT" in reason
+    assert manager.check_symbol("AAPL", 0.1, {"XOM": 0.2}, {}) == (True, "ok")
+
+
+def test_partial_update_backfills_the_symbols_it_left_out():
+    rng = np.random.default_rng(8)
+    bars = {symbol: _bars(100 * np.cumprod(1 + rng.normal(0, 0.01, 50))) for symbol in ("AAPL", "MSFT", "XOM")}
+    service = CorrelationService(window=20)
+    service.update({s: b.iloc[:45] for s, b in bars.items()})
+    assert service.update({"AAPL": bars["AAPL"].iloc[:48], "MSFT": bars["MSFT"].iloc[:48]}) == 3
+    assert service.update({"XOM": bars["XOM"], "MSFT": bars["MSFT"]}) == 20
+    service.update(bars)
+    expected = pd.DataFrame({s: b["close"] for s, b in bars.items()}).pct_change().tail(20)
+    assert not service.returns_panel().isna().to_numpy().any()
+    assert np.allclose(service.covariance_matrix().loc[expected.columns, expected.columns], expected.cov())
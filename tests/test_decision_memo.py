@@ -0,0 +1,75 @@
+from pathlib import Path
+import pickle
+import sqlite3
+
+from fastapi.testclient import TestClient
+import numpy as np
+import pandas as pd
+
+from src.app.main import create_app
+from src.core.ml.registry import ModelRegistry
+from src.core.orchestrator.memo import DecisionMemo
+from src.core.settings import Settings, StorageSettings
+
+
+class CountingModel:
+    batches: list = []
+
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, frame):
+        CountingModel.batches.append(len(frame))
+        positive = np.where(frame["trend"].to_numpy() > 0, 0.99, 0.01)
+        return np.column_stack([1 - positive, positive])
+
+
+def _register(registry: ModelRegistry, model_id: str = "model-live") -> None:
+    path = registry.base_dir / f"{model_id}.pkl"
+    with path.open("wb") as f:
+        pickle.dump(CountingModel(), f)
+    registry.register_model(
+        model_id=model_id,
+        artifact_path=str(path),
+        metrics={},
+        feature_list=["rsi", "trend"],
+        algorithm="counting",
+        set_active=True,
+    )
+
+
+def test_key_covers_revised_last_bar():
+    bars = pd.DataFrame({"ts": pd.bdate_range("2024-01-01", periods=3, tz="UTC"), "close": [1.0, 2.0, 3.0]})
+    key = DecisionMemo.key(bars, "cfg", "model")
+    assert DecisionMemo.key(bars.copy(), "cfg", "model") == key
+    revised = bars.copy()
+    revised.loc[2, "close"] = 3.5  # same timestamp, provisional close replaced
+    assert DecisionMemo.key(revised, "cfg", "model") != key
+    assert DecisionMemo.key(bars, "cfg", "other") != key
+
+
+def test_unchanged_bars_reuse_memoized_decisions(tmp_path: Path):
+    CountingModel.batches = []
+    registry_dir = tmp_path / "registry"
+    _register(ModelRegistry(base_dir=registry_dir))
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'db.sqlite'}", cache_dir=str(tmp_path / "cache")),
+        ml={"registry": {"directory": str(registry_dir)}},
+    )
+    client = TestClient(create_app(settings=settings, use_mock=True))
+    client.post("/api/orchestrator/start")
+    symbols = {"symbols": ["AAPL", "MSFT", "NVDA"]}
+    first = client.post("/api/run-cycle", json=symbols).json()
+    second = client.post("/api/run-cycle", json=symbols).json()
+    assert first["short_circuited"] == 0
+    assert second["short_circuited"] == 3
+    assert CountingModel.batches == [3]
+    assert second["decisions"] == first["decisions"]
+
+    # A config change invalidates every entry.
+    settings.ensemble.min_final_score_to_trade = 0.65
+    third = client.post("/api/run-cycle", json=symbols).json()
+    assert third["short_circuited"] == 0
+    assert CountingModel.batches == [3, 3]
+    with sqlite3.connect(tmp_path / "db.sqlite") as conn:
+        reasons = [row[0] for row in conn.execute("SELECT reasons FROM signals")]
+    assert len(reasons) == 9 and all("Model model-live" in r for r in reasons)
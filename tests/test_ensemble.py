@@ -1,4 +1,7 @@
-from src.core.contracts import SignalIntent
+import numpy as np
+import pytest
+
+from src.core.contracts import IntentRecord, SignalIntent
 from src.core.ensemble.aggregator import EnsembleAggregator
 
 
@@ -28,3 +31,73 @@ def test_ensemble_aggregate():
     assert final is not None
     assert final.symbol == "AAPL"
     assert final.score >= 0.6
+
+
+def _intents(row, strategies):
+    return [
+        IntentRecord("AAPL", float(c), 100.0, 95.0, 110.0, (name,), name)
+        for c, name in zip(row, strategies)
+        if np.isfinite(c) and c > 0
+    ]
+
+
+def test_batch_scores_match_per_row_aggregation():
+    strategies = ["trend_following", "breakout", "volume_confirm"]
+    rng = np.random.default_rng(7)
+    confidences = rng.uniform(0.3, 0.9, size=(200, 3))
+    confidences[rng.random((200, 3)) < 0.4] = np.nan
+    aggregators = [
+        EnsembleAggregator(method="weighted", weights={"breakout": 2.0}),
+        EnsembleAggregator(method="majority", strategies=(*strategies, "candle_patterns"), vote_threshold=0.6),
+        EnsembleAggregator(method="stacking", stacking_coefficients={"trend_following": 3.0}, stacking_intercept=-1.0),
+    ]
+    for aggregator in aggregators:
+        scores = aggregator.aggregate_batch(confidences, strategies)
+        for row, score in zip(confidences, scores):
+            intents = _intents(row, strategies)
+            if not intents:
+                assert np.isnan(score)
+            else:
+                assert score == pytest.approx(aggregator.score(intents))
+    # 2 of the 4-strategy panel voting is not a majority above 0.7.
+    majority = EnsembleAggregator(method="majority", strategies=(*strategies, "candle_patterns"))
+    assert majority.aggregate(_intents([0.8, 0.8, np.nan], strategies)) is None
+    assert majority.aggregate(_intents([0.8, 0.8, 0.6], strategies)).score == 0.75
+
+
+def test_zero_confidence_and_zero_weights_agree_between_batch_and_scalar():
+    strategies = ["trend_following", "breakout"]
+    confidences = np.array([[0.8, 0.0], [0.0, 0.0], [0.9, 0.6]])
+    zero_conf = [
+        IntentRecord("AAPL", 0.8, 100.0, 95.0, 110.0, ("trend",), "trend_following"),
+        IntentRecord("AAPL", 0.0, 100.0, 95.0, 110.0, ("breakout",), "breakout"),
+    ]
+    for aggregator in (
+        EnsembleAggregator(method="weighted"),
+        EnsembleAggregator(method="majority", strategies=tuple(strategies), vote_threshold=0.5),
+    ):
+        scores = aggregator.aggregate_batch(confidences, strategies)
+        assert scores[0] == pytest.approx(aggregator.score(zero_conf))
+        assert np.isnan(scores[1])
+    assert EnsembleAggregator(method="weighted").score(zero_conf) == pytest.approx(0.8)
+
+    silent = EnsembleAggregator(method="weighted", weights={"trend_following": 0.0, "breakout": 0.0})
+    assert silent.score(zero_conf) == 0.0
+    assert silent.aggregate(zero_conf) is None
+    assert np.array_equal(silent.aggregate_batch(confidences, strategies), [0.0, np.nan, 0.0], equal_nan=True)
+    muted = EnsembleAggregator(method="majority", weights={"trend_following": 0.0, "breakout": 0.0})
+    assert muted.score(zero_conf) == 0.0
+    assert np.array_equal(muted.aggregate_batch(confidences, strategies), [0.0, np.nan, 0.0], equal_nan=True)
+
+
+def test_stacking_learns_the_informative_strategy():
+    strategies = ["informative", "noise"]
+    rng = np.random.default_rng(3)
+    confidences = rng.uniform(0.5, 0.9, size=(2000, 2))
+    outcomes = (rng.random(2000) < (confidences[:, 0] - 0.4)).astype(int)
+    aggregator = EnsembleAggregator(method="stacking")
+    coefficients = aggregator.fit_stacking(confidences, outcomes, strategies)
+    assert coefficients["informative"] > 2.0
+    assert abs(coefficients["noise"]) < 1.0
+    scores = aggregator.aggregate_batch(confidences, strategies)
+    assert scores[confidences[:, 0] > 0.85].mean() > scores[confidences[:, 0] < 0.55].mean()
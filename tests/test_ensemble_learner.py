@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from src.core.contracts import IntentRecord
+from src.core.ensemble.aggregator import EnsembleAggregator
+from src.core.ensemble.learner import OnlineWeightLearner
+from src.core.storage.db import SQLiteStore
+
+
+def test_closed_trades_shift_weights_and_persist(tmp_path):
+    store = SQLiteStore(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    trade_id = store.add_trade("AAPL", "buy", 10, 100.0, 95.0, 110.0, strategies={"trend_following": 0.72, "breakout": 0.7})
+    assert json.loads(store.list_open_trades()[0]["strategies"]) == {"trend_following": 0.72, "breakout": 0.7}
+    store.close_trade(trade_id)
+
+    learner = OnlineWeightLearner(store=store)
+    for _ in range(5):
+        learner.update({"trend_following": 0.72}, entry=100.0, exit_price=106.0)
+        learner.update({"breakout": 0.7}, entry=100.0, exit_price=96.0)
+    assert learner.weight("trend_following") > 1.0 > learner.weight("breakout")
+    assert all(learner.min_weight <= w <= learner.max_weight for w in learner.weights.values())
+
+    reloaded = OnlineWeightLearner(store=store)
+    assert reloaded.weights == pytest.approx(learner.weights)
+    assert reloaded.updates == {"trend_following": 5, "breakout": 5}
+
+    intents = [
+        IntentRecord("AAPL", 0.9, 100.0, 95.0, 110.0, ("trend",), "trend_following"),
+        IntentRecord("AAPL", 0.5, 100.0, 95.0, 110.0, ("breakout",), "breakout"),
+    ]
+    assert EnsembleAggregator(learner=reloaded).score(intents) > EnsembleAggregator().score(intents)
@@ -0,0 +1,38 @@
+import pytest
+
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.features.feature_engine import FEATURE_NAMES, FeatureEngine
+from src.core.orchestrator.setup_gate import SetupGate
+from src.core.settings import StrategyToggles
+from src.core.strategies.strategies import build_strategies, required_features
+
+
+def test_subset_matches_full_computation():
+    bars = MockAlpacaClient().get_daily_bars("AAPL", limit=160)
+    engine = FeatureEngine()
+    full = dict(engine.compute("AAPL", bars).values)
+    assert list(full) == list(FEATURE_NAMES)
+    for subset in (["atr"], ["rsi", "prev2_close"], ["swing_low_50", "vol_avg"], ["trend"]):
+        partial = engine.compute("AAPL", bars, subset).values
+        assert sorted(partial) == sorted(subset)
+        assert dict(partial) == pytest.approx({name: full[name] for name in subset})
+
+
+def test_disabling_strategies_shrinks_the_feature_plan():
+    engine = FeatureEngine()
+    everything = required_features(build_strategies()) | set(SetupGate.required_features)
+    order, lookback, _ = engine.plan(everything)
+    assert lookback is None  # EMAs need the full history
+    toggles = StrategyToggles(
+        enable_trend_following=False,
+        enable_pullback_retest=False,
+        enable_candle_patterns=False,
+        enable_fib_pullback=False,
+    )
+    reduced = required_features(build_strategies(toggles))
+    reduced_order, reduced_lookback, schema = engine.plan(reduced)
+    assert set(schema.names) == {"close", "atr", "vol_avg", "rsi"}
+    assert reduced_lookback == 20
+    assert len(reduced_order) < len(order)
+    # ATR and prev_close share the lagged-close intermediate.
+    assert engine.plan(["atr", "prev_close"])[0].count("close_lag1") == 1
@@ -0,0 +1,56 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.features.feature_engine import FeatureEngine
+from src.core.features.store import FeatureStore
+
+
+def test_store_shares_rows_across_engines_and_prunes_on_new_bar(tmp_path, monkeypatch):
+    path = tmp_path / "features.db"
+    bars = MockAlpacaClient().get_daily_bars("AAPL", limit=120)
+    expected = FeatureEngine().compute("AAPL", bars).data
+
+    first = FeatureEngine(store=FeatureStore(path))
+    assert first.compute("AAPL", bars).data == expected
+    assert first.store.stats()["misses"] == 1
+
+    # A second process-like consumer reads the persisted row instead of recomputing.
+    second = FeatureEngine(store=FeatureStore(path))
+    monkeypatch.setattr(second, "_evaluate", lambda *args: (_ for _ in ()).throw(AssertionError("recomputed")))
+    assert second.compute("AAPL", bars).data == expected
+    assert second.store.stats()["hits"] == 1
+    monkeypatch.undo()
+
+    # Different engine parameters never reuse those rows.
+    slower = FeatureEngine(atr_period=20, store=FeatureStore(path))
+    assert slower.compute("AAPL", bars).data == FeatureEngine(atr_period=20).compute("AAPL", bars).data
+
+    extra = bars.tail(1).assign(ts=bars["ts"].iloc[-1] + pd.Timedelta(days=1), close=bars["close"].iloc[-1] * 1.02)
+    grown = pd.concat([bars, extra], ignore_index=True)
+    assert first.compute("AAPL", grown).data == FeatureEngine().compute("AAPL", grown).data
+    with sqlite3.connect(path) as conn:
+        stamps = {row[0] for row in conn.execute("SELECT last_ts FROM feature_rows WHERE symbol = 'AAPL'")}
+    assert stamps == {extra["ts"].iloc[0].isoformat()}
+
+
+def test_bounded_subsets_hit_across_history_lengths(tmp_path):
+    engine = FeatureEngine(store=FeatureStore(tmp_path / "features.db", lru_size=1))
+    bars = MockAlpacaClient().get_daily_bars("MSFT", limit=300)
+    engine.compute("MSFT", bars, ["close", "atr"])
+    engine.compute("MSFT", bars.tail(60), ["close", "atr"])
+    engine.compute("MSFT", bars.tail(60), ["close"])
+    assert engine.store.stats() == {"hits": 1, "misses": 2, "lru_entries": 1}
+
+
+def test_store_reuses_one_connection_per_thread_until_closed(tmp_path):
+    store = FeatureStore(tmp_path / "features.db")
+    conn = store._connect()
+    assert store._connect() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert store._connect() is not conn
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.data.cache import DataCache
+from src.core.features.feature_engine import FeatureEngine
+from src.core.ml.dataset import DatasetBuilder, load_dataset, tp_before_sl_labels
+
+
+def _loop_labels(close, high, low, atr, horizon, stop_mult, tp_mult):
+    labels = np.full(len(close), np.nan)
+    for i in range(len(close) - horizon):
+        if np.isnan(atr[i]):
+            continue
+        tp = close[i] + tp_mult * atr[i]
+        sl = close[i] - stop_mult * atr[i]
+        labels[i] = 0.0
+        for j in range(i + 1, i + 1 + horizon):
+            if low[j] <= sl:
+                break
+            if high[j] >= tp:
+                labels[i] = 1.0
+                break
+    return labels
+
+
+def test_tp_before_sl_labels_match_bar_by_bar_scan():
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, size=300))
+    high = close + rng.uniform(0, 2, size=300)
+    low = close - rng.uniform(0, 2, size=300)
+    atr = np.full(300, 1.0)
+    atr[:14] = np.nan
+    expected = _loop_labels(close, high, low, atr, 10, 2.0, 4.0)
+    actual = tp_before_sl_labels(close, high, low, atr, 10, 2.0, 4.0)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.array_equal(actual[~np.isnan(actual)], expected[~np.isnan(expected)])
+
+
+def test_feature_frame_rows_match_incremental_compute():
+    bars = MockAlpacaClient().get_daily_bars("AAPL", limit=80)
+    engine = FeatureEngine()
+    frame = engine.compute_frame(bars)
+    for row in (30, 79):
+        expected = engine.compute("AAPL", bars.head(row + 1)).values
+        assert frame.iloc[row].to_dict() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("data_format", ["parquet", "npz"])
+def test_dataset_round_trip(tmp_path: Path, data_format: str):
+    cache = DataCache(tmp_path / "cache")
+    client = MockAlpacaClient()
+    for symbol in ("AAPL", "MSFT"):
+        cache.save_daily_bars(symbol, client.get_daily_bars(symbol, limit=120))
+    builder = DatasetBuilder(cache=cache, feature_engine=FeatureEngine(), horizon=5, label="forward_return")
+    dataset = builder.build(["AAPL", "MSFT", "MISSING"])
+    # 120 bars minus ATR/RSI/volume warm-up (19) and the unlabeled horizon (5).
+    assert len(dataset) == 2 * (120 - 19 - 5)
+    assert dataset.manifest["missing_symbols"] == ["MISSING"]
+    assert dataset.timestamps.is_monotonic_increasing
+    manifest_path = builder.write(dataset, tmp_path / "ds", data_format=data_format)
+    loaded = load_dataset(manifest_path.parent)
+    assert loaded.manifest["sha256"] == dataset.manifest["sha256"]
+    pd.testing.assert_frame_equal(loaded.features, dataset.features)
+    assert loaded.target.tolist() == dataset.target.tolist()
+    assert list(loaded.symbols) == list(dataset.symbols)
+
+
+def test_retrain_endpoint_trains_from_built_dataset(tmp_path: Path):
+    from fastapi.testclient import TestClient
+
+    from src.app.main import create_app
+    from src.core.settings import Settings, StorageSettings
+
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'db.sqlite'}", cache_dir=str(tmp_path / "cache")),
+        ml={
+            "registry": {"directory": str(tmp_path / "registry")},
+            "dataset": {"directory": str(tmp_path / "datasets"), "label": "forward_return", "horizon_days": 5},
+            "hpo": {"enabled": False},
+        },
+    )
+    cache = DataCache(tmp_path / "cache")
+    cache.save_daily_bars("AAPL", MockAlpacaClient().get_daily_bars("AAPL", limit=200))
+    client = TestClient(create_app(settings=settings, use_mock=True))
+    built = client.post("/api/models/dataset/build", json={"name": "daily", "symbols": ["AAPL"]})
+    assert built.status_code == 200
+    assert built.json()["rows"] > 100
+    assert client.post("/api/models/retrain", json={"dataset": "../escape"}).status_code == 400
+    retrained = client.post("/api/models/retrain", json={"dataset": "daily"})
+    assert retrained.status_code == 200
+    assert "accuracy" in retrained.json()["metrics"]
@@ -1,8 +1,14 @@
 import sys
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from src.core.ml.drift import detect_drift
+from src.core.contracts import Features
+from src.core.ml.drift import DriftMonitor, DriftReference, detect_drift
+from src.core.ml.registry import ModelRegistry
+from src.core.ml.retrain import RetrainPipeline
+from src.core.ml.sketch import TDigest, build_baseline
 
 
 def test_detect_drift_flags_shift():
@@ -19,3 +25,95 @@ def test_detect_drift_without_scipy(monkeypatch):
     current = pd.DataFrame({"feature": [2, 2, 2, 2, 2]})
     report = detect_drift(baseline, current, alpha=0.05)
     assert report.method_used == "percentile_shift"
+
+
+def test_drift_reference_matches_scipy_statistics():
+    from scipy.stats import ks_2samp, wasserstein_distance
+
+    rng = np.random.default_rng(0)
+    baseline = pd.DataFrame(rng.normal(size=(400, 3)).round(1), columns=["a", "b", "c"])
+    current = pd.DataFrame(rng.normal(0.4, 1.3, size=(250, 3)).round(1), columns=["a", "b", "c"])
+    current.iloc[10:30, 1] = np.nan
+    reference = DriftReference.from_frame(baseline)
+    report = reference.compare(current)
+    for col in ["a", "b", "c"]:
+        expected = ks_2samp(baseline[col].dropna(), current[col].dropna())
+        assert report.ks_statistics[col] == pytest.approx(expected.statistic)
+        assert report.wasserstein[col] == pytest.approx(
+            wasserstein_distance(baseline[col].dropna(), current[col].dropna())
+        )
+        assert report.psi[col] > 0
+    assert set(report.drifted_features) == {"a", "b", "c"}
+    assert reference.compare(baseline).drifted_features == []
+
+
+def test_all_nan_column_scores_zero():
+    rng = np.random.default_rng(1)
+    baseline = pd.DataFrame({"a": rng.normal(size=200), "b": np.nan})
+    current = pd.DataFrame({"a": rng.normal(1.0, size=150), "b": np.nan})
+    stats = DriftReference.from_frame(baseline).statistics(current)
+    assert stats["ks"][1] == 0.0 and stats["wasserstein"][1] == 0.0
+    report = detect_drift(baseline, current)
+    assert report.drifted_features == ["a"] and "b" not in report.ks_statistics
+
+
+def test_drift_check_endpoint_returns_report(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.app.main import create_app
+    from src.core.settings import Settings, StorageSettings
+
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'db.sqlite'}", cache_dir=str(tmp_path / "cache")),
+        ml={"registry": {"directory": str(tmp_path / "registry")}},
+    )
+    client = TestClient(create_app(settings=settings, use_mock=True))
+    response = client.post(
+        "/api/models/drift-check",
+        json={"baseline": [{"x": float(i % 5)} for i in range(50)], "current": [{"x": 10.0 + i % 3} for i in range(50)]},
+    )
+    assert response.status_code == 200
+    assert response.json()["drifted_features"] == ["x"]
+
+
+def test_tdigest_quantiles_merge_and_bounded_size():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=50_000)
+    first = TDigest.from_values(values[:25_000], compression=100)
+    second = TDigest.from_values(values[25_000:], compression=100)
+    merged = first.merge(second)
+    probs = np.array([0.05, 0.25, 0.5, 0.75, 0.95])
+    assert np.allclose(merged.quantile(probs), np.quantile(values, probs), atol=0.02)
+    assert merged.count == pytest.approx(50_000)
+    assert merged.weights.size <= 101
+    restored = TDigest.from_dict(merged.to_dict())
+    assert np.allclose(restored.cdf([0.0]), merged.cdf([0.0]))
+
+
+def test_drift_monitor_fires_retrain_plan_against_registry_baseline(tmp_path):
+    rng = np.random.default_rng(2)
+    registry = ModelRegistry(base_dir=tmp_path)
+    registry.register_model("model-a", "a.pkl", {}, ["rsi", "trend"], "rule_based", set_active=True)
+    training = pd.DataFrame({"rsi": rng.normal(50, 5, 2000), "trend": rng.normal(0, 1, 2000)})
+    registry.set_baseline("model-a", build_baseline(training))
+    monitor = DriftMonitor(
+        data_threshold=0.1,
+        performance_threshold=0.1,
+        window_size=100,
+        max_windows=2,
+        registry=registry,
+        retrain_pipeline=RetrainPipeline(schedule="manual"),
+    )
+    for _ in range(99):
+        monitor.observe(Features(symbol="AAPL", values={"rsi": rng.normal(50, 5), "trend": rng.normal(0, 1)}))
+    assert monitor.evaluate() is None
+    monitor.observe(Features(symbol="AAPL", values={"rsi": 50.0, "trend": 0.0}))
+    calm = monitor.evaluate()
+    assert calm is not None and calm.plan is None
+    for _ in range(300):
+        monitor.observe(Features(symbol="AAPL", values={"rsi": rng.normal(70, 5), "trend": rng.normal(0, 1)}))
+    result = monitor.evaluate()
+    assert result.report.drifted_features == ["rsi"]
+    assert result.plan is not None and result.plan.triggered
+    assert len(monitor.rolling_sketches()["rsi"].weights) <= 101
+    assert monitor.evaluate() is None
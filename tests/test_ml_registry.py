@@ -1,6 +1,11 @@
+import json
 from pathlib import Path
+import sqlite3
+import threading
 
-from src.core.ml.registry import ModelRegistry
+import pytest
+
+from src.core.ml.registry import ModelRegistry, close_connections
 
 
 def test_model_registry_persists_and_sets_active(tmp_path: Path):
@@ -25,3 +30,69 @@ def test_model_registry_persists_and_sets_active(tmp_path: Path):
     )
     registry.set_active_model("model-b")
     assert registry.get_active_model()["model_id"] == "model-b"
+
+
+def _register(registry: ModelRegistry, model_id: str, set_active: bool = False) -> dict:
+    return registry.register_model(
+        model_id=model_id,
+        artifact_path=f"{model_id}.pkl",
+        metrics={"f1": 0.5},
+        feature_list=["a"],
+        algorithm="rule_based",
+        set_active=set_active,
+    )
+
+
+def test_model_registry_instances_share_invalidated_cache(tmp_path: Path):
+    first = ModelRegistry(base_dir=tmp_path)
+    second = ModelRegistry(base_dir=tmp_path)
+    _register(first, "model-a", set_active=True)
+    assert second.get_active_model()["model_id"] == "model-a"
+    version = second.version()
+    _register(second, "model-b")
+    first.set_active_model("model-b")
+    assert second.version() > version
+    assert second.get_active_model()["model_id"] == "model-b"
+    assert [m["model_id"] for m in first.list_models() if m["active"]] == ["model-b"]
+    assert first.get_model("model-a")["active"] is False
+    assert first.get_model("missing") is None
+
+
+def test_model_registry_rejects_unknown_active_and_exports_json(tmp_path: Path):
+    registry = ModelRegistry(base_dir=tmp_path)
+    _register(registry, "model-a", set_active=True)
+    with pytest.raises(ValueError):
+        registry.set_active_model("missing")
+    assert registry.get_active_model()["model_id"] == "model-a"
+    exported = json.loads((tmp_path / "registry.json").read_text(encoding="utf-8"))
+    assert [m["model_id"] for m in exported["models"]] == ["model-a"]
+
+
+def test_model_registry_imports_legacy_json(tmp_path: Path):
+    legacy = {
+        "models": [
+            {"model_id": "old-a", "artifact_path": "a.pkl", "metrics": {}, "feature_list": [], "algorithm": "x"},
+            {"model_id": "old-b", "artifact_path": "b.pkl", "metrics": {}, "feature_list": [], "algorithm": "x", "active": True},
+        ]
+    }
+    (tmp_path / "registry.json").write_text(json.dumps(legacy), encoding="utf-8")
+    registry = ModelRegistry(base_dir=tmp_path)
+    assert {m["model_id"] for m in registry.list_models()} == {"old-a", "old-b"}
+    assert registry.get_active_model()["model_id"] == "old-b"
+
+
+def test_registries_share_one_connection_per_thread(tmp_path):
+    first = ModelRegistry(base_dir=tmp_path)
+    conn = first._connect()
+    assert ModelRegistry(base_dir=tmp_path)._connect() is conn
+    other = []
+    thread = threading.Thread(target=lambda: other.append(first._connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+    first.register_model("m1", "a.joblib", {}, ["f"], "gbm", set_active=True)
+    assert first.get_active_model()["model_id"] == "m1"
+    close_connections()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert first.get_active_model()["model_id"] == "m1"
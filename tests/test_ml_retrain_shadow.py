@@ -1,10 +1,15 @@
 from pathlib import Path
+import pickle
 
 import numpy as np
 import pandas as pd
 
+from src.core.ml.hpo import HyperparameterSearch
+from src.core.ml.registry import ModelRegistry
 from src.core.ml.retrain import RetrainPipeline
 from src.core.ml.shadow import ShadowTester
+from src.core.ml.validation import purged_walk_forward_splits
+from src.core.settings import MLHPOSettings
 
 
 def test_retrain_creates_artifact_and_metrics(tmp_path: Path):
@@ -25,3 +30,149 @@ def test_shadow_tester_compares_models():
     result = tester.run(candidate, active, features, target, metric_name="accuracy", delta=0.1)
     assert result.passed is True
     assert "candidate" in result.details
+
+
+def _synthetic_dataset(rows: int = 240) -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(3)
+    features = pd.DataFrame({"x1": rng.normal(size=rows), "x2": rng.normal(size=rows)})
+    target = pd.Series((features["x1"] + 0.3 * rng.normal(size=rows) > 0).astype(int))
+    return features, target
+
+
+def test_purged_splits_leave_gap_before_test_block():
+    splits = purged_walk_forward_splits(100, n_splits=4, purge=5, test_gap=2)
+    assert len(splits) == 4
+    for train_idx, test_idx in splits:
+        assert test_idx.min() - train_idx.max() - 1 >= 5 + 2
+
+
+def test_purged_splits_cut_interleaved_symbols_by_timestamp():
+    dates = pd.bdate_range("2024-01-01", periods=120)
+    horizon = 5
+    ts = np.repeat(dates.to_numpy(), 4)  # four symbols per date, sorted by (ts, symbol)
+    splits = purged_walk_forward_splits(len(ts), n_splits=4, purge=horizon, test_gap=1, timestamps=ts)
+    assert len(splits) == 4
+    for train_idx, test_idx in splits:
+        test_dates = np.unique(ts[test_idx])
+        assert len(test_idx) == 4 * len(test_dates)
+        # A training label looks ``horizon`` bars ahead; that window must end before the test block.
+        label_end = np.searchsorted(dates.to_numpy(), ts[train_idx]) + horizon
+        assert label_end.max() < np.searchsorted(dates.to_numpy(), test_dates.min())
+        assert not set(ts[train_idx]) & set(test_dates)
+
+
+def test_successive_halving_runs_trials_in_process_pool():
+    features, target = _synthetic_dataset()
+    splits = purged_walk_forward_splits(len(features), n_splits=3, purge=2)
+    search = HyperparameterSearch(engine="successive_halving", trials=6, max_workers=2, eta=3)
+    result = search.search(features.to_numpy(), target.to_numpy(), splits)
+    full_budget = 6 * len(splits)
+    assert 0 < result.evaluations < full_budget
+    assert result.best_score > 0.5
+    assert "C" in result.best_params
+
+
+def test_retrain_with_hpo_records_out_of_sample_metrics(tmp_path: Path):
+    features, target = _synthetic_dataset()
+    hpo = MLHPOSettings(trials=4, cv_splits=3, purge_bars=2, max_workers=1)
+    pipeline = RetrainPipeline(schedule="manual", hpo=hpo)
+    result = pipeline.run(features, target, registry_dir=str(tmp_path))
+    assert result.metrics["cv_folds"] == 3
+    assert "oos_f1" in result.metrics
+    entry = ModelRegistry(base_dir=tmp_path).get_model(result.model_id)
+    assert entry["metrics"]["oos_f1"] == result.metrics["oos_f1"]
+    assert "C" in entry["params"]
+
+
+def test_shadow_scorer_joins_matured_outcomes_and_replays_log(tmp_path: Path):
+    from src.core.contracts import Features
+    from src.core.ml.shadow import ShadowScorer
+
+    registry = ModelRegistry(base_dir=tmp_path / "registry")
+    for model_id, threshold, active in (("model-active", 1e9, True), ("model-candidate", 0.0, False)):
+        path = registry.base_dir / f"{model_id}.pkl"
+        path.write_bytes(pickle.dumps({"threshold": threshold}))
+        registry.register_model(model_id, str(path), {}, ["close"], "rule_based", set_active=active)
+    ts = pd.date_range("2024-01-01", periods=40, freq="B", tz="UTC")
+    close = np.linspace(100, 140, 40)
+    bars = {
+        symbol: pd.DataFrame({"ts": ts, "open": close, "high": close + 1, "low": close - 1, "close": close})
+        for symbol in ("AAPL", "MSFT")
+    }
+    scorer = ShadowScorer(
+        registry=registry, log_dir=tmp_path / "shadow", days=0, horizon=3, label="forward_return", min_outcomes=4
+    )
+    scorer.add_candidate("model-candidate")
+    for end in (20, 21, 30):
+        window = {symbol: frame.head(end) for symbol, frame in bars.items()}
+        features = [Features(symbol=s, values={"close": float(f["close"].iloc[-1]), "atr": 1.0}) for s, f in window.items()]
+        scorer.submit(features, window, "model-active", {"AAPL": 0.0, "MSFT": 0.0})
+        scorer.drain()
+    status = scorer.status()["model-candidate"]
+    assert status["candidate"]["outcomes"] == 4
+    assert status["pending"] == 2
+    assert status["passed"] is True
+    assert status["candidate"]["f1"] == 1.0 and status["active"]["f1"] == 0.0
+    scorer.close()
+    replayed = ShadowScorer(registry=registry, log_dir=tmp_path / "shadow", horizon=3, label="forward_return")
+    assert replayed.status()["model-candidate"]["candidate"] == status["candidate"]
+    assert replayed.status()["model-candidate"]["pending"] == 2
+    replayed.close()
+
+
+def test_shadow_log_compacts_and_pending_rows_expire(tmp_path: Path):
+    from src.core.contracts import Features
+    from src.core.ml.shadow import ShadowScorer
+
+    registry = ModelRegistry(base_dir=tmp_path / "registry")
+    for model_id, active in (("model-active", True), ("model-candidate", False)):
+        path = registry.base_dir / f"{model_id}.pkl"
+        path.write_bytes(pickle.dumps({"threshold": 0.0}))
+        registry.register_model(model_id, str(path), {}, ["close"], "rule_based", set_active=active)
+    ts = pd.date_range("2024-01-01", periods=60, freq="B", tz="UTC")
+    close = np.linspace(100, 160, 60)
+    frame = pd.DataFrame({"ts": ts, "open": close, "high": close + 1, "low": close - 1, "close": close})
+
+    def run(scorer, ends, symbols):
+        for end in ends:
+            window = {symbol: frame.head(end) for symbol in symbols}
+            features = [Features(symbol=s, values={"close": float(f["close"].iloc[-1]), "atr": 1.0}) for s, f in window.items()]
+            scorer.submit(features, window, "model-active", {s: 0.0 for s in symbols})
+            scorer.drain()
+
+    compacting = ShadowScorer(registry=registry, log_dir=tmp_path / "a", horizon=3, label="forward_return", max_parts=3)
+    plain = ShadowScorer(registry=registry, log_dir=tmp_path / "b", horizon=3, label="forward_return", max_parts=1000)
+    for scorer in (compacting, plain):
+        scorer.add_candidate("model-candidate")
+        run(scorer, range(10, 30), ["AAPL", "MSFT"])
+    assert len(list((tmp_path / "a" / "predictions").glob("part-*.parquet"))) <= 4
+    for key in ("candidate", "active", "pending"):
+        assert compacting.status()["model-candidate"][key] == plain.status()["model-candidate"][key]
+    compacting.close()
+    replayed = ShadowScorer(registry=registry, log_dir=tmp_path / "a", horizon=3, label="forward_return")
+    assert replayed.status()["model-candidate"]["candidate"] == plain.status()["model-candidate"]["candidate"]
+    replayed.close()
+
+    # AAPL stops arriving: its open rows expire once the newest bar is 2 * horizon business days past them.
+    run(plain, [31], ["MSFT"])
+    assert plain.status()["model-candidate"]["pending"] == 5  # AAPL 26-28, MSFT 28 and 30
+    run(plain, [36], ["MSFT"])
+    assert plain.status()["model-candidate"]["pending"] == 1
+    plain.close()
+
+
+def test_app_shutdown_closes_the_shadow_scorer(tmp_path: Path):
+    from fastapi.testclient import TestClient
+
+    from src.app.main import create_app
+    from src.core.settings import Settings, StorageSettings
+
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'db.sqlite'}", cache_dir=str(tmp_path / "cache")),
+        ml={"registry": {"directory": str(tmp_path / "registry")}, "shadow_test": {"live": True, "directory": str(tmp_path / "shadow")}},
+    )
+    assert Settings().ml.shadow_test.live is False
+    app = create_app(settings=settings, use_mock=True)
+    with TestClient(app):
+        assert app.state.shadow_scorer is not None
+    assert app.state.shadow_scorer._executor._shutdown
@@ -17,6 +17,7 @@ from src.core.monitoring.performance import PerformanceMonitor
 from src.core.orchestrator.service import Orchestrator
 from src.core.orchestrator.setup_gate import SetupGate
 from src.core.portfolio.position_manager import PositionManager
+from src.core.portfolio.rebalance import RebalancePlanner
 from src.core.portfolio.trade_queue import TradeQueue
 from src.core.risk.correlation import CorrelationManager
 from src.core.risk.manager import RiskManager
@@ -25,12 +26,12 @@ from src.core.settings import FundingAlertSettings, RiskSettings, Settings, Stor
 from src.core.storage.db import SQLiteStore
 
 
-def test_orchestrator_cycle_with_mock(tmp_path):
+def _build_orchestrator(tmp_path, risk=None, correlation_manager=None):
     db_path = tmp_path / "tradebot.db"
     cache_dir = tmp_path / "cache"
     settings = Settings(
         storage=StorageSettings(database_url=f"sqlite:///{db_path}", cache_dir=str(cache_dir)),
-        risk=RiskSettings(risk_per_trade=0.01, max_position_weight=0.2, cash_buffer=0.05),
+        risk=risk or RiskSettings(risk_per_trade=0.01, max_position_weight=0.2, cash_buffer=0.05),
         funding_alert=FundingAlertSettings(trade_queue_ttl_hours=24),
         trading=TradingConstraints(target_hold_days_max=14),
     )
@@ -52,7 +53,7 @@ def test_orchestrator_cycle_with_mock(tmp_path):
     error_handler = ErrorHandler(max_retries=2, retry_delay_seconds=1)
     performance_monitor = PerformanceMonitor()
     alert_manager = AlertManager(cooldown_seconds=1)
-    correlation_manager = CorrelationManager(max_symbol_correlation=0.95, max_sector_weight=0.3)
+    correlation_manager = correlation_manager or CorrelationManager(max_symbol_correlation=0.95, max_sector_weight=0.3)
     sentiment_provider = SentimentProvider(provider="finnhub", newsapi_key=None, finnhub_key=None)
     store = SQLiteStore(settings.storage.database_url)
     trade_queue = TradeQueue(store=store, ttl_hours=settings.funding_alert.trade_queue_ttl_hours)
@@ -92,6 +93,75 @@ def test_orchestrator_cycle_with_mock(tmp_path):
         position_manager=position_manager,
     )
     orchestrator.start()
+    return orchestrator, store
+
+
+class VetoingCorrelationManager(CorrelationManager):
+    def __init__(self, vetoed):
+        super().__init__(max_symbol_correlation=0.95, max_sector_weight=1.0)
+        self.vetoed = vetoed
+
+    def check_symbol(self, candidate, candidate_weight, holdings, price_history):
+        if candidate in self.vetoed:
+            return False, "correlated"
+        return super().check_symbol(candidate, candidate_weight, holdings, price_history)
+
+
+def test_orchestrator_cycle_with_mock(tmp_path):
+    orchestrator, _ = _build_orchestrator(tmp_path)
     result = orchestrator.run_cycle(["AAPL"])
     assert result["processed"] == 1
     assert "decisions" in result
+
+
+def test_vetoed_top_candidate_gives_its_cash_back(tmp_path):
+    # Mock bars are identical for every symbol, so the scores tie and AAA ranks first; each entry needs
+    # 60% of equity, so only one of them can be funded at a time.
+    risk = RiskSettings(risk_per_trade=0.5, max_position_weight=0.6, cash_buffer=0.0)
+    orchestrator, store = _build_orchestrator(tmp_path, risk, VetoingCorrelationManager({"AAA"}))
+    result = orchestrator.run_cycle(["AAA", "BBB", "CCC"])
+    assert [d["symbol"] for d in result["decisions"]] == ["AAA", "BBB", "CCC"]
+    assert [d["approved"] for d in result["decisions"]] == [True, True, False]
+    assert [row["symbol"] for row in store.list_open_trades()] == ["BBB"]
+    # Only CCC, which really had no cash left, gets a funding alert.
+    assert [alert["symbol"] for alert in store.list_funding_alerts()] == ["CCC"]
+
+
+def test_rebalance_is_opt_in_and_reconciles_trades(tmp_path):
+    orchestrator, store = _build_orchestrator(tmp_path)
+    orchestrator.rebalance_planner = RebalancePlanner(slippage_model=SlippageModel(spread_bps=0, fee_bps=0), frequency="daily")
+    assert "rebalance" not in orchestrator.run_cycle([])
+    assert store.last_rebalance_at() is None
+
+    client = orchestrator.execution.client
+    client.get_account = lambda: {"cash": "1000", "equity": "5000"}
+    client.list_positions = lambda: [
+        {"symbol": "AAA", "qty": "300", "current_price": "10", "market_value": "3000"},
+        {"symbol": "BBB", "qty": "100", "current_price": "10", "market_value": "1000"},
+    ]
+    store.add_trade(symbol="AAA", side="buy", quantity=50, entry=9.0, stop=8.0, take_profit=12.0)
+    store.add_trade(symbol="AAA", side="buy", quantity=250, entry=9.5, stop=8.5, take_profit=12.0)
+    store.add_trade(symbol="BBB", side="buy", quantity=100, entry=9.0, stop=8.0, take_profit=11.0)
+    plan = orchestrator.rebalance(dry_run=False)
+    # Equal weights of 40%: AAA sells 100, BBB buys 100.
+    assert [(o.symbol, o.side, o.quantity) for o in plan.orders] == [("AAA", "sell", 100), ("BBB", "buy", 100)]
+    rows = [(row["symbol"], row["quantity"], row["entry"], row["stop"]) for row in store.list_open_trades()]
+    # The oldest AAA lot closes and the next one shrinks; the BBB top-up keeps the latest stop.
+    assert rows == [("AAA", 200, 9.5, 8.5), ("BBB", 100, 9.0, 8.0), ("BBB", 100, 100.0, 8.0)]
+
+
+def test_rebalance_buy_without_trade_row_gets_atr_levels(tmp_path):
+    orchestrator, store = _build_orchestrator(tmp_path)
+    orchestrator.rebalance_planner = RebalancePlanner(slippage_model=SlippageModel(spread_bps=0, fee_bps=0), frequency="daily")
+    client = orchestrator.execution.client
+    client.get_account = lambda: {"cash": "1000", "equity": "5000"}
+    client.list_positions = lambda: [
+        {"symbol": "AAA", "qty": "300", "current_price": "10", "market_value": "3000"},
+        {"symbol": "BBB", "qty": "100", "current_price": "10", "market_value": "1000"},
+    ]
+    orchestrator.rebalance(dry_run=False)
+    (row,) = [row for row in store.list_open_trades() if row["symbol"] == "BBB"]
+    close = float(orchestrator.data_provider.get_daily_bars("BBB", limit=160)["close"].iloc[-1])
+    assert row["stop"] < close < row["take_profit"]
+    # The holding is not exited as a take-profit on the next pass.
+    assert not [action for action in orchestrator.position_manager.evaluate_exits() if "BBB" in action]
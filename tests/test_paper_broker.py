@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.main import create_app
+from src.core.contracts import OrderRequest
+from src.core.data.paper_broker import PaperBroker
+from src.core.data.synthetic import PriceModel
+from src.core.execution.slippage import SlippageModel
+from src.core.settings import PaperBrokerSettings, Settings, StorageSettings
+
+
+def test_price_paths_are_deterministic_per_symbol():
+    for kind in ("gbm", "regime"):
+        model = PriceModel(kind=kind, seed=3)
+        first, again, other = model.generate("AAA", 500), model.generate("AAA", 500), model.generate("BBB", 500)
+        assert np.array_equal(first["close"], again["close"])
+        assert not np.allclose(first["close"], other["close"])
+        assert np.all(first["high"] >= np.maximum(first["open"], first["close"]))
+        assert np.all(first["low"] <= np.minimum(first["open"], first["close"]))
+        assert np.all(first["volume"] > 0)
+    assert not np.array_equal(PriceModel(seed=4).generate("AAA", 500)["close"], PriceModel(seed=3).generate("AAA", 500)["close"])
+
+    broker = PaperBroker(history_days=300, horizon_days=10)
+    bars = broker.get_daily_bars("AAA", limit=200)
+    assert len(bars) == 200 and bars["ts"].is_monotonic_increasing
+    broker.advance(2)
+    later = broker.get_daily_bars("AAA", limit=200)
+    assert later["close"].iloc[-3] == bars["close"].iloc[-1]
+    with pytest.raises(ValueError):
+        broker.advance(10)
+
+
+def test_ledger_and_bracket_orders():
+    slippage = SlippageModel(spread_bps=10.0, fee_bps=5.0)
+    broker = PaperBroker(slippage_model=slippage, starting_cash=10_000.0, seed=1)
+    price = broker.get_latest_prices(["AAA"])["AAA"]
+    result = broker.submit_order(
+        OrderRequest(symbol="AAA", side="buy", quantity=10, stop_loss=price * 0.9, take_profit=price * 1.02, client_order_id="c1")
+    )
+    assert result.status == "filled" and result.filled_qty == 10
+    assert result.average_fill_price == pytest.approx(price * 1.0015)
+    assert broker.cash == pytest.approx(10_000.0 - 10 * price * 1.0015)
+    # Duplicate client order ids return the original order instead of trading twice.
+    assert broker.submit_order(OrderRequest(symbol="AAA", side="buy", quantity=10, client_order_id="c1")) == result
+    assert [p["qty"] for p in broker.list_positions()] == ["10"]
+    assert sorted(order["order_type"] for order in broker.list_orders()) == ["limit", "stop"]
+
+    fills = []
+    while not fills:
+        fills = broker.advance()
+    assert len(fills) == 1 and fills[0].filled_qty == 10
+    assert broker.list_positions() == [] and broker.list_orders() == []
+    account = broker.get_account()
+    assert float(account["equity"]) == pytest.approx(broker.cash, abs=0.01)
+
+    assert broker.submit_order(OrderRequest(symbol="AAA", side="sell", quantity=1)).status == "rejected"
+    assert broker.submit_order(OrderRequest(symbol="BBB", side="buy", quantity=10**6)).status == "rejected"
+    resting = broker.submit_order(OrderRequest(symbol="BBB", side="buy", quantity=1, order_type="limit", limit_price=0.01))
+    assert resting.status == "accepted"
+    broker.cancel_order(resting.order_id)
+    assert broker.list_orders() == []
+
+    faulty = PaperBroker(failure_rate=1.0)
+    with pytest.raises(ConnectionError):
+        faulty.get_account()
+
+
+def test_pipeline_trades_against_the_ledger(tmp_path):
+    symbols = [f"SYM{i}" for i in range(30)]
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'tradebot.db'}", cache_dir=str(tmp_path / "cache")),
+        paper_broker=PaperBrokerSettings(enabled=True),
+    )
+    client = TestClient(create_app(settings=settings, use_mock=True))
+    client.post("/api/orchestrator/start")
+    summary = client.post("/api/run-cycle", json={"symbols": symbols}).json()
+    assert summary["status"] == "completed"
+    portfolio = client.get("/api/portfolio").json()
+    approved = {d["symbol"]: d["shares"] for d in summary["decisions"] if d["approved"]}
+    assert approved
+    assert {p["symbol"]: int(p["qty"]) for p in portfolio["positions"]} == approved
+    invested = sum(float(p["market_value"]) for p in portfolio["positions"])
+    assert portfolio["equity"] == pytest.approx(portfolio["cash"] + invested, abs=0.05)
+
+
+def test_run_cycle_advances_the_clock_and_fills_bracket_legs(tmp_path):
+    symbols = [f"SYM{i}" for i in range(30)]
+    settings = Settings(
+        storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'tradebot.db'}", cache_dir=str(tmp_path / "cache")),
+        paper_broker=PaperBrokerSettings(enabled=True),
+    )
+    client = TestClient(create_app(settings=settings, use_mock=True))
+    client.post("/api/orchestrator/start")
+    first = client.post("/api/run-cycle", json={"symbols": symbols}).json()
+    held = {p["symbol"] for p in client.get("/api/portfolio").json()["positions"]}
+    assert held
+    fills = []
+    for _ in range(120):
+        fills = client.post("/api/run-cycle", json={"symbols": []}).json().get("paper_fills", [])
+        if fills:
+            break
+    # A stop-loss or take-profit leg filled on a later simulated bar and flattened its position.
+    assert fills and all(fill["symbol"] in held for fill in fills)
+    remaining = {p["symbol"] for p in client.get("/api/portfolio").json()["positions"]}
+    assert not {fill["symbol"] for fill in fills} & remaining
+    assert first["status"] == "completed"
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.contracts import FinalSignal
+from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.risk.manager import RiskManager
+from src.core.risk.optimizer import TRADING_DAYS, PortfolioOptimizer, shrunk_covariance
+
+
+def _panel(days=250, symbols=12, seed=4):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, size=(days, 1))
+    scale = rng.uniform(0.5, 2.0, size=symbols)
+    returns = market + rng.normal(0, 0.015, size=(days, symbols)) * scale
+    return pd.DataFrame(returns, columns=[f"S{i}" for i in range(symbols)])
+
+
+def test_modes_respect_position_sector_and_budget_limits():
+    panel = _panel()
+    sectors = {symbol: ("TECH" if i < 6 else "ENERGY") for i, symbol in enumerate(panel.columns)}
+    cov, intensity = shrunk_covariance(panel.to_numpy())
+    assert 0 < intensity < 1
+    assert np.allclose(cov, cov.T)
+
+    for mode in ("risk_parity", "vol_target", "mean_variance"):
+        optimizer = PortfolioOptimizer(mode=mode, max_weight=0.15, max_sector_weight=0.4, budget=0.9, target_vol=0.05)
+        optimizer.set_panel(panel)
+        weights = optimizer.optimize([*panel.columns, "NOHISTORY"], sectors=sectors)
+        values = np.array([weights[s] for s in panel.columns])
+        assert weights["NOHISTORY"] == 0.0
+        assert values.min() >= 0 and values.max() <= 0.15 + 1e-9
+        assert values.sum() <= 0.9 + 1e-9
+        for sector in ("TECH", "ENERGY"):
+            assert sum(weights[s] for s, label in sectors.items() if label == sector) <= 0.4 + 1e-9
+        if mode == "vol_target":
+            assert np.sqrt(values @ cov @ values * TRADING_DAYS) <= 0.05 + 1e-6
+
+    # Unconstrained, risk parity equalises every asset's risk contribution.
+    optimizer = PortfolioOptimizer(mode="risk_parity", max_weight=1.0, max_sector_weight=0.0)
+    optimizer.set_panel(panel)
+    weights = np.array(list(optimizer.optimize(list(panel.columns)).values()))
+    contributions = weights * (cov @ weights)
+    assert contributions / contributions.sum() == pytest.approx(np.full(12, 1 / 12), abs=1e-6)
+
+
+def test_projection_is_exact_and_fast_for_large_books():
+    optimizer = PortfolioOptimizer(max_weight=0.4, max_sector_weight=0.5, budget=0.9)
+    rng = np.random.default_rng(1)
+    values = rng.normal(0.2, 0.3, size=8)
+    groups = np.array([[0, 1, 2], [3, 4, -1]])
+    projected = optimizer.project(values, groups)
+
+    def feasible(x):
+        return (
+            x.min() >= -1e-12
+            and x.max() <= 0.4 + 1e-12
+            and x[[0, 1, 2]].sum() <= 0.5 + 1e-9
+            and x[[3, 4]].sum() <= 0.5 + 1e-9
+            and x.sum() <= 0.9 + 1e-9
+        )
+
+    assert feasible(projected)
+    distance = np.sum((projected - values) ** 2)
+    for _ in range(2000):
+        trial = projected + rng.normal(0, 0.02, size=8)
+        assert not feasible(trial) or np.sum((trial - values) ** 2) >= distance - 1e-12
+
+    panel = _panel(symbols=200)
+    sectors = {symbol: f"X{i % 11}" for i, symbol in enumerate(panel.columns)}
+    optimizer = PortfolioOptimizer(mode="mean_variance", max_weight=0.12, max_sector_weight=0.3, budget=0.92)
+    optimizer.set_panel(panel)
+    weights = optimizer.optimize(list(panel.columns), sectors=sectors)
+    assert sum(weights.values()) <= 0.92 + 1e-9
+    # Converged: the solution is a fixed point of a projected gradient step (well inside max_iter).
+    w = np.array([weights[symbol] for symbol in panel.columns])
+    hessian = optimizer.risk_aversion * optimizer._cov
+    gradient = hessian @ w - optimizer._mean
+    groups = optimizer._groups(list(panel.columns), sectors)
+    step = 1.0 / np.linalg.eigvalsh(hessian).max()
+    assert np.abs(optimizer.project(w - step * gradient, groups) - w).max() < 1e-5
+
+
+def test_weight_caps_tighten_sizing():
+    risk_manager = RiskManager(risk_per_trade=0.05, max_position_weight=0.1, cash_buffer=0.0)
+    portfolio = PortfolioSnapshot(cash=1000.0, equity=1000.0, open_positions=0)
+    signals = [
+        FinalSignal(symbol=s, score=0.8, entry=10.0, stop=9.0, take_profit=12.0, reasons=[], intents=[])
+        for s in ("AAA", "BBB")
+    ]
+    results = risk_manager.evaluate_many(signals, portfolio, weight_caps={"AAA": 0.03})
+    assert [decision.shares for decision, _ in results] == [3, 10]
+    assert results[0][0].constraints["max_position_weight"] == 0.03
@@ -0,0 +1,57 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.risk.portfolio_risk import PortfolioRiskEngine
+
+
+def _panel(days=250, symbols=8, seed=2):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, size=(days, 1))
+    returns = market + rng.normal(0, 0.015, size=(days, symbols))
+    return pd.DataFrame(returns, columns=[f"S{i}" for i in range(symbols)])
+
+
+def test_what_if_matches_per_candidate_evaluation():
+    panel = _panel()
+    holdings = {"S0": 0.3, "S1": 0.2}
+    candidates = {"S2": 0.1, "S0": 0.05, "UNKNOWN": 0.2}
+    for method in ("historical", "parametric", "filtered"):
+        engine = PortfolioRiskEngine(confidence=0.95, method=method)
+        engine.set_panel(panel)
+        batch = engine.what_if(holdings, candidates)
+        for symbol, weight in candidates.items():
+            combined = dict(holdings)
+            if symbol in engine.symbols:
+                combined[symbol] = combined.get(symbol, 0.0) + weight
+            single = engine.evaluate(combined)
+            assert batch[symbol].var == pytest.approx(single.var)
+            assert batch[symbol].cvar == pytest.approx(single.cvar)
+            assert batch[symbol].cvar >= batch[symbol].var
+
+    engine = PortfolioRiskEngine(confidence=0.95, method="historical")
+    engine.set_panel(panel)
+    losses = -(panel[["S0", "S1"]].to_numpy() @ np.array([0.3, 0.2]))
+    worst = np.sort(losses)[::-1][: int(np.ceil(len(losses) * 0.05))]
+    assert engine.evaluate(holdings).var == pytest.approx(worst[-1])
+    assert engine.evaluate(holdings).cvar == pytest.approx(worst.mean())
+
+    engine = PortfolioRiskEngine(confidence=0.99, method="parametric")
+    engine.set_panel(panel)
+    weights = np.array([0.3, 0.2])
+    sub = panel[["S0", "S1"]]
+    sigma = np.sqrt(weights @ sub.cov().to_numpy() @ weights)
+    assert engine.evaluate(holdings).var == pytest.approx(NormalDist().inv_cdf(0.99) * sigma - weights @ sub.mean())
+
+
+def test_check_vetoes_candidates_breaching_limits():
+    engine = PortfolioRiskEngine(confidence=0.99, max_var=0.02)
+    engine.set_panel(_panel())
+    assert engine.check({"S0": 0.2}, "S1", 0.1) == (True, "ok")
+    allowed, reason = engine.check({"S0": 0.6}, "S1", 0.6)
+    assert allowed is False and "VaR" in reason
+    # Many candidates score in a single call.
+    scores = engine.what_if({"S0": 0.2}, {f"S{i}": 0.05 for i in range(8)})
+    assert len(scores) == 8
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.data.cache import DataCache
+from src.core.data.market_data import MarketDataProvider
+from src.core.execution.execution_service import ExecutionService
+from src.core.features.feature_engine import FeatureEngine
+from src.core.monitoring.performance import PerformanceMonitor
+from src.core.portfolio.position_manager import PositionManager
+from src.core.settings import Settings, StorageSettings
+from src.core.storage.db import SQLiteStore
+
+
+class CountingProvider(MarketDataProvider):
+    calls = 0
+
+    def get_daily_bars_batch(self, symbols, limit=200):
+        CountingProvider.calls += 1
+        return super().get_daily_bars_batch(symbols, limit=limit)
+
+
+def test_exits_for_many_trades_use_one_fetch_and_one_write(tmp_path):
+    settings = Settings(storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+    client = MockAlpacaClient()
+    store = SQLiteStore(settings.storage.database_url)
+    provider = CountingProvider(client=client, cache=DataCache(str(tmp_path / "cache")))
+    feature_engine = FeatureEngine()
+    manager = PositionManager(
+        data_provider=provider,
+        feature_engine=feature_engine,
+        execution=ExecutionService(settings=settings, client=client),
+        performance_monitor=PerformanceMonitor(),
+        store=store,
+        max_hold_days=14,
+        trailing_stop_enabled=True,
+        trailing_atr_multiplier=2.5,
+    )
+    bars = client.get_daily_bars("S0", limit=120)
+    close = float(bars["close"].iloc[-1])
+    atr = feature_engine.compute("S0", bars, ("close", "atr")).values["atr"]
+    # Cycle through: far stop (raised), stop-loss, take-profit (also raised), stop just under the trail (raised).
+    layouts = [(close - 50, close + 50), (close + 1, close + 50), (close - 50, close - 1), (close - 3 * atr, close + 50)]
+    for i in range(52):
+        stop, take_profit = layouts[i % 4]
+        store.add_trade(symbol=f"S{i}", side="buy", quantity=10, entry=close, stop=stop, take_profit=take_profit)
+    writes = []
+    original = store.update_open_trades
+    store.update_open_trades = lambda stops, closed: (writes.append((stops, list(closed))), original(stops, closed))
+
+    actions = manager.evaluate_exits()
+
+    assert CountingProvider.calls == 1 and len(writes) == 1
+    stops, closed = writes[0]
+    assert len(closed) == 26 and len(stops) == 39
+    assert stops[1] == pytest.approx(close - atr * 2.5)
+    remaining = {row["id"]: row for row in store.list_open_trades()}
+    assert len(remaining) == 26
+    assert float(remaining[1]["stop"]) == pytest.approx(close - atr * 2.5)
+    assert sum(action.startswith("Exit") for action in actions) == 26
+    assert "Exit S1 triggered by stop_loss" in " ".join(actions)
+    assert "Exit S2 triggered by take_profit" in " ".join(actions)
+
+
+def test_time_exit(tmp_path):
+    settings = Settings(storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+    client = MockAlpacaClient()
+    store = SQLiteStore(settings.storage.database_url)
+    manager = PositionManager(
+        data_provider=MarketDataProvider(client=client, cache=DataCache(str(tmp_path / "cache"))),
+        feature_engine=FeatureEngine(),
+        execution=ExecutionService(settings=settings, client=client),
+        performance_monitor=PerformanceMonitor(),
+        store=store,
+        max_hold_days=5,
+        trailing_stop_enabled=False,
+        trailing_atr_multiplier=2.5,
+    )
+    trade_id = store.add_trade(symbol="AAPL", side="buy", quantity=1, entry=100.0, stop=1.0, take_profit=1e6)
+    opened = (datetime.now(timezone.utc) - timedelta(days=6)).isoformat()
+    with store._connect() as conn:
+        conn.execute("UPDATE trades SET opened_at = ? WHERE id = ?", (opened, trade_id))
+    assert [a.split(" at ")[0] for a in manager.evaluate_exits()] == ["Exit AAPL triggered by time_exit"]
+    assert store.list_open_trades() == []
+
+
+class PartlyBrokenClient(MockAlpacaClient):
+    def get_daily_bars(self, symbol, limit=200):
+        if symbol == "BAD":
+            raise ConnectionError("no data for BAD")
+        return super().get_daily_bars(symbol, limit=limit)
+
+    def submit_order(self, request):
+        if request.symbol == "DOWN":
+            raise ConnectionError("broker unavailable")
+        return super().submit_order(request)
+
+
+def test_failed_bars_or_sells_only_skip_their_own_trades(tmp_path):
+    settings = Settings(storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+    client = PartlyBrokenClient()
+    store = SQLiteStore(settings.storage.database_url)
+    manager = PositionManager(
+        data_provider=MarketDataProvider(client=client, cache=DataCache(str(tmp_path / "cache"))),
+        feature_engine=FeatureEngine(),
+        execution=ExecutionService(settings=settings, client=client),
+        performance_monitor=PerformanceMonitor(),
+        store=store,
+        max_hold_days=14,
+        trailing_stop_enabled=False,
+        trailing_atr_multiplier=2.5,
+    )
+    for symbol in ("AAA", "BAD", "DOWN", "ZZZ"):
+        store.add_trade(symbol=symbol, side="buy", quantity=1, entry=100.0, stop=1e6, take_profit=2e6)
+    actions = manager.evaluate_exits()
+    assert [a.split(" triggered")[0] for a in actions] == ["Exit AAA", "Exit ZZZ"]
+    # BAD was never evaluated and DOWN's sell failed: both stay open for the next pass.
+    assert [row["symbol"] for row in store.list_open_trades()] == ["BAD", "DOWN"]
+    messages = " ".join(row["message"] for row in store.list_logs())
+    assert "No bars for BAD" in messages and "Exit order for DOWN failed" in messages
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.execution.slippage import SlippageModel
+from src.core.portfolio.rebalance import RebalancePlanner
+
+
+def _position(symbol, qty, price):
+    return {"symbol": symbol, "qty": str(qty), "current_price": str(price), "market_value": str(qty * price)}
+
+
+def test_plan_trades_only_drifted_symbols_within_cash():
+    planner = RebalancePlanner(slippage_model=SlippageModel(spread_bps=5, fee_bps=5), threshold=0.05, cash_buffer=0.1)
+    positions = [_position("AAA", 300, 10.0), _position("BBB", 100, 10.0), _position("CCC", 190, 10.0)]
+    # Equity 10_000: AAA 30%, BBB 10%, CCC 19%; targets 20% each.
+    targets = planner.equal_weight_targets(positions, equity=10_000.0)
+    assert targets == pytest.approx({"AAA": 0.1967, "BBB": 0.1967, "CCC": 0.1967}, abs=1e-4)
+
+    targets = {"AAA": 0.2, "BBB": 0.2, "CCC": 0.2, "DDD": 0.2, "EEE": 0.2}
+    plan = planner.plan(positions, targets, equity=10_000.0, cash=1_500.0, prices={"DDD": 10.0})
+    orders = [(o.symbol, o.side, o.quantity) for o in plan.orders]
+    # CCC's 1% drift is inside the band and EEE has no price; sells come first and fund the buys
+    # together with the 500 above the cash buffer.
+    assert orders[0] == ("AAA", "sell", 100)
+    buys = {symbol: qty for symbol, side, qty in orders if side == "buy"}
+    assert set(buys) == {"BBB", "DDD"} and "CCC" not in plan.drift
+    assert sum(buys.values()) * 10.0 <= 1_000.0 + 500.0
+    assert plan.estimated_costs["AAA"] == pytest.approx(100 * 10.0 * 0.001)
+    assert plan.turnover == pytest.approx((100 + sum(buys.values())) * 10.0 / 10_000.0)
+
+
+def test_due_follows_frequency():
+    now = datetime(2026, 1, 12, tzinfo=timezone.utc)
+    weekly = RebalancePlanner(slippage_model=SlippageModel(spread_bps=0, fee_bps=0), frequency="weekly")
+    assert weekly.due(None, now)
+    assert not weekly.due(now - timedelta(days=3), now)
+    assert weekly.due(now - timedelta(days=7), now)
+    manual = RebalancePlanner(slippage_model=SlippageModel(spread_bps=0, fee_bps=0), frequency="manual")
+    assert not manual.due(None, now)
@@ -1,5 +1,9 @@
+import pytest
+
 from src.core.contracts import FinalSignal
+from src.core.execution.slippage import SlippageModel
 from src.core.portfolio.snapshot import PortfolioSnapshot
+from src.core.risk.funding import FundingSolver, HeldPosition
 from src.core.risk.manager import RiskManager
 
 
@@ -19,3 +23,90 @@ def test_risk_manager_funding_alert():
     assert not decision.approved
     assert funding is not None
     assert funding.missing_cash > 0
+
+
+def _signal(symbol, score, entry=20.0, stop=19.0):
+    return FinalSignal(symbol=symbol, score=score, entry=entry, stop=stop, take_profit=entry * 1.2, reasons=[], intents=[])
+
+
+def test_evaluate_many_shares_cash_across_candidates():
+    risk_manager = RiskManager(risk_per_trade=0.01, max_position_weight=0.1, cash_buffer=0.1)
+    portfolio = PortfolioSnapshot(cash=250.0, equity=1000.0, open_positions=0)
+    signals = [_signal("LOW", 0.71), _signal("BAD", 0.9, stop=21.0), _signal("TOP", 0.9), _signal("MID", 0.8)]
+    # Alone, each valid signal would be approved against the full balance.
+    assert all(risk_manager.evaluate(s, portfolio)[0].approved for s in signals if s.symbol != "BAD")
+
+    results = risk_manager.evaluate_many(signals, portfolio)
+    by_symbol = {decision.symbol: (decision, funding) for decision, funding in results}
+    assert [decision.symbol for decision, _ in results] == ["LOW", "BAD", "TOP", "MID"]
+    assert by_symbol["BAD"][0].reasons == ["Invalid entry/stop configuration"]
+    # 225 available after the buffer: TOP and MID take 100 each, LOW is short 75.
+    assert by_symbol["TOP"][0].approved and by_symbol["MID"][0].approved
+    low, funding = by_symbol["LOW"]
+    assert not low.approved and funding.missing_cash == 75.0
+    assert sum(d.cash_required for d, _ in results if d.approved) <= 225.0
+
+    single = RiskManager(risk_per_trade=0.01, max_position_weight=0.1, cash_buffer=0.1)
+    poor = PortfolioSnapshot(cash=50.0, equity=1000.0, open_positions=0)
+    for signal in signals:
+        expected, expected_funding = single.evaluate(signal, poor)
+        actual, actual_funding = single.evaluate_many([signal], poor)[0]
+        assert actual.model_dump() == expected.model_dump()
+        assert (actual_funding is None) == (expected_funding is None)
+        if expected_funding is not None:
+            assert actual_funding.missing_cash == expected_funding.missing_cash
+
+
+def test_funding_solver_sells_weakest_holdings_first():
+    solver = FundingSolver(slippage_model=SlippageModel(spread_bps=5, fee_bps=5), swap_score_gap_threshold=0.15)
+    risk_manager = RiskManager(risk_per_trade=0.01, max_position_weight=0.1, cash_buffer=0.1, funding_solver=solver)
+    positions = [
+        HeldPosition("WEAK", shares=2, price=10.0, score=0.1),
+        HeldPosition("LOSER", shares=10, price=10.0, score=0.5, unrealized_pl=-20.0),
+        HeldPosition("WINNER", shares=10, price=10.0, score=0.5, unrealized_pl=30.0),
+        HeldPosition("STRONG", shares=100, price=10.0, score=0.9),
+    ]
+    portfolio = PortfolioSnapshot(cash=50.0, equity=1000.0, open_positions=4)
+    decision, funding = risk_manager.evaluate(_signal("MSFT", 0.8), portfolio, positions=positions)
+    assert not decision.approved
+    # 100 needed, 45 available: WEAK is swapped out whole, LOSER is trimmed before WINNER is touched.
+    assert funding.proposed_actions == ["swap WEAK 2", "trim LOSER 4"]
+    assert [(o.symbol, o.side, o.quantity) for o in funding.orders] == [("WEAK", "sell", 2), ("LOSER", "sell", 4)]
+    assert funding.details["freed_cash"] >= funding.missing_cash
+    assert funding.details["transaction_cost"] == pytest.approx(60.0 * 0.001)
+
+    # Selling everything that trails the candidate by the gap still falls short: fall back to a partial entry and the queue.
+    _, funding = risk_manager.evaluate(_signal("MSFT", 0.6), portfolio, positions=positions)
+    assert funding.orders == []
+    assert funding.proposed_actions == ["partial_entry MSFT 1", "trade_queue"]
+
+    book = [HeldPosition(f"S{i}", shares=10 + i, price=5.0 + i, score=(i % 7) / 10) for i in range(200)]
+    plan = solver.solve("NEW", 0.9, 5_000.0, book)
+    assert plan.covered and plan.freed_cash >= 5_000.0
+    assert sum(1 for action in plan.actions if action.startswith("trim")) <= 1
+
+
+def test_funding_solver_sells_the_cheapest_dollars_first():
+    # A per-share commission makes low-priced shares dearer per dollar freed.
+    solver = FundingSolver(slippage_model=SlippageModel(spread_bps=5, fee_bps=5, per_share_fee=0.05))
+    positions = [
+        HeldPosition("PENNY", shares=100, price=2.0, score=0.1),
+        HeldPosition("BLUE", shares=10, price=50.0, score=0.3),
+    ]
+    plan = solver.solve("NEW", 0.9, 200.0, positions)
+    # PENNY scores lower, but freeing 200 from it costs 5.2 against 0.6 from BLUE.
+    assert plan.actions == ["trim BLUE 5"]
+    assert plan.transaction_cost == pytest.approx(5 * 0.05 + 250 * 0.001)
+
+
+def test_funding_alerts_do_not_plan_the_same_shares_twice():
+    solver = FundingSolver(slippage_model=SlippageModel(spread_bps=5, fee_bps=5), swap_score_gap_threshold=0.15)
+    risk_manager = RiskManager(risk_per_trade=0.01, max_position_weight=0.1, cash_buffer=0.0, funding_solver=solver)
+    positions = [HeldPosition("WEAK", shares=6, price=10.0, score=0.1), HeldPosition("SOFT", shares=20, price=10.0, score=0.2)]
+    portfolio = PortfolioSnapshot(cash=0.0, equity=1000.0, open_positions=2)
+    results = risk_manager.evaluate_many([_signal("SECOND", 0.8), _signal("FIRST", 0.9)], portfolio, positions=positions)
+    (_, second), (_, first) = results
+    # FIRST (higher score) swaps out WEAK and trims SOFT; SECOND only gets what SOFT has left.
+    assert [(o.symbol, o.quantity) for o in first.orders] == [("WEAK", 6), ("SOFT", 5)]
+    assert [(o.symbol, o.quantity) for o in second.orders] == [("SOFT", 11)]
+    assert sum(o.quantity for o in first.orders + second.orders if o.symbol == "SOFT") <= 20
@@ -0,0 +1,108 @@
+import random
+
+import pandas as pd
+
+from src.core.data.alpaca_client import MockAlpacaClient
+from src.core.data.cache import DataCache
+from src.core.data.market_data import MarketDataProvider
+from src.core.execution.execution_service import ExecutionService
+from src.core.features.feature_engine import FeatureEngine
+from src.core.monitoring.performance import PerformanceMonitor
+from src.core.portfolio.position_manager import PositionManager
+from src.core.portfolio.stop_monitor import PriceLevelIndex, ReplayQuoteSource, StopMonitor
+from src.core.settings import Settings, StorageSettings
+from src.core.storage.db import SQLiteStore
+
+
+def test_replayed_ticks_trigger_intraday_exits(tmp_path):
+    settings = Settings(storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+    client = MockAlpacaClient()
+    store = SQLiteStore(settings.storage.database_url)
+    manager = PositionManager(
+        data_provider=MarketDataProvider(client=client, cache=DataCache(str(tmp_path / "cache"))),
+        feature_engine=FeatureEngine(),
+        execution=ExecutionService(settings=settings, client=client),
+        performance_monitor=PerformanceMonitor(),
+        store=store,
+        max_hold_days=14,
+        trailing_stop_enabled=False,
+        trailing_atr_multiplier=2.5,
+    )
+    store.add_trade(symbol="AAA", side="buy", quantity=5, entry=100.0, stop=95.0, take_profit=110.0)
+    store.add_trade(symbol="AAA", side="buy", quantity=5, entry=100.0, stop=90.0, take_profit=120.0)
+    store.add_trade(symbol="BBB", side="buy", quantity=5, entry=50.0, stop=45.0, take_profit=55.0)
+    bars = {
+        "AAA": pd.DataFrame({"open": [100.0, 97.0], "high": [101.0, 98.0], "low": [96.0, 94.0], "close": [97.0, 95.5]}),
+        "BBB": pd.DataFrame({"open": [50.0, 52.0], "high": [53.0, 56.0], "low": [49.0, 51.0], "close": [52.0, 55.5]}),
+    }
+    source = ReplayQuoteSource.from_bars(bars)
+    monitor = StopMonitor(store=store, position_manager=manager, source=source)
+    assert monitor.refresh() == 3
+
+    actions = []
+    while not source.exhausted:
+        actions += monitor.poll_once()
+
+    # AAA's second bar is a down bar: high 98 first, then the low of 94 breaches the 95 stop only.
+    assert actions == ["Exit AAA triggered by intraday_stop_loss at 94.00", "Exit BBB triggered by intraday_take_profit at 56.00"]
+    assert [row["symbol"] for row in store.list_open_trades()] == ["AAA"]
+    assert len(monitor.index) == 1
+    # Already-closed trades are skipped if a stale index breaches them again.
+    assert manager.close_trades([1], [90.0], ["stop_loss"]) == []
+
+
+def test_level_index_matches_linear_scan():
+    rng = random.Random(7)
+    index = PriceLevelIndex()
+    levels = {}
+    for trade_id in range(5_000):
+        stop = rng.uniform(50, 100)
+        take_profit = stop + rng.uniform(5, 60)
+        index.add(trade_id, "SYM", stop, take_profit)
+        levels[trade_id] = (stop, take_profit)
+    for trade_id in range(0, 5_000, 3):
+        index.remove(trade_id)
+        del levels[trade_id]
+    for price in (40.0, 60.0, 75.0, 101.0, 170.0):
+        found = sorted(index.breaches("SYM", price))
+        expected = sorted(
+            [(i, "stop_loss") for i, (stop, _) in levels.items() if stop >= price]
+            + [(i, "take_profit") for i, (_, tp) in levels.items() if tp <= price]
+        )
+        assert found == expected
+    assert index.breaches("OTHER", 1.0) == []
+
+
+class FlakyExitClient(MockAlpacaClient):
+    failures = 1
+
+    def submit_order(self, request):
+        if FlakyExitClient.failures:
+            FlakyExitClient.failures -= 1
+            raise ConnectionError("broker unavailable")
+        return super().submit_order(request)
+
+
+def test_failed_intraday_exit_stays_watched(tmp_path):
+    settings = Settings(storage=StorageSettings(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+    client = FlakyExitClient()
+    store = SQLiteStore(settings.storage.database_url)
+    manager = PositionManager(
+        data_provider=MarketDataProvider(client=client, cache=DataCache(str(tmp_path / "cache"))),
+        feature_engine=FeatureEngine(),
+        execution=ExecutionService(settings=settings, client=client),
+        performance_monitor=PerformanceMonitor(),
+        store=store,
+        max_hold_days=14,
+        trailing_stop_enabled=False,
+        trailing_atr_multiplier=2.5,
+    )
+    store.add_trade(symbol="AAA", side="buy", quantity=5, entry=100.0, stop=95.0, take_profit=110.0)
+    source = ReplayQuoteSource([[("AAA", 94.0)], [("AAA", 93.5)]])
+    monitor = StopMonitor(store=store, position_manager=manager, source=source)
+    monitor.refresh()
+    # The first sell fails: the trade stays open and back in the index, so the next tick exits it.
+    assert monitor.poll_once() == []
+    assert len(monitor.index) == 1 and len(store.list_open_trades()) == 1
+    assert monitor.poll_once() == ["Exit AAA triggered by intraday_stop_loss at 93.50"]
+    assert len(monitor.index) == 0 and store.list_open_trades() == []
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.core.risk.stress_tester import StressTester
 
@@ -11,3 +13,38 @@ def test_stress_tester_smoke():
     results = tester.run(price_history, weights, shocks)
     assert results
     assert results[0].scenario == "down_10"
+
+
+def _history(returns: np.ndarray, symbols):
+    dates = pd.date_range("2024-01-01", periods=len(returns) + 1, freq="D", tz="UTC")
+    closes = 100 * np.vstack([np.ones(len(symbols)), np.cumprod(1 + returns, axis=0)])
+    return {s: pd.DataFrame({"ts": dates, "close": closes[:, i]}) for i, s in enumerate(symbols)}
+
+
+def test_scenario_matrix_historical_and_beta_shocks():
+    rng = np.random.default_rng(4)
+    symbols = [f"S{i}" for i in range(200)]
+    returns = rng.normal(0, 0.01, size=(500, 200))
+    returns[300:305] -= 0.03  # a five-day crash
+    history = _history(returns, symbols)
+    weights = {s: 1 / 200 for s in symbols}
+    tester = StressTester()
+
+    grid = StressTester.uniform_scenarios({f"u{i}": -i / 1000 for i in range(2000)}, symbols)
+    grid = grid.concat(tester.historical_scenarios(history, weights, windows=(1, 5), top=3))
+    grid = grid.concat(tester.beta_scenarios(history, {"market_-20%": -0.2}))
+    assert grid.shocks.shape == (2000 + 6 + 1, 200)
+    book = tester.evaluate(grid, weights)
+    assert book[5] == pytest.approx(-0.005)
+
+    worst_5d = tester.historical_scenarios(history, weights, windows=(5,), top=2)
+    assert worst_5d.names[0] == f"worst_5d_{pd.Timestamp('2024-01-02') + pd.Timedelta(days=300):%Y-%m-%d}"
+    expected = np.prod(1 + returns[300:305], axis=0) - 1
+    assert np.allclose(worst_5d.shocks[0], expected)
+
+    # Equal-weighted market betas average to one.
+    market = grid.shocks[-1]
+    assert market.mean() == pytest.approx(-0.2)
+    top = tester.results(grid, weights, top=3)
+    assert [r.portfolio_return for r in top] == sorted(r.portfolio_return for r in top)
+    assert len(top[0].details) == 200
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.core.data.cache import DataCache
+from src.core.data.paper_broker import PaperBroker
+from src.core.data.synthetic import MarketPanel, SyntheticMarketGenerator
+
+
+def _generator(symbols, **kwargs):
+    sectors = {symbol: f"X{i % 4}" for i, symbol in enumerate(symbols)}
+    return SyntheticMarketGenerator(seed=5, sectors=sectors, **kwargs)
+
+
+def test_factor_structure_regimes_and_bar_shape():
+    symbols = [f"S{i:03d}" for i in range(80)]
+    generator = _generator(symbols, gap_probability=0.02)
+    panel = generator.panel(symbols, 1500, end="2024-12-31")
+    assert panel.close.shape == (1500, 80) and len(panel.ts) == 1500
+    assert np.all(panel.high >= np.maximum(panel.open, panel.close))
+    assert np.all(panel.low <= np.minimum(panel.open, panel.close))
+    assert np.all(panel.volume > 0)
+
+    returns = panel.returns().to_numpy()
+    upper = np.triu_indices(80, 1)
+    same = (np.arange(80)[:, None] % 4 == np.arange(80) % 4)[upper]
+    corr = np.corrcoef(returns.T)[upper]
+    assert corr.mean() > 0.15
+    assert corr[same].mean() > corr[~same].mean() + 0.05
+
+    stressed = generator._state(1500)["multiplier"][1:] > 1
+    assert 0 < stressed.mean() < 0.5
+    assert returns[stressed].std() > 1.5 * returns[~stressed].std()
+    overnight = np.abs(np.log(panel.open[1:] / panel.close[:-1]))
+    assert (overnight > 0.05).mean() > 0.002
+
+
+def test_output_is_deterministic_per_symbol_and_round_trips(tmp_path):
+    symbols = [f"S{i:03d}" for i in range(60)]
+    generator = _generator(symbols)
+    whole = generator.panel(symbols, 300, end="2024-12-31")
+    chunks = list(_generator(symbols).iter_panels(symbols, 300, chunk_size=25, end="2024-12-31"))
+    assert [len(chunk.symbols) for chunk in chunks] == [25, 25, 10]
+    assert np.allclose(np.hstack([chunk.close for chunk in chunks]), whole.close, rtol=1e-12)
+    single = generator.generate("S007", 300, calendar=whole.ts)
+    assert np.allclose(single["close"], whole.close[:, 7], rtol=1e-12)
+    assert np.array_equal(single["volume"], whole.volume[:, 7])
+
+    path = tmp_path / "panel.npz"
+    whole.save(path)
+    loaded = MarketPanel.load(path)
+    assert loaded.symbols == symbols and loaded.ts.equals(whole.ts)
+    assert np.array_equal(loaded.volume, whole.volume)
+
+    cache = DataCache(tmp_path / "cache", data_format="csv")
+    assert generator.write_cache(cache, symbols[:5], 300, chunk_size=2, end="2024-12-31") == 5
+    cached = cache.load_daily_bars("S003", limit=100)
+    assert list(cached.columns) == ["ts", "open", "high", "low", "close", "volume"]
+    assert cached["close"].to_numpy() == pytest.approx(whole.close[-100:, 3])
+
+    broker = PaperBroker(price_model=generator, history_days=200, horizon_days=100)
+    assert broker.get_latest_prices(["S007"])["S007"] == pytest.approx(whole.close[199, 7])
+    # The broker's bars use its own calendar, so the weekday volume profile matches the panel's.
+    assert np.array_equal(broker.get_daily_bars("S007", limit=200)["volume"].to_numpy(), whole.volume[:200, 7])
+
+
+def test_large_universe_generation_is_vectorised():
+    symbols = [f"S{i:04d}" for i in range(1000)]
+    generator = SyntheticMarketGenerator(dtype="float32")
+    sizes = [chunk.close.shape for chunk in generator.iter_panels(symbols, 2520, chunk_size=500)]
+    assert sizes == [(2520, 500), (2520, 500)]